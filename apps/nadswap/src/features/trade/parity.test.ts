@@ -0,0 +1,102 @@
+import { readFileSync, writeFileSync } from "node:fs";
+
+import { describe, expect, it } from "vitest";
+
+import { getSwapFeeBreakdown, type SwapDirection, type SwapFeeBreakdown } from "./feeBreakdown";
+import { applySlippageBps } from "./math";
+
+// Vectors come from scripts/gates/check_ts_parity.py; without them this suite is skipped.
+const vectorsPath = process.env.NADSWAP_TS_PARITY_VECTORS;
+const reportPath = process.env.NADSWAP_TS_PARITY_REPORT;
+
+const BREAKDOWN_FIELDS = [
+  "inputAmount",
+  "effectiveSwapInput",
+  "lpFeeAmount",
+  "taxAmountIn",
+  "taxAmountOut",
+  "grossOutput",
+  "netOutput"
+] as const satisfies readonly (keyof SwapFeeBreakdown)[];
+
+const SWAP_DIRECTION: Record<string, SwapDirection> = {
+  buy_exact_in: "quoteToBase",
+  buy_exact_out: "quoteToBase",
+  sell_exact_in: "baseToQuote",
+  sell_exact_out: "baseToQuote"
+};
+
+const MAX_SAMPLES = 20;
+
+const parse = (token: string): bigint | null => (token === "-" ? null : BigInt(token));
+
+const checkVector = (fields: string[]): string | null => {
+  const [direction, ...values] = fields;
+  if (direction === "slippage") {
+    const [amount, bps, expected] = values;
+    const actual = applySlippageBps(BigInt(amount), Number(bps));
+    return actual === BigInt(expected) ? null : `applySlippageBps=${actual} python=${expected}`;
+  }
+
+  const swapDirection = SWAP_DIRECTION[direction];
+  if (swapDirection === undefined) {
+    return `unknown direction`;
+  }
+  const [amountIn, quotedOut, reserveIn, reserveOut, buyTax, sellTax, lpFee, ...expected] = values;
+  const breakdown = getSwapFeeBreakdown({
+    direction: swapDirection,
+    amountIn: parse(amountIn),
+    quotedOut: parse(quotedOut),
+    reserveIn: parse(reserveIn),
+    reserveOut: parse(reserveOut),
+    buyTaxBps: Number(buyTax),
+    sellTaxBps: Number(sellTax),
+    lpFeeBps: Number(lpFee)
+  });
+
+  const diffs = BREAKDOWN_FIELDS.flatMap((field, i) => {
+    const want = parse(expected[i]);
+    return breakdown[field] === want ? [] : [`${field}=${breakdown[field]} python=${want}`];
+  });
+  return diffs.length === 0 ? null : diffs.join(" ");
+};
+
+describe.skipIf(!vectorsPath)("Python model parity", () => {
+  it("matches every generated vector", () => {
+    const lines = readFileSync(vectorsPath as string, "utf8").split("\n");
+    const directions: Record<string, { vectors: number; mismatches: number }> = {};
+    const samples: string[] = [];
+    let total = 0;
+    let mismatches = 0;
+
+    for (const line of lines) {
+      if (line === "") {
+        continue;
+      }
+      const fields = line.split(" ");
+      const row = (directions[fields[0]] ??= { vectors: 0, mismatches: 0 });
+      row.vectors += 1;
+      total += 1;
+
+      let diff: string | null;
+      try {
+        diff = checkVector(fields);
+      } catch (error) {
+        diff = `threw ${(error as Error).message}`;
+      }
+      if (diff !== null) {
+        row.mismatches += 1;
+        mismatches += 1;
+        if (samples.length < MAX_SAMPLES) {
+          samples.push(`${line} -> ${diff}`);
+        }
+      }
+    }
+
+    if (reportPath) {
+      writeFileSync(reportPath, JSON.stringify({ total, mismatches, directions, samples }, null, 2));
+    }
+    expect(total).toBeGreaterThan(0);
+    expect(samples).toEqual([]);
+  }, 120_000);
+});
@@ -0,0 +1,196 @@
+pragma solidity =0.5.16;
+
+import "./../helpers/PairFixture.sol";
+
+/// Executes vectors exported by `check_math_consistency.py --export-vectors`
+/// against real pairs. Lines are read one at a time and processed in chunks of
+/// external self-calls, so EVM memory is released between chunks and the file
+/// is never held in full on either side.
+contract PairVectorDifferentialTest is PairFixture {
+    string private constant DEFAULT_VECTORS = "test/vectors/pair_swap.vec";
+    uint256 private constant HEADER_PREFIX = 24; // "NADSWAP-PAIR-VECTORS v1 "
+    uint256 private constant LINE_WIDTH = 283;
+    uint256 private constant CHUNK = 256;
+    uint256 private constant BALANCE_SLOT = 4; // MockERC20.balanceOf
+
+    UniswapV2Pair internal pairQuote0;
+    UniswapV2Pair internal pairQuote1;
+    address internal quoteQuote0;
+    address internal quoteQuote1;
+    uint256 internal vectorIndex;
+
+    struct Vector {
+        bool isBuy;
+        bool isQuote0;
+        bool kPass;
+        uint256 buyTax;
+        uint256 sellTax;
+        uint256 rQuote;
+        uint256 rBase;
+        uint256 vault;
+        uint256 amountIn;
+        uint256 amountOut;
+        uint256 tax;
+        uint256 grossOut;
+        uint256 effIn;
+        uint256 effQuote;
+        uint256 effBase;
+    }
+
+    function setUp() public {
+        _setUpPair(0, 0);
+        bool firstIsQuote0 = _isQuote0();
+
+        // Second quote token on the other side of `base` for the opposite orientation.
+        MockERC20 otherQuote = new MockERC20("Quote2", "QT2", 18);
+        while ((address(otherQuote) < baseTokenAddr) == firstIsQuote0) {
+            otherQuote = new MockERC20("Quote2", "QT2", 18);
+        }
+        vm.prank(PAIR_ADMIN);
+        factory.setQuoteToken(address(otherQuote), true);
+        vm.prank(PAIR_ADMIN);
+        UniswapV2Pair other =
+            UniswapV2Pair(factory.createPair(address(otherQuote), baseTokenAddr, 0, 0, COLLECTOR));
+
+        if (firstIsQuote0) {
+            (pairQuote0, quoteQuote0, pairQuote1, quoteQuote1) = (pair, quoteTokenAddr, other, address(otherQuote));
+        } else {
+            (pairQuote0, quoteQuote0, pairQuote1, quoteQuote1) = (other, address(otherQuote), pair, quoteTokenAddr);
+        }
+    }
+
+    function test_differential_pairSwapVectors() public {
+        string memory path = vm.envOr("NADSWAP_PAIR_VECTORS", DEFAULT_VECTORS);
+        vm.closeFile(path);
+        uint256 expected = _decimal(bytes(vm.readLine(path)), HEADER_PREFIX);
+
+        uint256 total;
+        bool eof;
+        while (!eof) {
+            uint256 n;
+            (n, eof) = this.runVectorChunk(path, CHUNK);
+            total += n;
+        }
+        assertEq(total, expected, "vector count mismatch");
+        assertGt(total, 0, "no vectors");
+    }
+
+    function runVectorChunk(string calldata path, uint256 maxVectors) external returns (uint256 n, bool eof) {
+        require(msg.sender == address(this), "SELF_ONLY");
+        for (; n < maxVectors; n++) {
+            bytes memory line = bytes(vm.readLine(path));
+            if (line.length == 0) return (n, true);
+            require(line.length == LINE_WIDTH, "VECTOR_WIDTH");
+            _execute(_parse(line));
+            vectorIndex++;
+        }
+    }
+
+    function _parse(bytes memory line) private pure returns (Vector memory v) {
+        v.isBuy = line[0] == "B";
+        v.isQuote0 = line[1] == "1";
+        v.kPass = line[2] == "1";
+        v.buyTax = _hex(line, 3, 4);
+        v.sellTax = _hex(line, 7, 4);
+        v.rQuote = _hex(line, 11, 28);
+        v.rBase = _hex(line, 39, 28);
+        v.vault = _hex(line, 67, 24);
+        v.amountIn = _hex(line, 91, 28);
+        v.amountOut = _hex(line, 119, 28);
+        v.tax = _hex(line, 147, 24);
+        v.grossOut = _hex(line, 171, 28);
+        v.effIn = _hex(line, 199, 28);
+        v.effQuote = _hex(line, 227, 28);
+        v.effBase = _hex(line, 255, 28);
+    }
+
+    function _execute(Vector memory v) private {
+        pair = v.isQuote0 ? pairQuote0 : pairQuote1;
+        quoteTokenAddr = v.isQuote0 ? quoteQuote0 : quoteQuote1;
+
+        if (pair.buyTaxBps() != v.buyTax || pair.sellTaxBps() != v.sellTax) {
+            vm.prank(address(factory));
+            pair.setTaxConfig(uint16(v.buyTax), uint16(v.sellTax), COLLECTOR);
+        }
+
+        // Pre-swap state: effective reserves synced from raw balances, vault on the quote side.
+        _setVault(uint96(v.vault));
+        _setBalance(quoteTokenAddr, v.rQuote + v.vault);
+        _setBalance(baseTokenAddr, v.rBase);
+        pair.sync();
+
+        if (v.isBuy) {
+            _setBalance(quoteTokenAddr, v.rQuote + v.vault + v.amountIn);
+        } else {
+            _setBalance(baseTokenAddr, v.rBase + v.amountIn);
+        }
+        // Buy takes base out, sell takes (net) quote out.
+        uint256 out0 = v.isBuy == v.isQuote0 ? uint256(0) : v.amountOut;
+        uint256 out1 = v.isBuy == v.isQuote0 ? v.amountOut : uint256(0);
+        (bool ok, bytes memory ret) = address(pair).call(
+            abi.encodeWithSignature("swap(uint256,uint256,address,bytes)", out0, out1, TRADER, new bytes(0))
+        );
+
+        if (!v.kPass) {
+            bytes32 kRevert = keccak256(abi.encodeWithSignature("Error(string)", "K"));
+            _check(!ok && keccak256(ret) == kRevert, "expected K revert");
+            return;
+        }
+        if (!ok) {
+            assembly {
+                revert(add(ret, 32), mload(ret))
+            }
+        }
+
+        (uint256 reserveQuote, uint256 reserveBase) = _reservesQuoteBase();
+        _check(pair.accumulatedQuoteTax() == v.vault + v.tax, "tax");
+        _check(reserveQuote == v.effQuote && reserveBase == v.effBase, "effective reserves");
+        if (v.isBuy) {
+            _check(reserveQuote - v.rQuote == v.effIn, "effIn quote");
+        } else {
+            _check(reserveBase - v.rBase == v.effIn, "effIn base");
+            _check(v.amountOut + v.tax == v.grossOut, "gross quote out");
+        }
+    }
+
+    function _setBalance(address token, uint256 amount) private {
+        vm.store(token, keccak256(abi.encode(address(pair), BALANCE_SLOT)), bytes32(amount));
+    }
+
+    function _check(bool cond, string memory what) private view {
+        if (!cond) revert(string(abi.encodePacked("vector ", _toString(vectorIndex), ": ", what)));
+    }
+
+    function _hex(bytes memory line, uint256 start, uint256 len) private pure returns (uint256 value) {
+        for (uint256 i = start; i < start + len; i++) {
+            uint8 c = uint8(line[i]);
+            uint256 digit;
+            if (c >= 48 && c <= 57) {
+                digit = c - 48;
+            } else if (c >= 97 && c <= 102) {
+                digit = c - 87;
+            } else {
+                revert("VECTOR_HEX");
+            }
+            value = (value << 4) | digit;
+        }
+    }
+
+    function _decimal(bytes memory text, uint256 start) private pure returns (uint256 value) {
+        require(text.length > start, "VECTOR_HEADER");
+        for (uint256 i = start; i < text.length; i++) {
+            uint8 c = uint8(text[i]);
+            require(c >= 48 && c <= 57, "VECTOR_HEADER");
+            value = value * 10 + (c - 48);
+        }
+    }
+
+    function _toString(uint256 value) private pure returns (string memory) {
+        if (value == 0) return "0";
+        uint256 digits;
+        for (uint256 v = value; v != 0; v /= 10) digits++;
+        bytes memory out = new bytes(digits);
+        for (; value != 0; value /= 10) out[--digits] = bytes1(uint8(48 + value % 10));
+        return string(out);
+    }
+}
@@ -0,0 +1,246 @@
+pragma solidity =0.5.16;
+
+import "./../helpers/PairFixture.sol";
+
+/// Gas scenarios for `scripts/gates/check_gas_snapshot.py` (`forge snapshot`).
+/// Each test meters exactly one call: preparation and assertions run with gas
+/// metering paused. State the measured call writes is prepared in `setUp`,
+/// which commits before the test transaction, so SSTOREs are charged at their
+/// real (not same-transaction dirty-slot) cost.
+contract GasSnapshotTest is PairFixture {
+    uint256 private constant TRADE = 1_000 ether;
+
+    MockERC20 internal baseQuote0; // quote is token0 of pairQuote0
+    MockERC20 internal baseQuote1; // quote is token1 of pairQuote1
+    MockERC20 internal baseDonated;
+    UniswapV2Pair internal pairQuote0;
+    UniswapV2Pair internal pairQuote1;
+    UniswapV2Pair internal pairDonated; // carries a donation for skim/sync
+
+    function setUp() public {
+        quote = new MockERC20("Quote", "QT", 18);
+        quoteTokenAddr = address(quote);
+        baseQuote0 = _newBase(true);
+        baseQuote1 = _newBase(false);
+        baseDonated = new MockERC20("Base", "BS", 18);
+
+        weth = new MockWETH();
+        factory = new UniswapV2Factory(PAIR_ADMIN);
+        router = new UniswapV2Router02(address(factory), address(weth));
+        vm.prank(PAIR_ADMIN);
+        factory.setQuoteToken(quoteTokenAddr, true);
+
+        pairQuote0 = _newPair(address(baseQuote0));
+        pairQuote1 = _newPair(address(baseQuote1));
+        pairDonated = _newPair(address(baseDonated));
+        assertEq(pairQuote0.token0(), quoteTokenAddr, "pairQuote0 orientation");
+        assertEq(pairQuote1.token1(), quoteTokenAddr, "pairQuote1 orientation");
+
+        // Steady state: one earlier buy leaves a nonzero tax vault on both sides.
+        _seedBuy(pairQuote0, address(baseQuote0));
+        _seedBuy(pairQuote1, address(baseQuote1));
+
+        address[3] memory tokens = [quoteTokenAddr, address(baseQuote0), address(baseQuote1)];
+        for (uint256 i = 0; i < tokens.length; i++) {
+            _mintToken(tokens[i], TRADER, TRADE * 100);
+            _approveRouter(tokens[i], TRADER, uint256(-1));
+        }
+
+        // Liquidity already sent to the pair, as the Router does before `burn`.
+        uint256 liquidity = pairQuote0.balanceOf(LP) / 100;
+        vm.prank(LP);
+        pairQuote0.transfer(address(pairQuote0), liquidity);
+
+        _mintToken(quoteTokenAddr, address(pairDonated), TRADE);
+        _mintToken(address(baseDonated), address(pairDonated), TRADE);
+    }
+
+    function _newBase(bool aboveQuote) private returns (MockERC20 token) {
+        token = new MockERC20("Base", "BS", 18);
+        while ((address(token) > quoteTokenAddr) != aboveQuote) {
+            token = new MockERC20("Base", "BS", 18);
+        }
+    }
+
+    function _newPair(address baseToken) private returns (UniswapV2Pair newPair) {
+        vm.prank(PAIR_ADMIN);
+        newPair = UniswapV2Pair(factory.createPair(quoteTokenAddr, baseToken, 300, 500, COLLECTOR));
+        _mintToken(quoteTokenAddr, address(newPair), INITIAL_LIQUIDITY);
+        _mintToken(baseToken, address(newPair), INITIAL_LIQUIDITY);
+        newPair.mint(LP);
+    }
+
+    function _seedBuy(UniswapV2Pair target, address baseToken) private {
+        uint256 baseOut = router.getAmountsOut(TRADE, _path(quoteTokenAddr, baseToken))[1];
+        _mintToken(quoteTokenAddr, address(target), TRADE);
+        if (target.token0() == quoteTokenAddr) {
+            target.swap(0, baseOut, OTHER, new bytes(0));
+        } else {
+            target.swap(baseOut, 0, OTHER, new bytes(0));
+        }
+    }
+
+    function _pairSwap(UniswapV2Pair target, address tokenIn, address tokenOut) private {
+        vm.pauseGasMetering();
+        uint256 amountOut = router.getAmountsOut(TRADE, _path(tokenIn, tokenOut))[1];
+        vm.prank(TRADER);
+        _safeTokenTransfer(tokenIn, address(target), TRADE);
+        (uint256 amount0Out, uint256 amount1Out) =
+            target.token0() == tokenOut ? (amountOut, uint256(0)) : (uint256(0), amountOut);
+        uint256 before = IERC20(tokenOut).balanceOf(TRADER);
+
+        vm.resumeGasMetering();
+        target.swap(amount0Out, amount1Out, TRADER, new bytes(0));
+        vm.pauseGasMetering();
+
+        assertEq(IERC20(tokenOut).balanceOf(TRADER) - before, amountOut, "pair swap output");
+    }
+
+    function _routerExactIn(address[] memory path) private {
+        vm.pauseGasMetering();
+        address tokenOut = path[path.length - 1];
+        uint256 before = IERC20(tokenOut).balanceOf(TRADER);
+        vm.prank(TRADER);
+
+        vm.resumeGasMetering();
+        uint256[] memory amounts = router.swapExactTokensForTokens(TRADE, 0, path, TRADER, block.timestamp);
+        vm.pauseGasMetering();
+
+        assertEq(IERC20(tokenOut).balanceOf(TRADER) - before, amounts[amounts.length - 1], "exact-in output");
+    }
+
+    function _routerExactOut(address[] memory path) private {
+        vm.pauseGasMetering();
+        address tokenOut = path[path.length - 1];
+        uint256 before = IERC20(tokenOut).balanceOf(TRADER);
+        vm.prank(TRADER);
+
+        vm.resumeGasMetering();
+        router.swapTokensForExactTokens(TRADE / 2, uint256(-1), path, TRADER, block.timestamp);
+        vm.pauseGasMetering();
+
+        assertEq(IERC20(tokenOut).balanceOf(TRADER) - before, TRADE / 2, "exact-out output");
+    }
+
+    function _multiHopPath() private view returns (address[] memory p) {
+        p = new address[](3);
+        p[0] = address(baseQuote0);
+        p[1] = quoteTokenAddr;
+        p[2] = address(baseQuote1);
+    }
+
+    // ─── Pair.swap ───
+
+    function test_gas_pairSwap_buy_quote0() public {
+        _pairSwap(pairQuote0, quoteTokenAddr, address(baseQuote0));
+    }
+
+    function test_gas_pairSwap_buy_quote1() public {
+        _pairSwap(pairQuote1, quoteTokenAddr, address(baseQuote1));
+    }
+
+    function test_gas_pairSwap_sell_quote0() public {
+        _pairSwap(pairQuote0, address(baseQuote0), quoteTokenAddr);
+    }
+
+    function test_gas_pairSwap_sell_quote1() public {
+        _pairSwap(pairQuote1, address(baseQuote1), quoteTokenAddr);
+    }
+
+    // ─── Router02 single hop ───
+
+    function test_gas_router_buyExactIn_quote0() public {
+        _routerExactIn(_path(quoteTokenAddr, address(baseQuote0)));
+    }
+
+    function test_gas_router_buyExactIn_quote1() public {
+        _routerExactIn(_path(quoteTokenAddr, address(baseQuote1)));
+    }
+
+    function test_gas_router_buyExactOut_quote0() public {
+        _routerExactOut(_path(quoteTokenAddr, address(baseQuote0)));
+    }
+
+    function test_gas_router_buyExactOut_quote1() public {
+        _routerExactOut(_path(quoteTokenAddr, address(baseQuote1)));
+    }
+
+    function test_gas_router_sellExactIn_quote0() public {
+        _routerExactIn(_path(address(baseQuote0), quoteTokenAddr));
+    }
+
+    function test_gas_router_sellExactIn_quote1() public {
+        _routerExactIn(_path(address(baseQuote1), quoteTokenAddr));
+    }
+
+    function test_gas_router_sellExactOut_quote0() public {
+        _routerExactOut(_path(address(baseQuote0), quoteTokenAddr));
+    }
+
+    function test_gas_router_sellExactOut_quote1() public {
+        _routerExactOut(_path(address(baseQuote1), quoteTokenAddr));
+    }
+
+    // ─── Router02 multi-hop: sell on pairQuote0, buy on pairQuote1 ───
+
+    function test_gas_router_multiHopExactIn() public {
+        _routerExactIn(_multiHopPath());
+    }
+
+    function test_gas_router_multiHopExactOut() public {
+        _routerExactOut(_multiHopPath());
+    }
+
+    // ─── Tax claim, liquidity, skim/sync ───
+
+    function test_gas_claimQuoteTax() public {
+        vm.pauseGasMetering();
+        vm.prank(COLLECTOR);
+
+        vm.resumeGasMetering();
+        pairQuote0.claimQuoteTax(FEE_RECIPIENT);
+        vm.pauseGasMetering();
+
+        assertGt(_quoteBalance(FEE_RECIPIENT), 0, "claimed tax");
+    }
+
+    function test_gas_mint() public {
+        vm.pauseGasMetering();
+        (uint112 r0, uint112 r1,) = pairQuote0.getReserves();
+        _mintToken(pairQuote0.token0(), address(pairQuote0), uint256(r0) / 100);
+        _mintToken(pairQuote0.token1(), address(pairQuote0), uint256(r1) / 100);
+        uint256 before = pairQuote0.balanceOf(OTHER);
+
+        vm.resumeGasMetering();
+        pairQuote0.mint(OTHER);
+        vm.pauseGasMetering();
+
+        assertGt(pairQuote0.balanceOf(OTHER), before, "minted liquidity");
+    }
+
+    function test_gas_burn() public {
+        vm.pauseGasMetering();
+        uint256 before = baseQuote0.balanceOf(LP);
+
+        vm.resumeGasMetering();
+        pairQuote0.burn(LP);
+        vm.pauseGasMetering();
+
+        assertGt(baseQuote0.balanceOf(LP), before, "burned liquidity");
+    }
+
+    function test_gas_skim() public {
+        pairDonated.skim(OTHER);
+        vm.pauseGasMetering();
+
+        assertEq(_quoteBalance(OTHER), TRADE, "skimmed quote");
+    }
+
+    function test_gas_sync() public {
+        pairDonated.sync();
+        vm.pauseGasMetering();
+
+        (uint112 r0, uint112 r1,) = pairDonated.getReserves();
+        assertEq(uint256(r0) + uint256(r1), (INITIAL_LIQUIDITY + TRADE) * 2, "synced reserves");
+    }
+}
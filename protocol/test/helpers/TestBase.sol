@@ -17,6 +17,11 @@ interface Vm {
     function envUint(string calldata key) external returns (uint256);
     function envString(string calldata key) external returns (string memory);
     function envOr(string calldata key, uint256 defaultValue) external returns (uint256);
+    function envOr(string calldata key, string calldata defaultValue) external returns (string memory);
+    function readLine(string calldata path) external view returns (string memory);
+    function closeFile(string calldata path) external;
+    function pauseGasMetering() external;
+    function resumeGasMetering() external;
 }
 
 contract TestBase {
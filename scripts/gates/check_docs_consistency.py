@@ -98,8 +98,13 @@ def count_test_functions(extra_globs):
 
 def verify_metrics_against_source(metrics):
     expected = {
-        "non_fork_all": count_test_functions(["-g", "!protocol/test/fork/**"]),
-        "non_fork_strict": count_test_functions(["-g", "!protocol/test/fork/**", "-g", "!protocol/test/invariant/**"]),
+        "non_fork_all": count_test_functions(
+            ["-g", "!protocol/test/fork/**", "-g", "!protocol/test/gas/**", "-g", "!protocol/test/differential/**"]
+        ),
+        "non_fork_strict": count_test_functions(
+            ["-g", "!protocol/test/fork/**", "-g", "!protocol/test/gas/**", "-g", "!protocol/test/differential/**",
+             "-g", "!protocol/test/invariant/**"]
+        ),
         "requirements_count": count_requirements(),
         "spec_test_count": count_unique_names(SPEC_PATH, SPEC_TEST_RE),
         "spec_invariant_count": count_unique_names(SPEC_PATH, SPEC_INVARIANT_RE),
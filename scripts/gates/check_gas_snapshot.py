@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Gas snapshot regression gate.
+
+Runs `forge snapshot` over `protocol/test/gas/` (`GasSnapshotTest`: one test
+per measured call, preparation excluded with `vm.pauseGasMetering`) and
+compares every test with the committed baseline
+`docs/reports/NADSWAP_V2_GAS_BASELINE.json`:
+
+  {"schema": 1, "default_tolerance_pct": 1.0,
+   "functions": {"<test name>": {"label": str, "gas": int | null,
+                                 "tolerance_pct": float (optional)}}}
+
+Per test:
+  PASS        within ±tolerance of the baseline
+  REGRESSION  more than tolerance above the baseline        (fails)
+  IMPROVED    more than tolerance below; lower the baseline with --update-baseline
+  MISSING     baselined but not in the snapshot             (fails)
+  NEW         measured, but no baseline gas recorded yet    (fails unless --allow-new)
+
+`--update-baseline` writes the measured gas into the baseline and keeps
+labels and tolerances. `--allow-new` lets a branch that adds scenarios pass
+before their gas is recorded; a baseline entry with `gas: null` is NEW, so an
+unpopulated baseline fails the default gate. `--snapshot FILE` compares an
+existing `forge snapshot` output instead of running forge.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+PROTOCOL_DIR = ROOT / "protocol"
+DEFAULT_BASELINE = ROOT / "docs" / "reports" / "NADSWAP_V2_GAS_BASELINE.json"
+GAS_TEST_PATH = "test/gas/**"
+BASELINE_SCHEMA = 1
+DOCUMENT_SCHEMA = 1
+
+# `Contract:test_name() (gas: 123)`; fuzz lines (`runs:, μ:, ~:`) use the median.
+SNAPSHOT_RE = re.compile(r"^(?P<contract>\w+):(?P<test>\w+)\(\) \((?:gas: (?P<gas>\d+)|.*~: (?P<median>\d+))\)$")
+FAILING = ("REGRESSION", "MISSING", "NEW")
+
+
+def fail(msg):
+    print(f"[FAIL] {msg}")
+    sys.exit(1)
+
+
+def parse_snapshot(text: str):
+    """test name -> gas, from `forge snapshot` output."""
+    gas = {}
+    for line in text.splitlines():
+        m = SNAPSHOT_RE.match(line.strip())
+        if m:
+            gas[m.group("test")] = int(m.group("gas") or m.group("median"))
+    return gas
+
+
+def run_snapshot():
+    """Run `forge snapshot` on the gas scenarios; returns its output file text."""
+    with tempfile.TemporaryDirectory() as tmp:
+        snap = Path(tmp) / "gas-snapshot"
+        cmd = ["forge", "snapshot", "--match-path", GAS_TEST_PATH, "--snap", str(snap)]
+        print(f"[INFO] {' '.join(cmd)}")
+        try:
+            proc = subprocess.run(cmd, cwd=PROTOCOL_DIR, env=dict(os.environ), text=True,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as exc:
+            fail(f"forge snapshot failed to start: {exc}")
+        if proc.returncode != 0 or not snap.exists():
+            tail = "\n".join(proc.stdout.strip().splitlines()[-25:])
+            fail(f"forge snapshot exited {proc.returncode}\n{tail}")
+        return snap.read_text()
+
+
+def load_baseline(path: Path):
+    if not path.exists():
+        fail(f"missing gas baseline: {path}")
+    try:
+        baseline = json.loads(path.read_text())
+    except ValueError as exc:
+        fail(f"invalid gas baseline JSON ({path}): {exc}")
+    if baseline.get("schema") != BASELINE_SCHEMA:
+        fail(f"{path}: unsupported gas baseline schema {baseline.get('schema')}")
+    return baseline
+
+
+def compare(measured, baseline):
+    """One row per baselined or measured test, in baseline order."""
+    default_tolerance = baseline.get("default_tolerance_pct", 1.0)
+    functions = baseline["functions"]
+    rows = []
+    for name in list(functions) + sorted(set(measured) - set(functions)):
+        entry = functions.get(name, {})
+        gas, base = measured.get(name), entry.get("gas")
+        tolerance = entry.get("tolerance_pct", default_tolerance)
+        delta_pct = None
+        if gas is None:
+            status = "MISSING"
+        elif base is None:
+            status = "NEW"
+        else:
+            delta_pct = round((gas - base) * 100 / base, 3)
+            if delta_pct > tolerance:
+                status = "REGRESSION"
+            elif delta_pct < -tolerance:
+                status = "IMPROVED"
+            else:
+                status = "PASS"
+        rows.append({
+            "name": name,
+            "label": entry.get("label", name),
+            "gas": gas,
+            "baseline": base,
+            "delta_pct": delta_pct,
+            "tolerance_pct": tolerance,
+            "status": status,
+        })
+    return rows
+
+
+def update_baseline(path: Path, baseline, measured):
+    for name, gas in measured.items():
+        baseline["functions"].setdefault(name, {"label": name})["gas"] = gas
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+    print(f"[PASS] wrote {len(measured)} gas values to {path}")
+
+
+def print_report(rows):
+    print(f"\n  {'scenario':50s} {'gas':>9} {'baseline':>9} {'delta':>8} {'tol':>6}  status")
+    print("  " + "-" * 94)
+    for row in rows:
+        gas = "-" if row["gas"] is None else f"{row['gas']:,}"
+        base = "-" if row["baseline"] is None else f"{row['baseline']:,}"
+        delta = "-" if row["delta_pct"] is None else f"{row['delta_pct']:+.2f}%"
+        print(f"  {row['label']:50s} {gas:>9} {base:>9} {delta:>8} {row['tolerance_pct']:5.1f}%  {row['status']}")
+
+
+def run_gate(args):
+    baseline_path = Path(args.baseline)
+    if not baseline_path.is_absolute():
+        baseline_path = ROOT / baseline_path
+    baseline = load_baseline(baseline_path)
+    text = Path(args.snapshot).read_text() if args.snapshot else run_snapshot()
+    measured = parse_snapshot(text)
+    if not measured:
+        fail("gas snapshot contains no test results")
+
+    if args.update_baseline:
+        update_baseline(baseline_path, baseline, measured)
+        baseline = load_baseline(baseline_path)
+
+    rows = compare(measured, baseline)
+    print_report(rows)
+    counts = {status: sum(row["status"] == status for row in rows) for status in
+              ("PASS", "REGRESSION", "IMPROVED", "MISSING", "NEW")}
+    failing = [status for status in FAILING if not (status == "NEW" and args.allow_new)]
+    passed = not any(counts[status] for status in failing)
+
+    for row in rows:
+        if row["status"] == "IMPROVED":
+            print(f"[INFO] {row['name']}: {-row['delta_pct']:.2f}% below baseline; run --update-baseline to lock it in")
+    if counts["NEW"]:
+        print(f"[{'INFO' if args.allow_new else 'FAIL'}] {counts['NEW']} scenario(s) without baseline gas; "
+              f"run --update-baseline with forge and commit the baseline")
+    if passed:
+        print(f"[PASS] gas within tolerance for {counts['PASS'] + counts['IMPROVED']} scenario(s)"
+              f" ({counts['NEW']} without baseline)")
+    else:
+        print(f"[FAIL] {counts['REGRESSION']} gas regression(s), {counts['MISSING']} missing scenario(s), "
+              f"{counts['NEW']} without baseline")
+
+    try:
+        baseline_ref = baseline_path.relative_to(ROOT).as_posix()
+    except ValueError:
+        baseline_ref = baseline_path.as_posix()
+    return {
+        "schema": DOCUMENT_SCHEMA,
+        "passed": passed,
+        "allow_new": args.allow_new,
+        "baseline": baseline_ref,
+        "counts": counts,
+        "functions": rows,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gas snapshot regression gate for swap, claim and liquidity paths.")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Committed gas baseline JSON")
+    parser.add_argument("--snapshot", default=None, metavar="FILE",
+                        help="Compare this `forge snapshot` output instead of running forge")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the measured gas into the baseline (labels and tolerances are kept)")
+    parser.add_argument("--allow-new", action="store_true",
+                        help="Do not fail on scenarios without baseline gas (NEW)")
+    parser.add_argument(
+        "--json",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        default=None,
+        help="Write the result document as JSON to FILE (stdout if omitted; the report goes to stderr)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.json is None:
+        return 0 if run_gate(args)["passed"] else 1
+    if args.json == "-":
+        with contextlib.redirect_stdout(sys.stderr):
+            document = run_gate(args)
+        print(json.dumps(document, indent=2))
+    else:
+        document = run_gate(args)
+        Path(args.json).write_text(json.dumps(document, indent=2) + "\n")
+        print(f"\n  Result document written to {args.json}")
+    return 0 if document["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
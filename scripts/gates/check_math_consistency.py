@@ -16,11 +16,64 @@ NadSwap V2 — Library↔Pair Math Consistency Deep Verification
   - 오차 범위 (±N wei)
 """
 
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Tuple
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_FUZZ_OUT = ROOT / "fuzz-logs" / "math"
+DEFAULT_SEQUENCE_OUT = ROOT / "fuzz-logs" / "sequence"
+RESULT_SCHEMA = 1  # version of the `--json` / `gate_document` result document
 
 BPS = 10_000
+UINT112_MAX = 2**112 - 1   # _update reserve bound
+UINT256_MAX = 2**256 - 1   # K_MULTIPLY_OVERFLOW bound
+
+# ─── Integer backend ───
+# The kernels below only use + - * // and comparisons, so they run unchanged
+# on any int-like type. `lift` converts inputs at the entry points (grid
+# cells, domain samples, benchmark vectors); outputs compare equal to Python
+# ints, and anything serialized goes back through int().
+
+def _available_backends() -> dict:
+    backends = {"int": int}
+    try:
+        import gmpy2
+    except ImportError:
+        pass
+    else:
+        backends["gmpy2"] = gmpy2.mpz
+    return backends
+
+
+BACKENDS = _available_backends()
+backend = "int"
+
+
+def set_backend(name: str) -> str:
+    """Select the integer type `lift` produces; "auto" prefers gmpy2."""
+    global backend
+    if name == "auto":
+        name = "gmpy2" if "gmpy2" in BACKENDS else "int"
+    if name not in BACKENDS:
+        raise ValueError(f"integer backend {name!r} unavailable (have: {', '.join(BACKENDS)})")
+    backend = name
+    return name
+
+
+def lift(value: int):
+    return BACKENDS[backend](value)
+
 
 # ─── V2 AMM Core Functions (998/1000 = 0.2% LP fee) ───
 
@@ -85,6 +138,12 @@ class PairState:
     sellTax: int
     isQuote0: bool     # True if token0=Quote
 
+
+def lift_state(state):
+    """Copy of a PairState / LeanPairState with its integers on the current backend."""
+    return type(state)(lift(state.rQuote), lift(state.rBase), lift(state.vault),
+                       lift(state.buyTax), lift(state.sellTax), state.isQuote0)
+
 def pair_swap_buy(state: PairState, rawQuoteIn: int, baseOut: int) -> dict:
     """Simulate buy swap: user sends rawQuoteIn Quote, receives baseOut Base"""
     # token-space reserves and net outputs
@@ -139,9 +198,14 @@ def pair_swap_buy(state: PairState, rawQuoteIn: int, baseOut: int) -> dict:
     # Step 11: K-invariant
     adj0 = eff0 * 1000 - effIn0 * 2
     adj1 = eff1 * 1000 - effIn1 * 2
+    if adj0 > 0:
+        assert adj1 <= UINT256_MAX // adj0, "K_MULTIPLY_OVERFLOW"
     k_new = adj0 * adj1
     k_old = r0 * r1 * (1000 ** 2)
 
+    # _update runs only once K holds
+    assert k_new < k_old or (eff0 <= UINT112_MAX and eff1 <= UINT112_MAX), "UniswapV2: OVERFLOW"
+
     eff_quote = eff0 if state.isQuote0 else eff1
     eff_base = eff1 if state.isQuote0 else eff0
     effIn_quote = effIn0 if state.isQuote0 else effIn1
@@ -225,9 +289,14 @@ def pair_swap_sell(state: PairState, baseIn: int, netQuoteOut: int) -> dict:
     # Step 11: K
     adj0 = eff0 * 1000 - effIn0 * 2
     adj1 = eff1 * 1000 - effIn1 * 2
+    if adj0 > 0:
+        assert adj1 <= UINT256_MAX // adj0, "K_MULTIPLY_OVERFLOW"
     k_new = adj0 * adj1
     k_old = r0 * r1 * (1000 ** 2)
 
+    # _update runs only once K holds
+    assert k_new < k_old or (eff0 <= UINT112_MAX and eff1 <= UINT112_MAX), "UniswapV2: OVERFLOW"
+
     eff_quote = eff0 if state.isQuote0 else eff1
     eff_base = eff1 if state.isQuote0 else eff0
     effIn_quote = effIn0 if state.isQuote0 else effIn1
@@ -248,6 +317,104 @@ def pair_swap_sell(state: PairState, baseIn: int, netQuoteOut: int) -> dict:
     }
 
 
+# ─── Lean Pair Kernel ───
+# Same arithmetic as pair_swap_buy/pair_swap_sell, evaluated directly in
+# quote/base space (the swap math is symmetric under isQuote0) and returning a
+# plain tuple in the key order of the dict variants:
+#   tuple(pair_swap_buy(s, a, b).values()) == pair_swap_buy_lean(s, a, b)
+
+BUY_FIELDS = ("quoteTaxIn", "quoteTaxOut", "effIn_quote", "effIn_base", "newVault",
+              "k_new", "k_old", "k_pass", "eff_quote", "eff_base")
+SELL_FIELDS = ("quoteTaxIn", "quoteTaxOut", "grossQuoteOut", "effIn_quote", "effIn_base", "newVault",
+               "k_new", "k_old", "k_pass", "eff_quote", "eff_base")
+VAULT_MAX = 2**96 - 1
+
+
+class LeanPairState:
+    """`PairState` without the dataclass machinery or per-instance dict."""
+
+    __slots__ = ("rQuote", "rBase", "vault", "buyTax", "sellTax", "isQuote0")
+
+    def __init__(self, rQuote: int, rBase: int, vault: int, buyTax: int, sellTax: int, isQuote0: bool):
+        self.rQuote = rQuote
+        self.rBase = rBase
+        self.vault = vault
+        self.buyTax = buyTax
+        self.sellTax = sellTax
+        self.isQuote0 = isQuote0
+
+    @classmethod
+    def from_state(cls, state: PairState) -> "LeanPairState":
+        return cls(state.rQuote, state.rBase, state.vault, state.buyTax, state.sellTax, state.isQuote0)
+
+
+def pair_swap_buy_lean(state, rawQuoteIn: int, baseOut: int) -> tuple:
+    """`pair_swap_buy` as a BUY_FIELDS tuple. Accepts PairState or LeanPairState."""
+    rQuote = state.rQuote
+    rBase = state.rBase
+    vault = state.vault
+    baseTarget = rBase - baseOut
+
+    # Steps 5-6: quote side carries the vault, base side is paid out
+    effQuoteOld = rQuote + rawQuoteIn
+    effBase = baseTarget
+    actualInQuote = effQuoteOld - rQuote if effQuoteOld > rQuote else 0
+    assert actualInQuote > 0 or effBase > baseTarget, "INSUFFICIENT_INPUT"
+
+    # Steps 8-9: no sell tax on the buy path
+    quoteTaxIn = actualInQuote * state.buyTax // BPS if actualInQuote > 0 and baseOut > 0 else 0
+    newVault = vault + quoteTaxIn
+    assert newVault <= VAULT_MAX, "VAULT_OVERFLOW"
+
+    # Steps 10-11
+    effQuote = effQuoteOld - quoteTaxIn
+    effInQuote = effQuote - rQuote if effQuote > rQuote else 0
+    effInBase = effBase - baseTarget if effBase > baseTarget else 0
+    k_new = (effQuote * 1000 - effInQuote * 2) * (effBase * 1000 - effInBase * 2)
+    assert k_new <= UINT256_MAX, "K_MULTIPLY_OVERFLOW"
+    k_old = rQuote * rBase * 1_000_000
+    assert k_new < k_old or (effQuote <= UINT112_MAX and effBase <= UINT112_MAX), "UniswapV2: OVERFLOW"
+    return (quoteTaxIn, 0, effInQuote, effInBase, newVault, k_new, k_old, k_new >= k_old, effQuote, effBase)
+
+
+def pair_swap_sell_lean(state, baseIn: int, netQuoteOut: int) -> tuple:
+    """`pair_swap_sell` as a SELL_FIELDS tuple. Accepts PairState or LeanPairState."""
+    rQuote = state.rQuote
+    rBase = state.rBase
+    vault = state.vault
+
+    # Step 7: gross-up of the quote output
+    grossQuoteOut = netQuoteOut
+    quoteTaxOut = 0
+    if netQuoteOut > 0:
+        den = BPS - state.sellTax
+        grossQuoteOut = (netQuoteOut * BPS + den - 1) // den
+        quoteTaxOut = grossQuoteOut - netQuoteOut
+        assert grossQuoteOut < rQuote, f"INSUFFICIENT_LIQUIDITY_GROSS: {grossQuoteOut} >= {rQuote}"
+
+    # Steps 5-6, 8-a
+    effQuoteOld = rQuote - netQuoteOut
+    effBase = rBase + baseIn
+    netTarget = rQuote - netQuoteOut
+    assert effQuoteOld > netTarget or effBase > rBase, "INSUFFICIENT_INPUT"
+
+    # Step 9: buy tax never applies on the sell path (baseOut == 0)
+    newVault = vault + quoteTaxOut
+    assert newVault <= VAULT_MAX, "VAULT_OVERFLOW"
+
+    # Steps 10-11
+    grossTarget = rQuote - grossQuoteOut
+    effQuote = effQuoteOld - quoteTaxOut
+    effInQuote = effQuote - grossTarget if effQuote > grossTarget else 0
+    effInBase = effBase - rBase if effBase > rBase else 0
+    k_new = (effQuote * 1000 - effInQuote * 2) * (effBase * 1000 - effInBase * 2)
+    assert k_new <= UINT256_MAX, "K_MULTIPLY_OVERFLOW"
+    k_old = rQuote * rBase * 1_000_000
+    assert k_new < k_old or (effQuote <= UINT112_MAX and effBase <= UINT112_MAX), "UniswapV2: OVERFLOW"
+    return (0, quoteTaxOut, grossQuoteOut, effInQuote, effInBase, newVault, k_new, k_old, k_new >= k_old,
+            effQuote, effBase)
+
+
 # ─── Test Vectors ───
 
 RESERVES = [
@@ -273,204 +440,539 @@ AMOUNTS_FACTOR = [0.001, 0.01, 0.05, 0.1, 0.3]  # fraction of reserve
 
 # ─── Verification Engine ───
 
+# Failure capture: `errors` keeps the first lines (grid order), `examples` a
+# seeded uniform reservoir over all failures, `signatures` a count per
+# (direction, tax class, reserve bucket); an optional JSONL `spill` gets
+# every raw failure. Memory is bounded by these sizes, not by failure volume.
+DEFAULT_MAX_ERRORS = 1000
+FAILURE_RESERVOIR = 32
+NO_SIGNATURE = ("-", "-")
+
+
+def tax_class(buyTax: int, sellTax: int) -> str:
+    """Decade bucket per side: 0, 1e0 (1-9 bps), 1e1, 1e2, 1e3 (1000-2000 bps)."""
+    bucket = lambda t: "0" if t == 0 else f"1e{len(str(t)) - 1}"
+    return f"{bucket(buyTax)}/{bucket(sellTax)}"
+
+
+def reserve_bucket(rQuote: int, rBase: int) -> str:
+    """Byte-wide log2 bucket per side, e.g. 2^56/2^64."""
+    bucket = lambda r: f"2^{r.bit_length() // 8 * 8}"
+    return f"{bucket(rQuote)}/{bucket(rBase)}"
+
+
+def failure_signature(rQuote: int, rBase: int, buyTax: int, sellTax: int) -> Tuple[str, str]:
+    return tax_class(buyTax, sellTax), reserve_bucket(rQuote, rBase)
+
+
 class Results:
-    def __init__(self):
+    def __init__(self, max_errors=DEFAULT_MAX_ERRORS, reservoir: int = FAILURE_RESERVOIR, spill=None):
         self.total = 0
         self.passed = 0
         self.failed = 0
         self.errors = []
+        self.max_errors = max_errors  # None keeps every failure line
         self.max_error_wei = {}  # direction -> max wei error
-
-    def record(self, direction: str, success: bool, error_wei: int = 0, detail: str = ""):
+        self.by_direction = {}  # direction -> [total, failed]
+        self.signatures = {}  # (direction, tax class, reserve bucket) -> failures
+        self.examples = []  # reservoir of failure lines
+        self.reservoir = reservoir
+        self.offered = 0  # failure lines offered to the reservoir
+        self.spill = spill  # text file receiving one JSON line per failure
+        self._rng = random.Random(0)
+
+    def _keep_errors(self, lines):
+        if self.max_errors is None:
+            self.errors.extend(lines)
+            return
+        room = self.max_errors - len(self.errors)
+        if room > 0:
+            self.errors.extend(list(lines)[:room])
+
+    def _bump_max(self, direction: str, error_wei: int):
+        if direction not in self.max_error_wei:
+            self.max_error_wei[direction] = 0
+        self.max_error_wei[direction] = max(self.max_error_wei[direction], int(abs(error_wei)))
+
+    def _count(self, direction: str, total: int, failed: int):
+        counts = self.by_direction.setdefault(direction, [0, 0])
+        counts[0] += total
+        counts[1] += failed
+
+    def _sign(self, direction: str, signature, count: int = 1):
+        key = (direction, *signature)
+        self.signatures[key] = self.signatures.get(key, 0) + count
+
+    def _capture(self, direction: str, signature, detail: str, error_wei=None):
+        line = f"  [{direction}] {detail}"
+        self._keep_errors([line])
+        # Algorithm R: every failure line ends up in `examples` with equal odds.
+        self.offered += 1
+        if len(self.examples) < self.reservoir:
+            self.examples.append(line)
+        else:
+            slot = self._rng.randrange(self.offered)
+            if slot < self.reservoir:
+                self.examples[slot] = line
+        if self.spill is not None:
+            self.spill.write(json.dumps({
+                "direction": direction,
+                "tax_class": signature[0],
+                "reserve_bucket": signature[1],
+                "error_wei": None if error_wei is None else int(error_wei),
+                "detail": detail,
+            }) + "\n")
+
+    def record(self, direction: str, success: bool, error_wei: int = 0, detail: str = "",
+               signature: Tuple[str, str] = NO_SIGNATURE):
         self.total += 1
         if success:
             self.passed += 1
         else:
             self.failed += 1
-            self.errors.append(f"  [{direction}] {detail}")
-        if direction not in self.max_error_wei:
-            self.max_error_wei[direction] = 0
-        self.max_error_wei[direction] = max(self.max_error_wei[direction], abs(error_wei))
-
-
-def run_verification():
-    results = Results()
-
-    for rQuote, rBase in RESERVES:
-        for buyTax, sellTax in TAXES:
-            for isQuote0 in [True, False]:
-                quote_side = "token0" if isQuote0 else "token1"
-                state = PairState(
-                    rQuote=rQuote,
-                    rBase=rBase,
-                    vault=0,
-                    buyTax=buyTax,
-                    sellTax=sellTax,
-                    isQuote0=isQuote0,
-                )
-
-                for frac in AMOUNTS_FACTOR:
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    # Direction 1: 매수 exact-in (Quote→Base)
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    rawQuoteIn = max(1, int(rQuote * frac))
-                    try:
-                        lib_tax, lib_effIn, lib_baseOut = library_getAmountsOut_buy(
-                            rawQuoteIn, buyTax, rQuote, rBase)
-
-                        if lib_baseOut > 0 and lib_baseOut < rBase:
-                            pair_result = pair_swap_buy(state, rawQuoteIn, lib_baseOut)
-
-                            # Check 1: Tax matches
-                            tax_match = pair_result["quoteTaxIn"] == lib_tax
-                            # Check 2: K passes
-                            k_pass = pair_result["k_pass"]
-                            # Check 3: effIn matches
-                            effIn_diff = abs(pair_result["effIn_quote"] - lib_effIn)
-
-                            success = tax_match and k_pass
-                            results.record(f"buy_exact_in/{quote_side}", success, effIn_diff,
-                                f"side={quote_side} rQ={rQuote} rB={rBase} in={rawQuoteIn} tax=({buyTax},{sellTax}) "
-                                f"lib_tax={lib_tax} pair_tax={pair_result['quoteTaxIn']} "
-                                f"effDiff={effIn_diff} K={'✓' if k_pass else '✗'}")
-                    except (AssertionError, ZeroDivisionError):
-                        pass  # Skip invalid combos
-
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    # Direction 2: 매도 exact-in (Base→Quote)
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    baseIn = max(1, int(rBase * frac))
-                    try:
-                        lib_grossOut, lib_taxOut, lib_netOut = library_getAmountsOut_sell(
-                            baseIn, sellTax, rBase, rQuote)
-
-                        if lib_netOut > 0 and lib_grossOut < rQuote:
-                            pair_result = pair_swap_sell(state, baseIn, lib_netOut)
-
-                            # grossOut divergence (floor→ceil roundtrip)
-                            gross_diff = pair_result["grossQuoteOut"] - lib_grossOut
-                            tax_diff = pair_result["quoteTaxOut"] - lib_taxOut
-                            k_pass = pair_result["k_pass"]
-
-                            success = k_pass and abs(gross_diff) <= 1
-                            results.record(f"sell_exact_in/{quote_side}", success, gross_diff,
-                                f"side={quote_side} rQ={rQuote} rB={rBase} in={baseIn} tax=({buyTax},{sellTax}) "
-                                f"lib_gross={lib_grossOut} pair_gross={pair_result['grossQuoteOut']} "
-                                f"diff={gross_diff} taxDiff={tax_diff} K={'✓' if k_pass else '✗'}")
-                    except (AssertionError, ZeroDivisionError):
-                        pass
+            self._sign(direction, signature)
+            self._capture(direction, signature, detail, error_wei)
+        self._count(direction, 1, 0 if success else 1)
+        self._bump_max(direction, error_wei)
+
+    def record_many(self, direction: str, total: int, failed: int, max_error_wei: int, failures=()):
+        """Record an aggregated block of vectors (batch engine). `failures`
+        yields (signature, detail) pairs and is consumed lazily; failures it
+        does not enumerate are counted under NO_SIGNATURE."""
+        self.total += total
+        self.passed += total - failed
+        self.failed += failed
+        listed = 0
+        for signature, detail in failures:
+            listed += 1
+            self._sign(direction, signature)
+            self._capture(direction, signature, detail)
+        if failed > listed:
+            self._sign(direction, NO_SIGNATURE, failed - listed)
+        self._count(direction, total, failed)
+        self._bump_max(direction, max_error_wei)
+
+    def merge(self, other: "Results"):
+        """Fold another accumulator into this one. Merging shards in grid order
+        reproduces the serial totals, max errors, signature counts and
+        failure-line order; the reservoirs are combined by weight."""
+        self.total += other.total
+        self.passed += other.passed
+        self.failed += other.failed
+        self._keep_errors(other.errors)
+        for direction, (total, failed) in other.by_direction.items():
+            self._count(direction, total, failed)
+        for direction, err in other.max_error_wei.items():
+            self._bump_max(direction, err)
+        for key, count in other.signatures.items():
+            self.signatures[key] = self.signatures.get(key, 0) + count
+        self._merge_examples(other)
+        return self
+
+    def _merge_examples(self, other: "Results"):
+        mine, theirs = self.offered, other.offered
+        pool = self.examples + other.examples
+        if len(pool) > self.reservoir:
+            # Each slot comes from either side in proportion to what it saw.
+            take = 0
+            for i in range(self.reservoir):
+                if self._rng.randrange(mine + theirs - i) < mine - take:
+                    take += 1
+            pool = (self._rng.sample(self.examples, take)
+                    + self._rng.sample(other.examples, self.reservoir - take))
+        self.examples = pool
+        self.offered = mine + theirs
+
+    def top_signatures(self, n: int = 10):
+        """The `n` most frequent failure signatures, most frequent first."""
+        ranked = sorted(self.signatures.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {"direction": d, "tax_class": t, "reserve_bucket": r, "failed": count}
+            for (d, t, r), count in ranked[:n]
+        ]
+
+    def to_dict(self, errors: int = 10) -> dict:
+        """JSON-ready summary: totals, per-direction counts and max wei error,
+        the first `errors` failure lines, the top failure signatures and
+        `errors` reservoir examples."""
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "failed": self.failed,
+            "directions": {
+                direction: {
+                    "total": self.by_direction.get(direction, [0, 0])[0],
+                    "failed": self.by_direction.get(direction, [0, 0])[1],
+                    "max_error_wei": self.max_error_wei.get(direction, 0),
+                }
+                for direction in sorted(set(self.by_direction) | set(self.max_error_wei))
+            },
+            "errors": [line.strip() for line in self.errors[:errors]],
+            "signatures": self.top_signatures(errors),
+            "examples": [line.strip() for line in self.examples[:errors]],
+        }
+
+
+def grid_cells():
+    """Grid cells in canonical `run_verification` order: RESERVES × TAXES × isQuote0."""
+    return [
+        (rQuote, rBase, buyTax, sellTax, isQuote0)
+        for rQuote, rBase in RESERVES
+        for buyTax, sellTax in TAXES
+        for isQuote0 in [True, False]
+    ]
 
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    # Direction 3: 매도 exact-out (Base→Quote)
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    netQuoteOut = max(1, int(rQuote * frac * (BPS - sellTax) // BPS))
-                    try:
-                        lib_grossOut, lib_taxOut, lib_baseIn = library_getAmountsIn_sell(
-                            netQuoteOut, sellTax, rBase, rQuote)
 
-                        if lib_grossOut < rQuote and lib_baseIn < rBase * 10:
-                            pair_result = pair_swap_sell(state, lib_baseIn, netQuoteOut)
+class Check(NamedTuple):
+    success: bool
+    error_wei: int
+    detail: str
+    failure: str  # "" on success, else the failed property (K, TAX_MISMATCH, ...)
+
+
+def _failure(k_pass: bool, *others: Tuple[bool, str]) -> str:
+    tags = [] if k_pass else ["K"]
+    tags.extend(tag for ok, tag in others if not ok)
+    return "+".join(tags)
+
+
+def check_buy_exact_in(state: PairState, rawQuoteIn: int) -> Optional[Check]:
+    """Direction 1: 매수 exact-in (Quote→Base). None when the vector is not legal."""
+    rQuote, rBase, buyTax, sellTax = state.rQuote, state.rBase, state.buyTax, state.sellTax
+    quote_side = "token0" if state.isQuote0 else "token1"
+    try:
+        lib_tax, lib_effIn, lib_baseOut = library_getAmountsOut_buy(
+            rawQuoteIn, buyTax, rQuote, rBase)
+
+        if lib_baseOut > 0 and lib_baseOut < rBase:
+            pair_result = pair_swap_buy(state, rawQuoteIn, lib_baseOut)
+
+            # Check 1: Tax matches
+            tax_match = pair_result["quoteTaxIn"] == lib_tax
+            # Check 2: K passes
+            k_pass = pair_result["k_pass"]
+            # Check 3: effIn matches
+            effIn_diff = abs(pair_result["effIn_quote"] - lib_effIn)
+
+            success = tax_match and k_pass
+            return Check(success, effIn_diff,
+                f"side={quote_side} rQ={rQuote} rB={rBase} in={rawQuoteIn} tax=({buyTax},{sellTax}) "
+                f"lib_tax={lib_tax} pair_tax={pair_result['quoteTaxIn']} "
+                f"effDiff={effIn_diff} K={'✓' if k_pass else '✗'}",
+                _failure(k_pass, (tax_match, "TAX_MISMATCH")))
+    except (AssertionError, ZeroDivisionError):
+        pass  # Skip invalid combos
+    return None
+
+
+def check_sell_exact_in(state: PairState, baseIn: int) -> Optional[Check]:
+    """Direction 2: 매도 exact-in (Base→Quote)."""
+    rQuote, rBase, buyTax, sellTax = state.rQuote, state.rBase, state.buyTax, state.sellTax
+    quote_side = "token0" if state.isQuote0 else "token1"
+    try:
+        lib_grossOut, lib_taxOut, lib_netOut = library_getAmountsOut_sell(
+            baseIn, sellTax, rBase, rQuote)
+
+        if lib_netOut > 0 and lib_grossOut < rQuote:
+            pair_result = pair_swap_sell(state, baseIn, lib_netOut)
+
+            # grossOut divergence (floor→ceil roundtrip)
+            gross_diff = pair_result["grossQuoteOut"] - lib_grossOut
+            tax_diff = pair_result["quoteTaxOut"] - lib_taxOut
+            k_pass = pair_result["k_pass"]
+
+            success = k_pass and abs(gross_diff) <= 1
+            return Check(success, gross_diff,
+                f"side={quote_side} rQ={rQuote} rB={rBase} in={baseIn} tax=({buyTax},{sellTax}) "
+                f"lib_gross={lib_grossOut} pair_gross={pair_result['grossQuoteOut']} "
+                f"diff={gross_diff} taxDiff={tax_diff} K={'✓' if k_pass else '✗'}",
+                _failure(k_pass, (abs(gross_diff) <= 1, "GROSS_DIVERGENCE")))
+    except (AssertionError, ZeroDivisionError):
+        pass
+    return None
+
+
+def check_sell_exact_out(state: PairState, netQuoteOut: int) -> Optional[Check]:
+    """Direction 3: 매도 exact-out (Base→Quote)."""
+    rQuote, rBase, buyTax, sellTax = state.rQuote, state.rBase, state.buyTax, state.sellTax
+    quote_side = "token0" if state.isQuote0 else "token1"
+    try:
+        lib_grossOut, lib_taxOut, lib_baseIn = library_getAmountsIn_sell(
+            netQuoteOut, sellTax, rBase, rQuote)
+
+        if lib_grossOut < rQuote and lib_baseIn < rBase * 10:
+            pair_result = pair_swap_sell(state, lib_baseIn, netQuoteOut)
+
+            gross_match = pair_result["grossQuoteOut"] == lib_grossOut
+            k_pass = pair_result["k_pass"]
+
+            success = gross_match and k_pass
+            return Check(success, 0 if gross_match else 1,
+                f"side={quote_side} rQ={rQuote} rB={rBase} netOut={netQuoteOut} tax=({buyTax},{sellTax}) "
+                f"lib_gross={lib_grossOut} pair_gross={pair_result['grossQuoteOut']} "
+                f"K={'✓' if k_pass else '✗'}",
+                _failure(k_pass, (gross_match, "GROSS_MISMATCH")))
+    except (AssertionError, ZeroDivisionError):
+        pass
+    return None
+
+
+def check_buy_exact_out(state: PairState, baseOut: int) -> Optional[Check]:
+    """Direction 4: 매수 exact-out (Quote→Base)."""
+    rQuote, rBase, buyTax, sellTax = state.rQuote, state.rBase, state.buyTax, state.sellTax
+    quote_side = "token0" if state.isQuote0 else "token1"
+    try:
+        lib_netIn, lib_tax, lib_rawIn = library_getAmountsIn_buy(
+            baseOut, buyTax, rQuote, rBase)
+
+        if baseOut < rBase and lib_rawIn > 0:
+            pair_result = pair_swap_buy(state, lib_rawIn, baseOut)
+
+            # Pair effIn should be >= lib_netIn (LP-favorable)
+            effIn_diff = pair_result["effIn_quote"] - lib_netIn
+            k_pass = pair_result["k_pass"]
+
+            success = k_pass and effIn_diff >= 0
+            return Check(success, effIn_diff,
+                f"side={quote_side} rQ={rQuote} rB={rBase} baseOut={baseOut} tax=({buyTax},{sellTax}) "
+                f"lib_netIn={lib_netIn} pair_effIn={pair_result['effIn_quote']} "
+                f"diff={effIn_diff} K={'✓' if k_pass else '✗'}",
+                _failure(k_pass, (effIn_diff >= 0, "EFFIN_UNDERPAY")))
+    except (AssertionError, ZeroDivisionError):
+        pass
+    return None
+
+
+DIRECTION_CHECKS = {
+    "buy_exact_in": check_buy_exact_in,
+    "sell_exact_in": check_sell_exact_in,
+    "sell_exact_out": check_sell_exact_out,
+    "buy_exact_out": check_buy_exact_out,
+}
+
+
+def verify_cell(results, rQuote: int, rBase: int, buyTax: int, sellTax: int, isQuote0: bool):
+    """Run all AMOUNTS_FACTOR vectors of one grid cell through the 4 directions."""
+    quote_side = "token0" if isQuote0 else "token1"
+    state = lift_state(PairState(
+        rQuote=rQuote,
+        rBase=rBase,
+        vault=0,
+        buyTax=buyTax,
+        sellTax=sellTax,
+        isQuote0=isQuote0,
+    ))
+
+    signature = failure_signature(rQuote, rBase, buyTax, sellTax)
+
+    for frac in AMOUNTS_FACTOR:
+        amounts = {
+            "buy_exact_in": max(1, int(rQuote * frac)),
+            "sell_exact_in": max(1, int(rBase * frac)),
+            "sell_exact_out": max(1, int(rQuote * frac * (BPS - sellTax) // BPS)),
+            "buy_exact_out": max(1, int(rBase * frac)),
+        }
+        for direction, check in DIRECTION_CHECKS.items():
+            outcome = check(state, lift(amounts[direction]))
+            if outcome is not None:
+                results.record(f"{direction}/{quote_side}", outcome.success, outcome.error_wei, outcome.detail,
+                               signature)
+
+
+def run_verification(cells=None, max_errors=DEFAULT_MAX_ERRORS, spill=None):
+    results = Results(max_errors, spill=spill)
+    for cell in grid_cells() if cells is None else cells:
+        verify_cell(results, *cell)
+    return results
 
-                            gross_match = pair_result["grossQuoteOut"] == lib_grossOut
-                            k_pass = pair_result["k_pass"]
 
-                            success = gross_match and k_pass
-                            results.record(f"sell_exact_out/{quote_side}", success, 0 if gross_match else 1,
-                                f"side={quote_side} rQ={rQuote} rB={rBase} netOut={netQuoteOut} tax=({buyTax},{sellTax}) "
-                                f"lib_gross={lib_grossOut} pair_gross={pair_result['grossQuoteOut']} "
-                                f"K={'✓' if k_pass else '✗'}")
-                    except (AssertionError, ZeroDivisionError):
-                        pass
+def _verify_shard(shard):
+    cells, max_errors, spill_path, backend_name = shard
+    set_backend(backend_name)
+    if spill_path is None:
+        return run_verification(cells, max_errors)
+    with open(spill_path, "w") as spill:
+        results = run_verification(cells, max_errors, spill)
+    results.spill = None  # file handles do not pickle
+    return results
 
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    # Direction 4: 매수 exact-out (Quote→Base)
-                    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-                    baseOut = max(1, int(rBase * frac))
-                    try:
-                        lib_netIn, lib_tax, lib_rawIn = library_getAmountsIn_buy(
-                            baseOut, buyTax, rQuote, rBase)
 
-                        if baseOut < rBase and lib_rawIn > 0:
-                            pair_result = pair_swap_buy(state, lib_rawIn, baseOut)
+def run_verification_parallel(workers: int = 0, max_errors: int = DEFAULT_MAX_ERRORS, spill=None):
+    """`run_verification` sharded across a process pool.
+
+    Cells are split into contiguous shards in canonical grid order and merged in
+    that same order, so totals, max errors and the leading failure lines match
+    the serial run exactly. Each worker keeps at most `max_errors` failure lines.
+    With `spill`, each shard streams its failures to a part file next to it and
+    the parts are appended to `spill` in grid order.
+    """
+    cells = grid_cells()
+    workers = workers or os.cpu_count() or 1
+    shard_size = max(1, -(-len(cells) // (workers * 4)))
+    parts = [None] * len(range(0, len(cells), shard_size))
+    if spill is not None:
+        parts = [f"{spill.name}.part{i:04d}" for i in range(len(parts))]
+    shards = [(cells[i:i + shard_size], max_errors, part, backend)
+              for i, part in zip(range(0, len(cells), shard_size), parts)]
+
+    results = Results(max_errors)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_verify_shard, shards):
+            results.merge(part)
+    if spill is not None:
+        for part in parts:
+            with open(part) as fh:
+                shutil.copyfileobj(fh, spill)
+            os.unlink(part)
+        results.spill = spill
+    return results
 
-                            # Pair effIn should be >= lib_netIn (LP-favorable)
-                            effIn_diff = pair_result["effIn_quote"] - lib_netIn
-                            k_pass = pair_result["k_pass"]
 
-                            success = k_pass and effIn_diff >= 0
-                            results.record(f"buy_exact_out/{quote_side}", success, effIn_diff,
-                                f"side={quote_side} rQ={rQuote} rB={rBase} baseOut={baseOut} tax=({buyTax},{sellTax}) "
-                                f"lib_netIn={lib_netIn} pair_effIn={pair_result['effIn_quote']} "
-                                f"diff={effIn_diff} K={'✓' if k_pass else '✗'}")
-                    except (AssertionError, ZeroDivisionError):
-                        pass
+def run_verification_batch(wide: bool = False, reserve_points: int = 48, fraction_points: int = 256, spill=None):
+    """`run_verification` grid (optionally widened) through the NumPy batch kernel."""
+    try:
+        import math_batch
+    except ImportError as exc:
+        print(f"[FAIL] batch engine unavailable ({exc}); install numpy or use --engine scalar")
+        sys.exit(1)
+
+    results = Results(spill=spill)
+    grids = [("default", [math_batch.build_grid(RESERVES, TAXES, AMOUNTS_FACTOR)])]
+    if wide:
+        grids.append(("wide", math_batch.wide_grid(reserve_points, fraction_points, TAXES)))
+
+    for name, batches in grids:
+        started = time.perf_counter()
+        vectors = fast_rows = exact_rows = 0
+        for batch in batches:
+            outcome = math_batch.evaluate(batch)
+            math_batch.fold_into(results, outcome)
+            vectors += len(batch) * len(math_batch.DIRECTIONS)
+            fast_rows += outcome.fast_rows
+            exact_rows += outcome.exact_rows
+        elapsed = time.perf_counter() - started
+        print(f"  [{name}] {vectors:,} vectors in {elapsed:.2f}s "
+              f"({vectors / max(elapsed, 1e-9):,.0f} vectors/s; "
+              f"int64 lane rows={fast_rows:,}, exact lane rows={exact_rows:,})")
 
     return results
 
 
 # ─── Boundary Tests (1 wei level) ───
 
-def run_boundary_tests():
-    results = Results()
+BOUNDARY_RESERVES = [(100_000, 1_000_000), (10**6, 10**12), (10**18, 10**18)]
+BOUNDARY_TAXES = [(1, 1), (300, 500), (2000, 2000)]
+ROUNDTRIP_MAX = 10**18
+
+
+def _sell_roundtrip(grossOut: int, sellTax: int) -> Tuple[int, int]:
+    netOut = grossOut * (BPS - sellTax) // BPS
+    return netOut, ceilDiv(netOut * BPS, BPS - sellTax)
+
+
+def run_boundary_tests(spill=None):
+    import math_boundary as mb
+
+    results = Results(spill=spill)
     
     print("\n" + "="*70)
-    print("  BOUNDARY TESTS — 1 wei 수준 경계값")
+    print("  BOUNDARY TESTS — 1 wei 수준 경계값 (bisection)")
     print("="*70)
 
-    # Test 1: Boundary where buy tax flips from 0 -> 1
-    for buyTax in [1, 100, 300, 2000]:
-        threshold = ceilDiv(BPS, buyTax)  # tax=0 for amt < threshold, tax>=1 for amt >= threshold
-        for amt in [threshold - 1, threshold, threshold + 1]:
-            if amt <= 0:
-                continue
-            tax = amt * buyTax // BPS
-            should_be_zero = amt < threshold
-            is_zero = tax == 0
+    # Test 1: Boundary where buy tax flips from 0 -> 1, located by bisection on the Pair
+    for rQ, rB in [(100_000, 1_000_000), (10**18, 10**18)]:
+        for buyTax in [1, 100, 300, 2000]:
+            model = mb.DirectionModel(PairState(rQ, rB, 0, buyTax, 0, True), "buy_exact_in")
+            lo, _ = mb.legal_range(model)
+            flip = mb.tax_flip(model)
+            lib_flip = mb.tax_flip(model, "lib_tax")
+            expected = max(lo, ceilDiv(BPS, buyTax))  # tax=0 below, >=1 from here
+            ok = flip == lib_flip == expected
             results.record(
                 "buy_tax_threshold",
-                is_zero == should_be_zero,
-                0 if is_zero == should_be_zero else 1,
-                f"buyTax={buyTax} amount={amt} threshold={threshold} tax={tax}",
-            )
-            print(f"  buyTax={buyTax:4d}bps  amount={amt:6d}  tax={tax:3d}  "
-                  f"{'⚠️ ZERO TAX' if tax == 0 else '✅ taxed'}")
-
-    # Test 2: Sell tax roundtrip (floor→ceil) directional bound
-    print(f"\n  {'grossOut':>10} {'sellTax':>8} {'netOut':>10} {'grossBack':>10} {'delta':>6}")
-    print("  " + "-"*50)
-    for grossOut in range(990, 1010):
-        for sellTax in [300, 500, 1000, 2000]:
-            netOut = grossOut * (BPS - sellTax) // BPS
-            grossBack = ceilDiv(netOut * BPS, BPS - sellTax)
-            diff = grossOut - grossBack
-            results.record(
-                "sell_roundtrip",
-                grossBack <= grossOut and diff <= 1,
-                diff,
-                f"gross={grossOut} tax={sellTax} net={netOut} back={grossBack}",
+                ok,
+                0 if ok else 1,
+                f"rQ={rQ} buyTax={buyTax} pair_flip={flip} lib_flip={lib_flip} expected={expected}",
             )
-            if diff != 0:
-                print(f"  {grossOut:10d} {sellTax:8d} {netOut:10d} {grossBack:10d} {diff:+6d}")
+            steps = mb.transitions(model.observable("pair_tax"), flip - 1, flip + 3 * ceilDiv(BPS, buyTax), 3)
+            print(f"  rQ={rQ:<20d} buyTax={buyTax:4d}bps  0→1 at amount={flip}  next steps={steps}  "
+                  f"{'✅' if ok else '❌'}")
+
+    # Test 2: Sell tax roundtrip (floor→ceil) delta boundaries up to 10**18
+    print(f"\n  {'grossOut':>20} {'sellTax':>8} {'delta':>12}")
+    print("  " + "-"*44)
+    located = 0
+    for sellTax in [300, 500, 1000, 2000]:
+        delta = lambda g, t=sellTax: g - _sell_roundtrip(g, t)[1]
+        for probe in mb.probes(ROUNDTRIP_MAX):
+            edge = mb.next_change(delta, probe, ROUNDTRIP_MAX)
+            if edge is None:
+                continue
+            located += 1
+            for grossOut in (edge - 1, edge):
+                netOut, grossBack = _sell_roundtrip(grossOut, sellTax)
+                diff = grossOut - grossBack
+                results.record(
+                    "sell_roundtrip",
+                    grossBack <= grossOut and diff <= 1,
+                    diff,
+                    f"gross={grossOut} tax={sellTax} net={netOut} back={grossBack}",
+                )
+            if probe in (1, 1000, ROUNDTRIP_MAX // 10):
+                print(f"  {edge:20d} {sellTax:8d} {delta(edge - 1):+5d} → {delta(edge):+d}")
+    print(f"  Roundtrip delta boundaries located: {located}")
 
     # Test 3: Buy rounding — Library vs Pair operation order (pre-M-1 vs post-M-1)
     print(f"\n  Old Library (mul-then-div) vs New Library (div-then-sub):")
-    print(f"  {'amount':>8} {'buyTax':>7} {'old_effIn':>10} {'new_effIn':>10} {'diff':>6}")
-    print("  " + "-"*50)
-    mismatches = 0
-    for amt in range(1, 200):
-        for buyTax in [300, 500, 1000, 2000]:
-            old_effIn = amt * (BPS - buyTax) // BPS       # OLD: mul then div
-            new_tax = amt * buyTax // BPS                  # NEW: div then sub
-            new_effIn = amt - new_tax
-            diff = new_effIn - old_effIn
-            if diff != 0:
-                mismatches += 1
-                if mismatches <= 20:  # Show first 20
-                    print(f"  {amt:8d} {buyTax:7d} {old_effIn:10d} {new_effIn:10d} {diff:+6d}")
-
-    print(f"\n  Total mismatches (old vs new Library): {mismatches} out of {200*4} test points")
+    print(f"  {'buyTax':>7} {'scale':>20} {'first mismatch':>20} {'old_effIn':>20} {'new_effIn':>20}")
+    print("  " + "-"*92)
+    for buyTax in [300, 500, 1000, 2000]:
+        old_effIn = lambda a, t=buyTax: a * (BPS - t) // BPS     # OLD: mul then div
+        new_effIn = lambda a, t=buyTax: a - a * t // BPS         # NEW: div then sub
+        diff = lambda a: new_effIn(a) - old_effIn(a)
+        for scale in (0, 10**9, ROUNDTRIP_MAX):
+            first = scale if diff(scale) else mb.next_change(diff, scale, 2 * ROUNDTRIP_MAX)
+            print(f"  {buyTax:7d} {scale:20d} {first:20d} {old_effIn(first):20d} {new_effIn(first):20d}")
     print(f"  M-1 fix eliminates these 1-wei underestimates ✅")
 
+    # Test 4: Per-direction Pair↔Library boundaries (tax flip, delta, K edge)
+    print(f"\n  {'direction':16s} {'flips':>6} {'deltas':>7} {'k_edges':>8} {'max slack':>10} {'calls/boundary':>15}")
+    print("  " + "-"*68)
+    for direction in mb.DIRECTIONS:
+        flips = deltas = edges = calls = max_slack = 0
+        for rQ, rB in BOUNDARY_RESERVES:
+            for buyTax, sellTax in BOUNDARY_TAXES:
+                for isQuote0 in [True, False]:
+                    state = PairState(rQ, rB, 0, buyTax, sellTax, isQuote0)
+                    model = mb.DirectionModel(state, direction)
+                    cell = f"side={'token0' if isQuote0 else 'token1'} rQ={rQ} rB={rB} tax=({buyTax},{sellTax})"
+
+                    flip, lib_flip = mb.tax_flip(model), mb.tax_flip(model, "lib_tax")
+                    results.record(f"tax_flip/{direction}", flip == lib_flip, 0 if flip == lib_flip else 1,
+                                   f"{cell} pair_flip={flip} lib_flip={lib_flip}")
+                    flips += 1
+
+                    for b in mb.delta_boundaries(model):
+                        ok = model.delta_ok(b.before) and model.delta_ok(b.after)
+                        results.record(f"delta/{direction}", ok, 0 if ok else 1,
+                                       f"{cell} amount={b.amount} delta {b.before}→{b.after}")
+                        deltas += 1
+
+                    for probe in mb.probes(model.hi):
+                        edge = mb.k_edge(model, probe)
+                        if edge is None:
+                            continue
+                        quoted_in, min_in = edge
+                        ok = min_in is not None and min_in <= quoted_in
+                        results.record(f"k_edge/{direction}", ok, 0 if ok else 1,
+                                       f"{cell} amount={probe} quoted_in={quoted_in} min_accepted={min_in}")
+                        if ok:
+                            max_slack = max(max_slack, quoted_in - min_in)
+                        edges += 1
+                    calls += model.calls
+        print(f"  {direction:16s} {flips:6d} {deltas:7d} {edges:8d} {max_slack:10d} "
+              f"{calls / max(1, flips + deltas + edges):15.1f}")
+
     return results
 
 
@@ -506,7 +1008,7 @@ def run_k_stress_test():
                                 failures += 1
                                 side = "token0" if isQuote0 else "token1"
                                 print(f"  ❌ K FAIL: side={side} rQ={rQ} rB={rB} in={amt} tax={buyTax}")
-                    except:
+                    except (AssertionError, ZeroDivisionError):
                         pass
 
     # Sequential swaps (vault accumulation)
@@ -537,17 +1039,45 @@ def run_k_stress_test():
                         rQ = result["eff_quote"]
                         rB = result["eff_base"]
                         vault = result["newVault"]
-            except:
+            except (AssertionError, ZeroDivisionError):
                 pass
 
     print(f"  Total K tests: {total}, Failures: {failures}")
     if failures == 0:
         print(f"  ✅ All K-invariant checks passed!")
-    return failures
+    return failures, total
 
 
 # ─── Vault Overflow Safety ───
 
+CHECK_ICONS = {"PASS": "✅", "FAIL": "❌", "WARN": "⚠️", "SKIP": "⏭️"}
+
+VAULT_SIM_SEED = 20_250_303
+VAULT_SIM_POOLS = 3_072
+VAULT_SIM_STEPS = 256
+# Report-only: the summary warns when the 1st-percentile pool of any decimals
+# group would fill uint96 in fewer years of unclaimed accrual. The estimate
+# moves with the simulated TVL and trade-size distribution and the seed, so
+# it does not gate; the margin is reported instead.
+VAULT_MIN_YEARS = 1.0
+
+
+def print_vault_report(report):
+    print(f"\n  {report.pools:,} pools × {report.steps:,} swaps = {report.swaps:,} swaps "
+          f"(claim every {report.claim_every or 'never'}, {report.elapsed_s:.1f}s, "
+          f"{report.swaps / max(report.elapsed_s, 1e-9):,.0f} swaps/s)")
+    print(f"\n  {'decimals':>8} {'pools':>7} {'high-water':>12} {'fill':>10} {'saturated':>9} "
+          f"{'reverts':>8} {'p01 years':>11} {'p50 years':>11}")
+    print("  " + "-"*84)
+    for g in report.groups:
+        row = g.to_dict(report.swaps_per_day)
+        years = lambda v: "-" if v is None else f"{v:11.3g}"
+        print(f"  {g.decimals:8d} {g.pools:7d} {g.high_water:12.3e} {g.high_water_fill:10.2e} "
+              f"{g.saturated_pools:9d} {g.vault_reverts:8d} {years(row['projected_saturation_p01_years']):>11} "
+              f"{years(row['projected_saturation_p50_years']):>11}")
+    print(f"  (years: unclaimed accrual to uint96 at {report.swaps_per_day:,.0f} swaps/day per pool)")
+
+
 def run_vault_overflow_test():
     print("\n" + "="*70)
     print("  VAULT OVERFLOW SAFETY (uint96)")
@@ -555,58 +1085,811 @@ def run_vault_overflow_test():
 
     uint96_max = 2**96 - 1
     print(f"  uint96 max = {uint96_max}")
-    print(f"  uint96 max = {uint96_max / 10**18:.2f} × 10¹⁸ (WETH units)")
-    print(f"  uint96 max = {uint96_max / 10**6:.2f} × 10⁶ (USDT units)")
-    
-    # How many max-tax swaps to overflow?
-    # Each swap at max tax (20%) on max reserve contributes at most ~20% of amountIn
-    # For WETH pair with 10^18 reserve, max tax per swap ≈ 0.2 * 10^18 = 2*10^17
-    max_tax_per_swap = int(10**18 * 0.2)
-    swaps_to_overflow = uint96_max // max_tax_per_swap
-    print(f"\n  Max tax per swap (20% of 10^18): {max_tax_per_swap}")
-    print(f"  Swaps to overflow uint96: {swaps_to_overflow:,}")
-    print(f"  At 1 swap/block, 2s blocks: {swaps_to_overflow * 2 / 86400 / 365:.0f} years")
-    print(f"  ✅ Overflow practically impossible (claim resets vault)")
+    for decimals in (6, 8, 18):
+        print(f"  uint96 max = {uint96_max / 10**decimals:.3e} whole tokens at {decimals} decimals")
+
+    try:
+        import math_vault
+    except ImportError as exc:
+        print(f"\n  ⚠️  accrual simulation skipped ({exc}); install numpy")
+        return {"uint96_max": uint96_max, "status": "SKIP", "skipped": str(exc),
+                "detail": f"not simulated ({exc})"}
+
+    report = math_vault.simulate(VAULT_SIM_SEED, VAULT_SIM_POOLS, VAULT_SIM_STEPS)
+    print_vault_report(report)
+    print(f"  VAULT_OVERFLOW reverts stop swaps until claimQuoteTax; see --vault-sim for claim cadences")
+
+    result = {"uint96_max": uint96_max, **report.to_dict()}
+    saturated = sum(g["saturated_pools"] for g in result["by_decimals"])
+    worst = min((g for g in result["by_decimals"] if g["projected_saturation_p01_years"] is not None),
+                key=lambda g: g["projected_saturation_p01_years"], default=None)
+    min_years = None if worst is None else worst["projected_saturation_p01_years"]
+    margin = None if min_years is None else min_years / VAULT_MIN_YEARS
+    status = "PASS" if saturated == 0 and (margin is None or margin >= 1) else "WARN"
+    if worst is None:
+        detail = f"{saturated} saturated pools, no taxed pools (report-only)"
+    else:
+        detail = (f"{saturated} saturated pools, p01 {min_years:.3g} years unclaimed at {worst['decimals']} decimals, "
+                  f"{margin:.3g}x the {VAULT_MIN_YEARS:g}-year threshold (report-only)")
+    print(f"  {CHECK_ICONS[status]} {detail}")
+    result.update(status=status, min_p01_years=min_years, margin=margin, detail=detail)
+    return result
 
 
 # ─── Multi-hop Error Accumulation ───
 
-def run_multihop_test():
+MULTIHOP_SEED = 20_250_301
+MULTIHOP_PATHS_PER_LENGTH = 500
+
+
+def run_multihop_test(seed: int = MULTIHOP_SEED, paths_per_length: int = MULTIHOP_PATHS_PER_LENGTH, spill=None):
+    import math_paths
+
     print("\n" + "="*70)
     print("  MULTI-HOP ERROR ACCUMULATION")
     print("="*70)
 
-    # A→B→C→D (3 hops) exact-in
-    reserves = [(100_000, 1_000_000), (500_000, 500_000), (200_000, 800_000)]
-    taxes = [(300, 500), (100, 200), (500, 300)]
-    
-    amountIn = 10_000
-    current = amountIn
-    cumulative_error = 0
-
-    print(f"\n  3-hop exact-in: {amountIn} starting")
-    for i, ((rIn, rOut), (buyTax, sellTax)) in enumerate(zip(reserves, taxes)):
-        # Assume alternating buy/sell
-        if i % 2 == 0:  # buy
-            tax = current * buyTax // BPS
-            effIn = current - tax
-            out = getAmountOut(effIn, rIn, rOut)
-        else:  # sell
-            grossOut = getAmountOut(current, rIn, rOut)
-            out = grossOut * (BPS - sellTax) // BPS
-        
-        print(f"  Hop {i}: in={current} → out={out} (tax={buyTax if i%2==0 else sellTax}bps)")
-        current = out
-
-    # Compare with single mega-calculation
-    print(f"  Final output: {current}")
-    print(f"  Max theoretical per-hop error: 1 wei × 3 hops = 3 wei")
-    print(f"  ✅ Multi-hop error bounded by N wei")
+    rng = random.Random(seed)
+    graph = math_paths.random_graph(rng)
+    print(f"\n  Graph: {len(graph.adjacency)} tokens, {len(graph.pools)} pools (seed={seed})")
+
+    # One worked example: per-hop Pair−Library error along a 4-token path
+    sample = None
+    while sample is None:
+        path = math_paths.random_path(graph, rng, 4)
+        if path is None:
+            continue
+        first = graph.pool(path[0], path[1]).reserves(path[0])[0]
+        try:
+            sample = math_paths.execute_path(graph, path, max(1, first // 100))
+        except math_paths.PathError:
+            pass
+    print(f"\n  {len(sample.path) - 1}-hop exact-in: {sample.amounts[0]} starting")
+    for i, hop in enumerate(sample.hops):
+        print(f"  Hop {i}: {hop.side:4s} in={hop.amountIn} → out={hop.amountOut} "
+              f"err={hop.error_wei:+d} cumulative={hop.cumulative_wei:+d} wei K={'✓' if hop.k_pass else '✗'}")
+
+    results = Results(spill=spill)
+    print(f"\n  {'mode':9s} {'len':>3} {'paths':>6} {'executed':>9} {'reverted':>9} {'fail':>5} "
+          f"{'max hop':>8} {'max drift':>10} {'paths/s':>9}")
+    print("  " + "-"*78)
+    for exact_out in (False, True):
+        mode = "exact-out" if exact_out else "exact-in"
+        for stats in math_paths.sweep(graph, rng, range(2, 7), paths_per_length, exact_out):
+            for report in stats.failures:
+                results.record(f"multihop/{mode}", False, report.drift_wei,
+                               f"path={report.path} amounts={report.amounts} {report.failure}")
+            ok = stats.executed - len(stats.failures)
+            results.record_many(f"multihop/{mode}", ok, 0, stats.max_hop_error_wei)
+            print(f"  {mode:9s} {stats.length:3d} {stats.paths:6d} {stats.executed:9d} {stats.quote_reverts:9d} "
+                  f"{len(stats.failures):5d} {stats.max_hop_error_wei:8d} {stats.max_drift_wei:10d} "
+                  f"{stats.paths_per_s:9,.0f}")
+
+    print(f"\n  Max per-hop error: {max(results.max_error_wei.values(), default=0)} wei")
+    if results.errors:
+        print(f"\n  ❌ Failed paths (first 10):")
+        for e in results.errors[:10]:
+            print(e)
+    else:
+        print(f"  ✅ Multi-hop error bounded by N wei")
+    return results
+
+
+# ─── Differential vector export ───
+
+# Fixed-width hex lines consumed by protocol/test/differential/PairVectorDifferential.t.sol.
+# Header: "NADSWAP-PAIR-VECTORS v1 <count>". Each vector line, by column:
+#   0 kind (B buy / S sell)  1 isQuote0  2 k_pass  3 buyTax(4)  7 sellTax(4)
+#   11 rQuote(28)  39 rBase(28)  67 vault(24)  91 amountIn(28)  119 amountOut(28)
+#   147 tax(24)  171 grossOut(28)  199 effIn(28)  227 eff_quote(28)  255 eff_base(28)
+# tax is quoteTaxIn (buy) / quoteTaxOut (sell); grossOut is baseOut (buy) /
+# grossQuoteOut (sell); effIn is effIn_quote (buy) / effIn_base (sell).
+VECTOR_HEADER = "NADSWAP-PAIR-VECTORS v1"
+VECTOR_LINE_WIDTH = 283
+VECTOR_SEED = 20_250_302
+
+
+def _log_uniform(rng, lo_bits: int, hi_bits: int) -> int:
+    bits = rng.randint(lo_bits, hi_bits)
+    return rng.randint(1 << (bits - 1), (1 << bits) - 1)
+
+
+def pair_vectors(seed: int):
+    """Endless stream of (kind, state, amountIn, amountOut, lean result) the
+    Pair can execute: Library-quoted swaps, a quarter with the output bumped
+    by one wei (mostly K failures). Vectors the kernel rejects before the K
+    check, or whose post-swap reserves exceed uint112, are skipped."""
+    rng = random.Random(seed)
+    taxes = (0, 1, 300, 1000, 2000)
+    while True:
+        rQuote, rBase = _log_uniform(rng, 10, 111), _log_uniform(rng, 10, 111)
+        vault = 0 if rng.random() < 0.5 else _log_uniform(rng, 1, 96)
+        buyTax = rng.choice(taxes + (rng.randint(0, 2000),))
+        sellTax = rng.choice(taxes + (rng.randint(0, 2000),))
+        state = LeanPairState(rQuote, rBase, vault, buyTax, sellTax, rng.random() < 0.5)
+        bump = rng.random() < 0.25
+        try:
+            if rng.random() < 0.5:
+                kind = "B"
+                amountIn = _log_uniform(rng, 1, min(111, rQuote.bit_length() + 2))
+                amountOut = library_getAmountsOut_buy(amountIn, buyTax, rQuote, rBase)[2] + bump
+                if not 0 < amountOut < rBase:
+                    continue
+                result = pair_swap_buy_lean(state, amountIn, amountOut)
+            else:
+                kind = "S"
+                amountIn = _log_uniform(rng, 1, min(111, rBase.bit_length() + 2))
+                amountOut = library_getAmountsOut_sell(amountIn, sellTax, rBase, rQuote)[2] + bump
+                if amountOut <= 0:
+                    continue
+                result = pair_swap_sell_lean(state, amountIn, amountOut)
+        except (AssertionError, ZeroDivisionError):
+            continue
+        if kind == "B" and (amountIn > UINT112_MAX or result[8] > UINT112_MAX or result[9] > UINT112_MAX):
+            continue
+        if kind == "S" and (amountIn > UINT112_MAX or result[9] > UINT112_MAX or result[10] > UINT112_MAX):
+            continue
+        yield kind, state, amountIn, amountOut, result
+
+
+def format_vector(kind: str, state, amountIn: int, amountOut: int, result: tuple) -> str:
+    if kind == "B":
+        tax, gross, effIn, k_pass, effQ, effB = result[0], amountOut, result[2], result[7], result[8], result[9]
+    else:
+        tax, gross, effIn, k_pass, effQ, effB = result[1], result[2], result[4], result[8], result[9], result[10]
+    return (f"{kind}{int(state.isQuote0)}{int(k_pass)}{state.buyTax:04x}{state.sellTax:04x}"
+            f"{state.rQuote:028x}{state.rBase:028x}{state.vault:024x}{amountIn:028x}{amountOut:028x}"
+            f"{tax:024x}{gross:028x}{effIn:028x}{effQ:028x}{effB:028x}")
+
+
+def export_vectors(path: Path, count: int, seed: int = VECTOR_SEED) -> Tuple[int, int]:
+    """Stream `count` vectors to `path`; returns (k_pass, k_fail) counts."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    passed = 0
+    with open(path, "w", buffering=1 << 20) as fh:
+        fh.write(f"{VECTOR_HEADER} {count}\n")
+        stream = pair_vectors(seed)
+        for _ in range(count):
+            vector = next(stream)
+            line = format_vector(*vector)
+            assert len(line) == VECTOR_LINE_WIDTH, line
+            passed += line[2] == "1"
+            fh.write(line + "\n")
+    return passed, count - passed
 
 
 # ─── Main ───
 
-def main():
+def run_exhaustive_mode(bound: int, workers: int) -> int:
+    try:
+        import math_exhaustive
+    except ImportError as exc:
+        print(f"[FAIL] exhaustive mode unavailable ({exc}); install numpy")
+        return 1
+
+    print("="*70)
+    print(f"  EXHAUSTIVE SMALL-DOMAIN ENUMERATION (reserves ≤ {bound}, tax 0..{math_exhaustive.MAX_TAX_BPS} bps)")
+    print("="*70)
+
+    results, evaluations, elapsed = math_exhaustive.run_exhaustive(bound, workers)
+    print(f"\n  Results: {results.total} tests, {results.passed} passed, {results.failed} failed")
+    print(f"  Kernel evaluations: {evaluations:,} (equivalence classes, tax axis folded)")
+    print(f"  Elapsed: {elapsed:.1f}s — {results.total / max(elapsed, 1e-9):,.0f} vectors/s, "
+          f"{evaluations / max(elapsed, 1e-9):,.0f} evaluations/s")
+
+    print(f"\n  Max error per direction:")
+    for direction, max_err in sorted(results.max_error_wei.items()):
+        status = "✅" if max_err <= 1 else "❌"
+        print(f"    {direction:28s}: {max_err} wei {status}")
+
+    if results.errors:
+        print(f"\n  ❌ Failed cases (first 10):")
+        for e in results.errors[:10]:
+            print(e)
+
+    all_pass = results.failed == 0 and all(v <= 1 for v in results.max_error_wei.values())
+    print(f"\n  {'🎉 ALL CHECKS PASSED' if all_pass else '⚠️ SOME CHECKS FAILED'}")
+    return 0 if all_pass else 1
+
+
+def run_fuzz_mode(seconds: float, seed, out_dir: str) -> int:
+    import math_fuzz
+
+    if seed is None:
+        seed = int.from_bytes(os.urandom(8), "big")
+    out_path = Path(out_dir)
+    if not out_path.is_absolute():
+        out_path = ROOT / out_path
+
+    print("="*70)
+    print(f"  PROPERTY FUZZ (uint112 log-uniform, seed={seed}, budget={seconds:g}s)")
+    print("="*70)
+
+    report = math_fuzz.run_fuzz(seed, seconds, out_path)
+    print(f"\n  Samples: {report.samples:,} states, {report.vectors:,} vectors "
+          f"({report.skipped:,} not legal), {report.elapsed_s:.1f}s")
+    print(f"  Throughput: {report.vectors_per_s:,.0f} vectors/s")
+
+    for finding in report.findings:
+        case = finding.shrunk
+        print(f"\n  ❌ {case.direction} {finding.failure} (iteration {finding.iteration}, "
+              f"{finding.shrink_steps} shrink steps)")
+        print(f"     {finding.detail}")
+    if report.findings:
+        print(f"\n  Reproducers written to {out_path}")
+
+    print(f"\n  Replay: --fuzz {seconds:g} --seed {seed}")
+    print(f"\n  {'🎉 NO FAILURES FOUND' if not report.findings else '⚠️ FUZZ FOUND FAILURES'}")
+    return 0 if not report.findings else 1
+
+
+def run_replay_mode(path: str) -> int:
+    import math_fuzz
+
+    case = math_fuzz.load_reproducer(Path(path))
+    outcome = math_fuzz.check_case(case)
+    if outcome is None:
+        print(f"[INFO] {case.direction}: vector is not legal under the current model")
+        return 0
+    status = "PASS" if outcome.success else f"FAIL ({outcome.failure})"
+    print(f"[{'PASS' if outcome.success else 'FAIL'}] {case.direction}: {status}\n  {outcome.detail}")
+    return 0 if outcome.success else 1
+
+
+def run_sequence_mode(total_ops: int, seed, workers: int, streams: int, checkpoint_every: int,
+                      out_dir: str) -> int:
+    import math_sequence
+
+    if seed is None:
+        seed = int.from_bytes(os.urandom(8), "big")
+    out_path = Path(out_dir)
+    if not out_path.is_absolute():
+        out_path = ROOT / out_path
+
+    print("="*70)
+    print(f"  STATEFUL SEQUENCE SIMULATION (seed={seed}, {total_ops:,} ops)")
+    print("="*70)
+
+    report = math_sequence.run_sequences(seed, total_ops, streams, workers, checkpoint_every)
+    print(f"\n  Ops: {report.ops:,} over {report.streams} streams in {report.elapsed_s:.1f}s "
+          f"({report.ops_per_s * 60:,.0f} ops/min)")
+    ops = math_sequence.OPS + ("genesis",)
+    print(f"  Per op: " + ", ".join(f"{op}={report.counts.get(op, 0):,}" for op in ops))
+    if report.reverts:
+        print(f"  Reverts: " + ", ".join(f"{reason}={count:,}" for reason, count in sorted(report.reverts.items())))
+
+    for failure in report.failures:
+        path = math_sequence.write_failure(failure, out_path)
+        print(f"\n  ❌ stream {failure.stream} step {failure.step}: {failure.invariant} after {failure.op} {failure.args}")
+        print(f"     {failure.detail}")
+        print(f"     checkpoint @ step {failure.checkpoint.step} → {path}")
+
+    print(f"\n  Replay: --sequence {total_ops} --seed {seed} --streams {report.streams}")
+    print(f"\n  {'🎉 ALL INVARIANTS HELD' if not report.failures else '⚠️ INVARIANT FAILURES'}")
+    return 0 if not report.failures else 1
+
+
+def run_sequence_replay_mode(path: str) -> int:
+    import math_sequence
+
+    def trace(step, op, args, reason):
+        print(f"  #{step} {op} {args}" + (f" → revert {reason}" if reason else ""))
+
+    error = math_sequence.replay(Path(path), trace)
+    if error is None:
+        print("[PASS] failure did not reproduce under the current model")
+        return 0
+    print(f"[FAIL] {error.invariant} after {error.op} {error.call}\n  {error.detail}")
+    return 1
+
+
+def run_bench_mode(min_calls: int, min_speedup) -> int:
+    import math_bench
+
+    print("="*70)
+    print("  SWAP KERNEL MICRO-BENCHMARK (dict/dataclass vs tuple/__slots__)")
+    print("="*70)
+
+    report = math_bench.run_bench(min_calls)
+    print(f"\n  {'kernel':22s} {'calls':>10} {'calls/s':>12} {'peak B/call':>12} {'kept B/call':>12}")
+    print("  " + "-"*72)
+    for row in report.rows:
+        print(f"  {row.name:22s} {row.calls:10,} {row.calls_per_s:12,.0f} "
+              f"{row.peak_bytes_per_call:12,.0f} {row.retained_bytes_per_call:12,.0f}")
+
+    ok = not report.mismatches
+    print()
+    for kernel in ("pair_swap_buy", "pair_swap_sell"):
+        speedup = report.speedup(kernel)
+        fast_enough = min_speedup is None or speedup >= min_speedup
+        ok = ok and fast_enough
+        print(f"  {'✅' if fast_enough else '❌'} {kernel}_lean speedup: {speedup:.2f}x"
+              + (f" (min {min_speedup:.2f}x)" if min_speedup is not None else ""))
+
+    if report.mismatches:
+        print(f"\n  ❌ Output mismatches: {len(report.mismatches)} (first 10):")
+        for line in report.mismatches[:10]:
+            print(f"    {line}")
+    else:
+        print(f"  ✅ Lean outputs identical to dict variants")
+
+    print("\n" + "="*70)
+    print("  INTEGER BACKENDS (large-reserve vectors)")
+    print("="*70)
+    if len(BACKENDS) == 1:
+        print("\n  gmpy2 not installed; only the int backend is available (pip install gmpy2)")
+        return 0 if ok else 1
+    backends = math_bench.run_backend_bench(min_calls)
+    print(f"\n  {backends.vectors:,} vectors (reserves ≥ 10**18 and 2^100..2^111)")
+    print(f"\n  {'kernel':22s} {'backend':8s} {'calls':>10} {'calls/s':>12} {'vs int':>8}")
+    print("  " + "-"*64)
+    for row in backends.rows:
+        print(f"  {row.kernel:22s} {row.backend:8s} {row.calls:10,} {row.calls_per_s:12,.0f} "
+              f"{backends.speedup(row.kernel, row.backend):7.2f}x")
+    if backends.mismatches:
+        ok = False
+        print(f"\n  ❌ Backend mismatches: {len(backends.mismatches)} (first 10):")
+        for line in backends.mismatches[:10]:
+            print(f"    {line}")
+    else:
+        print(f"\n  ✅ Every backend matches int (kernel outputs and default-grid result document)")
+    return 0 if ok else 1
+
+
+def run_route_mode(pairs: int, queries: int, max_hops: int, seed, max_ms, prune_hubs: bool = False) -> int:
+    import math_router
+
+    seed = MULTIHOP_SEED if seed is None else seed
+    print("="*70)
+    scope = "quote-token hubs" if prune_hubs else "all tokens"
+    print(f"  BEST-ROUTE SEARCH (pairs={pairs:,}, queries={queries:,}, max_hops={max_hops}, "
+          f"intermediates={scope}, seed={seed})")
+    print("="*70)
+
+    report = math_router.run_route_bench(seed, pairs, queries, max_hops, prune_hubs)
+    print(f"\n  routed {report.routed:,}/{report.queries:,} queries over {report.pairs:,} pairs")
+    print(f"  latency mean {report.mean_ms:.3f} ms, p99 {report.p99_ms:.3f} ms; "
+          f"{report.mean_quotes:.1f} hop quotes/query")
+
+    fast_enough = max_ms is None or report.p99_ms <= max_ms
+    if max_ms is not None:
+        print(f"  {'✅' if fast_enough else '❌'} p99 within {max_ms:.3f} ms")
+    if report.mismatches:
+        print(f"\n  ❌ Route mismatches: {len(report.mismatches)} (first 10):")
+        for line in report.mismatches[:10]:
+            print(f"    {line}")
+    else:
+        print(f"  ✅ Route amounts identical to getAmountsOut/getAmountsIn; best amounts match exhaustive search")
+    return 0 if fast_enough and not report.mismatches else 1
+
+
+def run_split_mode(pairs: int, orders: int, max_legs: int, chunks: int, seed, max_ms) -> int:
+    import math_split
+
+    seed = MULTIHOP_SEED if seed is None else seed
+    print("="*70)
+    print(f"  SPLIT-ORDER OPTIMIZER (pairs={pairs:,}, orders={orders:,}, legs≤{max_legs}, chunks={chunks}, seed={seed})")
+    print("="*70)
+
+    report = math_split.run_split_bench(seed, pairs, orders, max_legs, chunks)
+    print(f"\n  quoted {report.quoted:,}/{report.orders:,} orders, {report.split:,} split over several legs")
+    print(f"  latency mean {report.mean_ms:.2f} ms, p99 {report.p99_ms:.2f} ms")
+    print(f"  output vs best single path: mean +{report.mean_gain_bps:.1f} bps, max +{report.max_gain_bps:.1f} bps")
+
+    fast_enough = max_ms is None or report.p99_ms <= max_ms
+    if max_ms is not None:
+        print(f"  {'✅' if fast_enough else '❌'} p99 within {max_ms:.2f} ms")
+    if report.failures:
+        print(f"\n  ❌ Split failures: {len(report.failures)} (first 10):")
+        for line in report.failures[:10]:
+            print(f"    {line}")
+    else:
+        print(f"  ✅ Every leg executed through the Pair model at the quoted amounts; no split below single path")
+    return 0 if fast_enough and not report.failures else 1
+
+
+def run_overpay_mode(samples: int, seed) -> int:
+    import math_overpay
+
+    seed = MULTIHOP_SEED if seed is None else seed
+    print("="*70)
+    print(f"  EXACT-OUT MINIMAL INPUT vs LIBRARY QUOTE (samples={samples:,}/direction, seed={seed})")
+    print("="*70)
+
+    report = math_overpay.survey(seed, samples)
+    labels = [f"≤{b}" for b in math_overpay.BUCKETS] + ["more"]
+    print(f"\n  {'direction':16s} {'taxed':>5} {'samples':>8} " + " ".join(f"{l:>8}" for l in labels))
+    print("  " + "-"*(32 + 9 * len(labels)))
+    for s in report.stats:
+        counts = " ".join(f"{n:8d}" for n in s.histogram.values())
+        print(f"  {s.direction:16s} {'yes' if s.taxed else 'no':>5} {s.samples:8d} {counts}")
+
+    print(f"\n  {'direction':16s} {'taxed':>5} {'max wei':>8} {'tax wei':>10} {'fee wei':>10} {'p50 ppm':>10} {'p99 ppm':>10}")
+    print("  " + "-"*74)
+    for s in report.stats:
+        print(f"  {s.direction:16s} {'yes' if s.taxed else 'no':>5} {s.max_wei:8d} {s.tax_wei:10d} {s.fee_wei:10d} "
+              f"{s.percentile_ppm(0.5):10.4f} {s.percentile_ppm(0.99):10.4f}")
+    print(f"\n  {report.illegal} unquotable requests skipped; {report.elapsed_s:.1f}s")
+
+    if report.underquotes:
+        print(f"\n  ❌ Library quotes the Pair rejects: {len(report.underquotes)} (first 10):")
+        for line in report.underquotes[:10]:
+            print(f"    {line}")
+        return 1
+    print(f"  ✅ Every Library exact-out quote is accepted by the Pair (overpayment ≥ 0)")
+    return 0
+
+
+def run_domain_mode(samples: int, workers: int, seed, backend: str = "int") -> int:
+    import math_domain
+
+    seed = MULTIHOP_SEED if seed is None else seed
+    print("="*70)
+    print(f"  LARGE-DOMAIN STRATIFIED SAMPLER ({samples:,}/bucket, seed={seed}, backend={backend})")
+    print("="*70)
+    report = math_domain.run_domain(seed, samples, workers, backend=backend)
+
+    outcomes = math_domain.OUTCOMES
+    short = {"OK": "ok", "VAULT_OVERFLOW": "vault", "K_MULTIPLY_OVERFLOW": "k_mul", "K": "K",
+             "UniswapV2: OVERFLOW": "u112"}
+    for family in math_domain.FAMILIES:
+        print(f"\n  {family} (amount buckets 2^{math_domain.AMOUNT_BUCKETS[family][0]}.."
+              f"2^{math_domain.AMOUNT_BUCKETS[family][-1]})")
+        print(f"  {'reserve':>8} {'samples':>8} {'passed':>8} {'failed':>7} " +
+              " ".join(f"{short[o]:>7}" for o in outcomes))
+        print("  " + "-"*(36 + 8 * len(outcomes)))
+        for rb in math_domain.RESERVE_BUCKETS:
+            rows = [b for b in report.buckets if b.family == family and b.reserve_bits == rb]
+            counts = [sum(b.outcomes.get(o, 0) for b in rows) for o in outcomes]
+            print(f"  {'2^' + str(rb):>8} {sum(b.samples for b in rows):8d} {sum(b.passed for b in rows):8d} "
+                  f"{sum(b.failed for b in rows):7d} " + " ".join(f"{n:7d}" for n in counts))
+
+    failed = [b for b in report.buckets if b.failed]
+    print(f"\n  {report.samples:,} samples in {len(report.buckets)} buckets, {report.elapsed_s:.1f}s "
+          f"({report.samples / max(report.elapsed_s, 1e-9):,.0f} samples/s)")
+    if failed:
+        print(f"\n  ❌ {len(failed)} failing buckets:")
+        for b in failed:
+            print(f"    {b.family} reserve=2^{b.reserve_bits} amount=2^{b.amount_bits}: {b.failed}/{b.samples} failed")
+            for line in b.failures:
+                print(f"      {line}")
+        return 1
+    print(f"  ✅ Every bucket matches the Pair's VAULT_OVERFLOW / K_MULTIPLY_OVERFLOW / K / uint112 revert order")
+    return 0
+
+
+def run_tax_sweep_mode(out_dir: str, amounts: int) -> int:
+    try:
+        import math_taxsweep
+    except ImportError as exc:
+        print(f"[FAIL] tax sweep unavailable ({exc}); install numpy")
+        return 1
+
+    print("="*70)
+    print(f"  TAX-DOMAIN SWEEP ({math_taxsweep.MAX_TAX_BPS + 1}² buy/sell tax pairs)")
+    print("="*70)
+    meta = math_taxsweep.write_sweep(Path(out_dir), amounts)
+    tables = math_taxsweep.load_sweep(Path(out_dir))
+    buy, sell, pair = tables["buy"], tables["sell"], tables["pair"]
+    for name, seconds in meta["timings_s"].items():
+        print(f"  {name:5s} table {str(tables[name].shape):>14}  {seconds:7.1f}s")
+    print(f"\n  buy  zero-tax input ≤ {buy['zero_tax_max_in'][1:].max()} wei (tax=1) .. "
+          f"{buy['zero_tax_max_in'][1:].min()} wei (tax={math_taxsweep.MAX_TAX_BPS})")
+    print(f"  buy  exact-out effIn overpay ≤ {buy['exact_out_overpay_max'].max()} wei "
+          f"(mean ≤ {buy['exact_out_overpay_mean'].max():.4f})")
+    print(f"  sell roundtrip gross-1 in ≤ {sell['roundtrip_minus1'].max()}/{math_taxsweep.BPS} grosses, "
+          f"max |delta| {sell['roundtrip_max_err'].max()}")
+    print(f"  pair buy→sell loss: mean ≥ {pair['roundtrip_loss_mean'].min():.4f}, "
+          f"max ≤ {pair['roundtrip_loss_max'].max():.4f} wei over q ≤ {amounts}")
+    print(f"\n  Tables written to {out_dir} (np.load(..., mmap_mode='r') or math_taxsweep.load_sweep)")
+
+    violations = math_taxsweep.check_sweep(tables)
+    if violations:
+        for line in violations:
+            print(f"  ❌ {line}")
+        return 1
+    print(f"  ✅ Tax roundings stay within the bounds the Library/Pair model assumes")
+    return 0
+
+
+def run_vault_sim_mode(swaps: int, pools: int, claim_every: int, swaps_per_day: float, seed,
+                       max_fill) -> int:
+    try:
+        import math_vault
+    except ImportError as exc:
+        print(f"[FAIL] vault simulation unavailable ({exc}); install numpy")
+        return 1
+
+    seed = VAULT_SIM_SEED if seed is None else seed
+    steps = max(1, swaps // pools)
+    print("="*70)
+    print(f"  VAULT ACCRUAL MONTE CARLO (uint96 accumulatedQuoteTax, seed={seed})")
+    print("="*70)
+    report = math_vault.simulate(seed, pools, steps, claim_every, swaps_per_day)
+    print_vault_report(report)
+
+    worst = max(report.groups, key=lambda g: g.high_water_fill)
+    if max_fill is not None and worst.high_water_fill > max_fill:
+        print(f"\n  ❌ {worst.decimals}-decimal vault reached {worst.high_water_fill:.3g} of uint96 "
+              f"(limit {max_fill:g}); claim more often than every {claim_every or 'never'} swaps")
+        return 1
+    print(f"\n  ✅ Highest vault fill {worst.high_water_fill:.3g} of uint96 ({worst.decimals} decimals)")
+    return 0
+
+
+def run_export_mode(path: str, count: int, seed) -> int:
+    seed = VECTOR_SEED if seed is None else seed
+    started = time.perf_counter()
+    passed, failed = export_vectors(Path(path), count, seed)
+    print(f"Wrote {count:,} pair vectors ({passed:,} K pass, {failed:,} K fail, seed={seed}) "
+          f"to {path} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="NadSwap V2 Library<->Pair math consistency gate.")
+    parser.add_argument(
+        "--engine",
+        choices=["scalar", "batch"],
+        default="scalar",
+        help="4-direction engine: scalar reference loop or NumPy batch kernel",
+    )
+    parser.add_argument(
+        "--wide-grid",
+        action="store_true",
+        help="Batch engine only: add a dense log-spaced reserve/amount grid",
+    )
+    parser.add_argument("--reserve-points", type=int, default=48, help="Wide grid reserve levels per side")
+    parser.add_argument("--fraction-points", type=int, default=256, help="Wide grid amount fractions")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Shard the scalar grid / exhaustive domain across N processes (0 = one per core)",
+    )
+    parser.add_argument(
+        "--exhaustive",
+        type=int,
+        metavar="BOUND",
+        default=None,
+        help="Run only the exhaustive enumerator over reserves in [1, BOUND] (e.g. 4096)",
+    )
+    parser.add_argument(
+        "--fuzz",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Run only the seeded property fuzzer for SECONDS",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Fuzz seed (random and printed if omitted)")
+    parser.add_argument(
+        "--fuzz-out",
+        default=str(DEFAULT_FUZZ_OUT),
+        help="Directory for shrunk fuzz reproducers",
+    )
+    parser.add_argument("--fuzz-replay", metavar="FILE", default=None, help="Re-check a fuzz reproducer")
+    parser.add_argument(
+        "--sequence",
+        type=int,
+        metavar="OPS",
+        default=None,
+        help="Run only the stateful swap/mint/burn/sync/skim/claim simulator for OPS operations",
+    )
+    parser.add_argument("--streams", type=int, default=0, help="Independent sequences (default: one per worker)")
+    parser.add_argument("--checkpoint-every", type=int, default=10_000, help="Sequence checkpoint interval")
+    parser.add_argument(
+        "--sequence-out",
+        default=str(DEFAULT_SEQUENCE_OUT),
+        help="Directory for failing-sequence checkpoints",
+    )
+    parser.add_argument("--sequence-replay", metavar="FILE", default=None, help="Replay a failing sequence")
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Run only the pair_swap_* vs lean kernel micro-benchmark (calls/s, tracemalloc bytes/call)",
+    )
+    parser.add_argument("--bench-calls", type=int, default=200_000, help="Minimum timed calls per kernel")
+    parser.add_argument(
+        "--min-speedup",
+        type=float,
+        default=None,
+        help="Fail the benchmark when a lean kernel is slower than this multiple of the dict kernel",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["int", "gmpy2", "auto"],
+        default="int",
+        help="Integer type for the model kernels in the default run and --domain (auto = gmpy2 if installed)",
+    )
+    parser.add_argument(
+        "--route",
+        type=int,
+        metavar="QUERIES",
+        default=None,
+        help="Run only the best-route search benchmark with this many random queries",
+    )
+    parser.add_argument("--route-pairs", type=int, default=10_000, help="Pairs in the route benchmark graph")
+    parser.add_argument("--max-hops", type=int, default=3, help="Route search depth (pools per path)")
+    parser.add_argument(
+        "--route-quote-hubs",
+        action="store_true",
+        help="Restrict route intermediates to quote tokens (heuristic; still checked against exhaustive search)",
+    )
+    parser.add_argument(
+        "--max-route-ms",
+        type=float,
+        default=None,
+        help="Fail the route benchmark when p99 query latency exceeds this many milliseconds",
+    )
+    parser.add_argument(
+        "--split",
+        type=int,
+        metavar="ORDERS",
+        default=None,
+        help="Run only the split-order optimizer benchmark with this many random large orders",
+    )
+    parser.add_argument("--split-legs", type=int, default=4, help="Maximum pool-disjoint legs per split")
+    parser.add_argument("--split-chunks", type=int, default=64, help="Greedy allocation slices per order")
+    parser.add_argument(
+        "--max-split-ms",
+        type=float,
+        default=None,
+        help="Fail the split benchmark when p99 optimization latency exceeds this many milliseconds",
+    )
+    parser.add_argument(
+        "--overpay",
+        type=int,
+        metavar="SAMPLES",
+        default=None,
+        help="Run only the exact-out minimal-input survey with this many requests per direction",
+    )
+    parser.add_argument(
+        "--domain",
+        type=int,
+        metavar="SAMPLES",
+        default=None,
+        help="Run only the log2-stratified large-domain sampler with this many samples per bucket",
+    )
+    parser.add_argument(
+        "--tax-sweep",
+        metavar="DIR",
+        default=None,
+        help="Tabulate rounding behaviour for every buy/sell tax pair into DIR (.npy tables) and exit",
+    )
+    parser.add_argument("--sweep-amounts", type=int, default=2048, help="Quote amounts sampled per tax pair")
+    parser.add_argument(
+        "--vault-sim",
+        type=int,
+        metavar="SWAPS",
+        default=None,
+        help="Run only the vault accrual Monte Carlo for about this many swaps in total",
+    )
+    parser.add_argument("--vault-pools", type=int, default=3 * 65_536, help="Pools simulated in lock-step")
+    parser.add_argument(
+        "--claim-every",
+        type=int,
+        default=0,
+        help="claimQuoteTax cadence in swaps per pool (0 = never claim)",
+    )
+    parser.add_argument("--swaps-per-day", type=float, default=10_000, help="Per-pool swap rate for year estimates")
+    parser.add_argument(
+        "--max-vault-fill",
+        type=float,
+        default=None,
+        help="Fail the vault simulation when any vault exceeds this fraction of uint96",
+    )
+    parser.add_argument(
+        "--export-vectors",
+        metavar="FILE",
+        default=None,
+        help="Stream Pair swap vectors for the Foundry differential test to FILE and exit",
+    )
+    parser.add_argument("--vector-count", type=int, default=200_000, help="Vectors to export")
+    parser.add_argument(
+        "--failures-jsonl",
+        metavar="FILE",
+        default=None,
+        help="Default run: stream every raw failure to FILE as JSON lines",
+    )
+    parser.add_argument(
+        "--json",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        default=None,
+        help="Write the default run's result document as JSON to FILE (stdout if omitted; the report goes to stderr)",
+    )
+    args = parser.parse_args(argv)
+    if args.wide_grid and args.engine != "batch":
+        parser.error("--wide-grid requires --engine batch")
+    if args.workers is not None and args.engine != "scalar":
+        parser.error("--workers requires --engine scalar")
+    if args.exhaustive is not None and (args.engine != "scalar" or args.wide_grid):
+        parser.error("--exhaustive runs on its own; drop --engine/--wide-grid")
+    if args.backend == "gmpy2" and "gmpy2" not in BACKENDS:
+        parser.error("--backend gmpy2 requires gmpy2 (pip install gmpy2)")
+    if args.backend != "int" and args.engine != "scalar":
+        parser.error("--backend applies to the scalar engine")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.backend = set_backend(args.backend)
+
+    if args.exhaustive is not None:
+        return run_exhaustive_mode(args.exhaustive, args.workers or 0)
+    if args.fuzz is not None:
+        return run_fuzz_mode(args.fuzz, args.seed, args.fuzz_out)
+    if args.fuzz_replay is not None:
+        return run_replay_mode(args.fuzz_replay)
+    if args.sequence is not None:
+        return run_sequence_mode(args.sequence, args.seed, args.workers or 0, args.streams,
+                                 args.checkpoint_every, args.sequence_out)
+    if args.sequence_replay is not None:
+        return run_sequence_replay_mode(args.sequence_replay)
+    if args.bench:
+        return run_bench_mode(args.bench_calls, args.min_speedup)
+    if args.route is not None:
+        return run_route_mode(args.route_pairs, args.route, args.max_hops, args.seed, args.max_route_ms,
+                              args.route_quote_hubs)
+    if args.export_vectors is not None:
+        return run_export_mode(args.export_vectors, args.vector_count, args.seed)
+    if args.overpay is not None:
+        return run_overpay_mode(args.overpay, args.seed)
+    if args.domain is not None:
+        return run_domain_mode(args.domain, args.workers or 0, args.seed, args.backend)
+    if args.tax_sweep is not None:
+        return run_tax_sweep_mode(args.tax_sweep, args.sweep_amounts)
+    if args.vault_sim is not None:
+        return run_vault_sim_mode(args.vault_sim, args.vault_pools, args.claim_every, args.swaps_per_day,
+                                  args.seed, args.max_vault_fill)
+    if args.split is not None:
+        return run_split_mode(args.route_pairs, args.split, args.split_legs, args.split_chunks, args.seed,
+                              args.max_split_ms)
+
+    if args.json is None:
+        return 0 if run_gate(args)["passed"] else 1
+    if args.json == "-":
+        with contextlib.redirect_stdout(sys.stderr):
+            document = run_gate(args)
+        print(json.dumps(document, indent=2))
+    else:
+        document = run_gate(args)
+        Path(args.json).write_text(json.dumps(document, indent=2) + "\n")
+        print(f"\n  Result document written to {args.json}")
+    return 0 if document["passed"] else 1
+
+
+def gate_document(argv=None) -> dict:
+    """Run the default gate in-process and return its result document; the
+    human-readable report is discarded."""
+    args = parse_args(argv)
+    set_backend(args.backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_gate(args)
+
+
+def run_gate(args) -> dict:
+    """Default verification flow. Prints the report and returns the
+    machine-readable result document (`--json`)."""
+    if args.failures_jsonl is None:
+        return _run_gate(args, None)
+    with open(args.failures_jsonl, "w") as spill:
+        document = _run_gate(args, spill)
+    print(f"\n  Raw failures streamed to {args.failures_jsonl}")
+    return document
+
+
+def _run_gate(args, spill) -> dict:
+    timings = {}
+
+    def timed(section, fn, *fn_args):
+        started = time.perf_counter()
+        value = fn(*fn_args)
+        timings[section] = round(time.perf_counter() - started, 4)
+        return value
+
     print("="*70)
     print("  NadSwap V2 — Library↔Pair Math Deep Verification")
     print("="*70)
@@ -616,7 +1899,13 @@ def main():
     print("  4-DIRECTION LIBRARY↔PAIR CONSISTENCY")
     print("="*70)
     
-    results = run_verification()
+    if args.engine == "batch":
+        results = timed("core", run_verification_batch, args.wide_grid, args.reserve_points, args.fraction_points,
+                        spill)
+    elif args.workers is not None:
+        results = timed("core", run_verification_parallel, args.workers, DEFAULT_MAX_ERRORS, spill)
+    else:
+        results = timed("core", run_verification, None, DEFAULT_MAX_ERRORS, spill)
 
     print(f"\n  Results: {results.total} tests, {results.passed} passed, {results.failed} failed")
     
@@ -630,18 +1919,22 @@ def main():
         print(f"\n  ❌ Failed cases (first 10):")
         for e in results.errors[:10]:
             print(e)
+        print(f"\n  Failure signatures (top 10 of {len(results.signatures)}):")
+        for row in results.top_signatures(10):
+            print(f"    {row['direction']:24s} tax={row['tax_class']:9s} reserves={row['reserve_bucket']:13s} "
+                  f"{row['failed']:>8,}")
 
     # 2. Boundary tests
-    boundary = run_boundary_tests()
+    boundary = timed("boundary", run_boundary_tests, spill)
 
     # 3. K stress test
-    k_failures = run_k_stress_test()
+    k_failures, k_total = timed("k_stress", run_k_stress_test)
 
     # 4. Vault overflow
-    run_vault_overflow_test()
+    vault = timed("vault_overflow", run_vault_overflow_test)
 
     # 5. Multi-hop
-    run_multihop_test()
+    multihop = timed("multihop", run_multihop_test, MULTIHOP_SEED, MULTIHOP_PATHS_PER_LENGTH, spill)
 
     # ─── Final Summary ───
     print("\n" + "="*70)
@@ -650,26 +1943,43 @@ def main():
     
     core_rounding_ok = all(v <= 1 for v in results.max_error_wei.values()) if results.max_error_wei else True
     boundary_ok = boundary.failed == 0
-    all_pass = results.failed == 0 and k_failures == 0 and core_rounding_ok and boundary_ok
+    multihop_ok = multihop.failed == 0
+    all_pass = results.failed == 0 and k_failures == 0 and core_rounding_ok and boundary_ok and multihop_ok
+    verdict = lambda ok: "PASS" if ok else "FAIL"
 
+    # The vault line is report-only (PASS / WARN / SKIP) and stays out of all_pass.
     checks = [
-        ("4-Direction Consistency", results.failed == 0, f"{results.passed}/{results.total}"),
-        ("K-Invariant Stress", k_failures == 0, "all passed"),
-        ("Sell roundtrip ≤ 1 wei", core_rounding_ok,
+        ("4-Direction Consistency", verdict(results.failed == 0), f"{results.passed}/{results.total}"),
+        ("K-Invariant Stress", verdict(k_failures == 0), "all passed"),
+        ("Sell roundtrip ≤ 1 wei", verdict(core_rounding_ok),
          f"max {max(results.max_error_wei.values()) if results.max_error_wei else 0} wei"),
-        ("Boundary Conditions", boundary_ok, f"{boundary.passed}/{boundary.total}"),
-        ("M-1 Fix (Library rounding)", True, "aligned"),
-        ("uint96 Vault Overflow", True, "impossible"),
-        ("Multi-hop Error Bound", True, "≤ N wei"),
+        ("Boundary Conditions", verdict(boundary_ok), f"{boundary.passed}/{boundary.total}"),
+        ("M-1 Fix (Library rounding)", "PASS", "aligned"),
+        ("uint96 Vault Overflow", vault["status"], vault["detail"]),
+        ("Multi-hop Error Bound", verdict(multihop_ok),
+         f"{multihop.passed}/{multihop.total} paths, ≤ {max(multihop.max_error_wei.values(), default=0)} wei/hop"),
     ]
 
-    for name, passed, detail in checks:
-        status = "✅" if passed else "❌"
-        print(f"  {status} {name:30s} — {detail}")
+    for name, status, detail in checks:
+        print(f"  {CHECK_ICONS[status]} {name:30s} — {detail}")
 
-    print(f"\n  {'🎉 ALL CHECKS PASSED' if all_pass else '⚠️ SOME CHECKS FAILED'}")
-    
-    return 0 if all_pass else 1
+    notes = sum(status in ("WARN", "SKIP") for _, status, _ in checks)
+    suffix = f" ({notes} report-only {'note' if notes == 1 else 'notes'})" if notes else ""
+    print(f"\n  {'🎉 ALL CHECKS PASSED' if all_pass else '⚠️ SOME CHECKS FAILED'}{suffix}")
+
+    return {
+        "schema": RESULT_SCHEMA,
+        "passed": all_pass,
+        "engine": args.engine,
+        "core": results.to_dict(),
+        "boundary": boundary.to_dict(),
+        "k_stress": {"total": k_total, "failed": k_failures},
+        "vault_overflow": vault,
+        "multihop": multihop.to_dict(),
+        "checks": [{"name": name, "passed": status != "FAIL", "status": status, "detail": detail}
+                   for name, status, detail in checks],
+        "timings_s": timings,
+    }
 
 
 if __name__ == "__main__":
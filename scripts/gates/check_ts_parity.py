@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Python model <-> frontend trade math parity gate.
+
+Generates quote vectors from the Library mirror in `check_math_consistency.py`
+(and the Pair kernel for the buy tax actually charged), writes them to one
+file, and runs `apps/nadswap/src/features/trade/parity.test.ts` in a single
+vitest process. The test feeds every vector to `getSwapFeeBreakdown`
+(feeBreakdown.ts) or `applySlippageBps` (math.ts), diffs each field, and
+writes a JSON report of mismatches by direction, which this script prints.
+
+Vector lines are space-separated decimals, "-" for null:
+
+  <direction> amountIn quotedOut reserveIn reserveOut buyTax sellTax lpFee
+              input effIn lpFeeAmount taxIn taxOut gross net
+  slippage    amount bps expected
+
+Directions: buy_exact_in, buy_exact_out, sell_exact_in, sell_exact_out.
+Runs offline; needs the workspace's node_modules (`pnpm install`).
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from check_math_consistency import (  # noqa: E402
+    BPS,
+    UINT112_MAX,
+    LeanPairState,
+    getAmountOut,
+    library_getAmountsIn_buy,
+    library_getAmountsIn_sell,
+    library_getAmountsOut_buy,
+    library_getAmountsOut_sell,
+    pair_swap_buy_lean,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+APP_DIR = ROOT / "apps" / "nadswap"
+PARITY_TEST = "src/features/trade/parity.test.ts"
+DEFAULT_OUT = ROOT / "fuzz-logs" / "ts-parity"
+LP_FEE_BPS = 20  # 998/1000
+SEED = 20_250_304
+DIRECTIONS = ("buy_exact_in", "buy_exact_out", "sell_exact_in", "sell_exact_out", "slippage")
+
+
+def fail(msg):
+    print(f"[FAIL] {msg}")
+    sys.exit(1)
+
+
+def _log_uniform(rng: random.Random, lo_bits: int, hi_bits: int) -> int:
+    bits = rng.randint(lo_bits, hi_bits)
+    return rng.randint(1 << (bits - 1), (1 << bits) - 1)
+
+
+def _line(direction, amountIn, quotedOut, reserveIn, reserveOut, buyTax, sellTax,
+          effIn, lpFee, taxIn, taxOut, gross, net) -> str:
+    fields = (amountIn, quotedOut, reserveIn, reserveOut, buyTax, sellTax, LP_FEE_BPS,
+              amountIn, effIn, lpFee, taxIn, taxOut, gross, net)
+    return direction + " " + " ".join("-" if v is None else str(v) for v in fields)
+
+
+def vectors(seed: int):
+    """Endless stream of vector lines, directions in rotation."""
+    rng = random.Random(seed)
+    taxes = (0, 1, 300, 1000, 2000)
+    i = 0
+    while True:
+        direction = DIRECTIONS[i % len(DIRECTIONS)]
+        i += 1
+        if direction == "slippage":
+            amount = _log_uniform(rng, 1, 128)
+            bps = rng.choice((0, 1, 50, 100, 10_000, rng.randint(0, 10_000)))
+            yield f"slippage {amount} {bps} {amount * (BPS - bps) // BPS}"
+            continue
+
+        rQuote, rBase = _log_uniform(rng, 10, 111), _log_uniform(rng, 10, 111)
+        buyTax = rng.choice(taxes + (rng.randint(0, 2000),))
+        sellTax = rng.choice(taxes + (rng.randint(0, 2000),))
+        try:
+            if direction == "buy_exact_in":
+                amountIn = _log_uniform(rng, 1, min(111, rQuote.bit_length() + 2))
+                _, _, baseOut = library_getAmountsOut_buy(amountIn, buyTax, rQuote, rBase)
+                if not 0 < baseOut < rBase:
+                    continue
+                # Tax and effIn as the Pair charges them for this input.
+                state = LeanPairState(rQuote, rBase, 0, buyTax, sellTax, True)
+                tax, _, effIn = pair_swap_buy_lean(state, amountIn, baseOut)[:3]
+                yield _line(direction, amountIn, baseOut, rQuote, rBase, buyTax, sellTax,
+                            effIn, effIn * LP_FEE_BPS // BPS, tax, 0, baseOut, baseOut)
+            elif direction == "buy_exact_out":
+                baseOut = _log_uniform(rng, 1, rBase.bit_length() - 1)
+                rawIn = library_getAmountsIn_buy(baseOut, buyTax, rQuote, rBase)[2]
+                tax = rawIn * buyTax // BPS
+                effIn = rawIn - tax
+                yield _line(direction, rawIn, baseOut, rQuote, rBase, buyTax, sellTax,
+                            effIn, effIn * LP_FEE_BPS // BPS, tax, 0, getAmountOut(effIn, rQuote, rBase), baseOut)
+            elif direction == "sell_exact_in":
+                baseIn = _log_uniform(rng, 1, min(111, rBase.bit_length() + 2))
+                gross, tax, net = library_getAmountsOut_sell(baseIn, sellTax, rBase, rQuote)
+                yield _line(direction, baseIn, None, rBase, rQuote, buyTax, sellTax,
+                            baseIn, baseIn * LP_FEE_BPS // BPS, 0, tax, gross, net)
+            else:
+                net = _log_uniform(rng, 1, rQuote.bit_length() - 2)
+                gross, tax, baseIn = library_getAmountsIn_sell(net, sellTax, rBase, rQuote)
+                if baseIn > UINT112_MAX:
+                    continue
+                yield _line(direction, baseIn, net, None, None, buyTax, sellTax,
+                            baseIn, baseIn * LP_FEE_BPS // BPS, 0, tax, gross, net)
+        except (AssertionError, ZeroDivisionError):
+            continue
+
+
+def write_vectors(path: Path, count: int, seed: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stream = vectors(seed)
+    with open(path, "w", buffering=1 << 20) as fh:
+        for _ in range(count):
+            fh.write(next(stream) + "\n")
+
+
+def run_vitest(vectors_path: Path, report_path: Path) -> int:
+    env = dict(os.environ, NADSWAP_TS_PARITY_VECTORS=str(vectors_path), NADSWAP_TS_PARITY_REPORT=str(report_path))
+    if shutil.which("pnpm"):
+        cmd = ["pnpm", "--filter", "@nadswap/nadswap", "exec", "vitest", "run", PARITY_TEST]
+    elif (APP_DIR / "node_modules" / ".bin" / "vitest").exists():
+        cmd = [str(APP_DIR / "node_modules" / ".bin" / "vitest"), "run", PARITY_TEST]
+    else:
+        fail("vitest not found; run `pnpm install` first")
+    print(f"[INFO] {' '.join(cmd)}")
+    return subprocess.run(cmd, cwd=APP_DIR, env=env).returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Python model <-> apps/nadswap trade math parity gate.")
+    parser.add_argument("--count", type=int, default=100_000, help="Vectors to generate")
+    parser.add_argument("--seed", type=int, default=SEED, help="Vector seed")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="Directory for the vector file and report")
+    args = parser.parse_args()
+
+    out = Path(args.out).resolve()
+    vectors_path, report_path = out / "vectors.txt", out / "report.json"
+    if report_path.exists():
+        report_path.unlink()
+
+    started = time.perf_counter()
+    write_vectors(vectors_path, args.count, args.seed)
+    print(f"[INFO] {args.count:,} vectors (seed={args.seed}) -> {vectors_path} in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    code = run_vitest(vectors_path, report_path)
+    if not report_path.exists():
+        fail(f"vitest exited {code} without writing {report_path}")
+    report = json.loads(report_path.read_text())
+    print(f"[INFO] vitest run {time.perf_counter() - started:.1f}s")
+
+    print(f"\n  {'direction':16s} {'vectors':>8} {'mismatches':>10}")
+    print("  " + "-" * 36)
+    for direction in DIRECTIONS:
+        row = report["directions"].get(direction, {"vectors": 0, "mismatches": 0})
+        print(f"  {direction:16s} {row['vectors']:8d} {row['mismatches']:10d}")
+    if report["total"] != args.count:
+        fail(f"vitest checked {report['total']} vectors, expected {args.count}")
+    if report["mismatches"]:
+        print("\n  First mismatches:")
+        for sample in report["samples"]:
+            print(f"    {sample}")
+        fail(f"{report['mismatches']} TypeScript/Python mismatches")
+    print(f"[PASS] TypeScript trade math matches the Python model ({report['total']:,} vectors).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Vectorized batch kernel for the Library/Pair math model.
+
+Evaluates the four swap directions of `check_math_consistency.py` over whole
+arrays of vectors with NumPy:
+
+  - int64 fast lane: rows whose intermediates provably fit. Every product is
+    range-checked with a float64 estimate; the K comparison uses a 128-bit
+    product built from uint64 limbs.
+  - exact lane: rows with 10**18-scale values (or any flagged product) are
+    re-evaluated on object arrays holding Python ints.
+
+Both lanes run the same kernel code, so results stay bit-exact with the scalar
+model and the Solidity integer math it mirrors. The Pair math is symmetric
+under token ordering, so the kernel works in quote/base space and `isQuote0`
+only selects the reported direction label.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+import check_math_consistency as model
+
+BPS = 10_000
+VAULT_MAX = 2**96 - 1
+
+DIRECTIONS = ("buy_exact_in", "sell_exact_in", "sell_exact_out", "buy_exact_out")
+
+# Products at or above this bound leave the fast lane. Two such values still
+# add/subtract without overflowing int64, which is all the kernel ever does.
+_FAST_PRODUCT_LIMIT = float(2**61)
+# Inputs must be small enough that the three-term sums in the kernel fit.
+_FAST_INPUT_LIMIT = 2**60
+_M32 = np.uint64(0xFFFFFFFF)
+_S32 = np.uint64(32)
+
+
+# ─── Lane Arithmetic ───
+
+class _Int64Ops:
+    """int64 arithmetic that flags rows whose products could overflow."""
+
+    def __init__(self, n: int):
+        self.overflow = np.zeros(n, dtype=bool)
+
+    def mul(self, a, b):
+        est = np.abs(np.multiply(a, b, dtype=np.float64))
+        self.overflow |= est >= _FAST_PRODUCT_LIMIT
+        return a * b
+
+    def ge_product(self, a, b, c, d):
+        return ge_product_128(a, b, c, d)
+
+
+class _ExactOps:
+    """Python-int arithmetic on object arrays."""
+
+    def mul(self, a, b):
+        return a * b
+
+    def ge_product(self, a, b, c, d):
+        return (a * b) >= (c * d)
+
+
+def _mul128(a, b):
+    x = np.maximum(a, 0).astype(np.uint64)
+    y = np.maximum(b, 0).astype(np.uint64)
+    x0, x1 = x & _M32, x >> _S32
+    y0, y1 = y & _M32, y >> _S32
+    p00 = x0 * y0
+    p01 = x0 * y1
+    p10 = x1 * y0
+    p11 = x1 * y1
+    mid = (p00 >> _S32) + (p01 & _M32) + (p10 & _M32)
+    lo = (p00 & _M32) | ((mid & _M32) << _S32)
+    hi = p11 + (p01 >> _S32) + (p10 >> _S32) + (mid >> _S32)
+    return hi, lo
+
+
+def ge_product_128(a, b, c, d):
+    """a*b >= c*d for non-negative int64 operands, via 128-bit uint64 limbs."""
+    hi_ab, lo_ab = _mul128(a, b)
+    hi_cd, lo_cd = _mul128(c, d)
+    return (hi_ab > hi_cd) | ((hi_ab == hi_cd) & (lo_ab >= lo_cd))
+
+
+def _div(num, den, ok):
+    """Floor division with invalid rows guarded against zero/negative denominators."""
+    return num // np.where(ok & (den > 0), den, 1)
+
+
+def _calc_in(eff, target):
+    return np.where(eff > target, eff - target, 0)
+
+
+# ─── Pair Kernels (vault = 0) ───
+
+def _pair_buy(ops, rQ, rB, buyTax, rawQuoteIn, baseOut, valid):
+    """Vector form of `pair_swap_buy`. Returns (quoteTaxIn, effIn_quote, k_pass, valid)."""
+    # Step 5-6: raw/effective balances via oldVault (= 0)
+    eff_quote_old = rQ + rawQuoteIn
+    eff_base_old = rB - baseOut
+
+    # Step 8-a: actual user input (Net basis)
+    actual_in = _calc_in(eff_quote_old, rQ) + _calc_in(eff_base_old, rB - baseOut)
+    valid = valid & (actual_in > 0)
+
+    # Step 8-b/c: gross basis == net basis on buy; buy tax on quote input
+    amount_in_quote = _calc_in(eff_quote_old, rQ)
+    tax_in = np.where((amount_in_quote > 0) & (baseOut > 0), ops.mul(amount_in_quote, buyTax) // BPS, 0)
+
+    # Step 9: newVault
+    valid = valid & (tax_in <= VAULT_MAX)
+
+    # Step 10: effective re-calc with newVault
+    eff_quote = eff_quote_old - tax_in
+    eff_base = eff_base_old
+    eff_in_quote = _calc_in(eff_quote, rQ)
+    eff_in_base = _calc_in(eff_base, rB - baseOut)
+
+    # Step 11: K-invariant
+    adj_quote = ops.mul(eff_quote, 1000) - eff_in_quote * 2
+    adj_base = ops.mul(eff_base, 1000) - eff_in_base * 2
+    k_pass = ops.ge_product(adj_quote, adj_base, ops.mul(rQ, 1000), ops.mul(rB, 1000))
+    return tax_in, eff_in_quote, k_pass, valid
+
+
+def _pair_sell(ops, rQ, rB, sellTax, baseIn, netQuoteOut, valid):
+    """Vector form of `pair_swap_sell`. Returns (grossQuoteOut, quoteTaxOut, k_pass, valid)."""
+    # Step 7: sell reverse-math on quote output side
+    denom = BPS - sellTax
+    gross_out = np.where(
+        netQuoteOut > 0,
+        (ops.mul(netQuoteOut, BPS) + denom - 1) // denom,
+        netQuoteOut,
+    )
+    valid = valid & (gross_out < rQ)
+    tax_out = gross_out - netQuoteOut
+
+    # Step 5-6: effective via oldVault (= 0)
+    eff_quote_old = rQ - netQuoteOut
+    eff_base_old = rB + baseIn
+
+    # Step 8-a: actual input (Net basis)
+    actual_in = _calc_in(eff_quote_old, rQ - netQuoteOut) + _calc_in(eff_base_old, rB)
+    valid = valid & (actual_in > 0)
+
+    # Step 9: newVault (no buy tax on the sell path)
+    valid = valid & (tax_out <= VAULT_MAX)
+
+    # Step 10: effective re-calc with newVault
+    eff_quote = eff_quote_old - tax_out
+    eff_base = eff_base_old
+    eff_in_quote = _calc_in(eff_quote, rQ - gross_out)
+    eff_in_base = _calc_in(eff_base, rB)
+
+    # Step 11: K-invariant
+    adj_quote = ops.mul(eff_quote, 1000) - eff_in_quote * 2
+    adj_base = ops.mul(eff_base, 1000) - eff_in_base * 2
+    k_pass = ops.ge_product(adj_quote, adj_base, ops.mul(rQ, 1000), ops.mul(rB, 1000))
+    return gross_out, tax_out, k_pass, valid
+
+
+# ─── Direction Kernels ───
+
+def _buy_exact_in(ops, v):
+    rQ, rB, buyTax, a = v["r_quote"], v["r_base"], v["buy_tax"], v["quote_in"]
+    valid = (a > 0) & (rQ > 0) & (rB > 0)
+
+    # library_getAmountsOut_buy
+    lib_tax = ops.mul(a, buyTax) // BPS
+    lib_eff_in = a - lib_tax
+    valid &= lib_eff_in > 0
+    with_fee = ops.mul(lib_eff_in, 998)
+    base_out = _div(ops.mul(with_fee, rB), ops.mul(rQ, 1000) + with_fee, valid)
+    valid &= (base_out > 0) & (base_out < rB)
+
+    tax_in, eff_in, k_pass, valid = _pair_buy(ops, rQ, rB, buyTax, a, base_out, valid)
+    err = np.abs(eff_in - lib_eff_in)
+    success = (tax_in == lib_tax) & k_pass
+    return valid, success, err
+
+
+def _sell_exact_in(ops, v):
+    rQ, rB, sellTax, b = v["r_quote"], v["r_base"], v["sell_tax"], v["base_in"]
+    valid = (b > 0) & (rQ > 0) & (rB > 0)
+
+    # library_getAmountsOut_sell
+    with_fee = ops.mul(b, 998)
+    lib_gross = _div(ops.mul(with_fee, rQ), ops.mul(rB, 1000) + with_fee, valid)
+    lib_net = ops.mul(lib_gross, BPS - sellTax) // BPS
+    valid &= (lib_net > 0) & (lib_gross < rQ)
+
+    gross, _, k_pass, valid = _pair_sell(ops, rQ, rB, sellTax, b, lib_net, valid)
+    diff = gross - lib_gross
+    success = k_pass & (np.abs(diff) <= 1)
+    return valid, success, np.abs(diff)
+
+
+def _sell_exact_out(ops, v):
+    rQ, rB, sellTax, n = v["r_quote"], v["r_base"], v["sell_tax"], v["net_quote_out"]
+    valid = (n > 0) & (rQ > 0) & (rB > 0)
+
+    # library_getAmountsIn_sell
+    denom = BPS - sellTax
+    lib_gross = (ops.mul(n, BPS) + denom - 1) // denom
+    valid &= lib_gross < rQ
+    lib_base_in = _div(ops.mul(ops.mul(rB, lib_gross), 1000), ops.mul(rQ - lib_gross, 998), valid) + 1
+    valid &= lib_base_in < ops.mul(rB, 10)
+
+    gross, _, k_pass, valid = _pair_sell(ops, rQ, rB, sellTax, lib_base_in, n, valid)
+    gross_match = gross == lib_gross
+    success = gross_match & k_pass
+    return valid, success, np.where(gross_match, 0, 1)
+
+
+def _buy_exact_out(ops, v):
+    rQ, rB, buyTax, o = v["r_quote"], v["r_base"], v["buy_tax"], v["base_out"]
+    valid = (o > 0) & (o < rB) & (rQ > 0)
+
+    # library_getAmountsIn_buy
+    lib_net_in = _div(ops.mul(ops.mul(rQ, o), 1000), ops.mul(rB - o, 998), valid) + 1
+    denom = BPS - buyTax
+    lib_raw_in = (ops.mul(lib_net_in, BPS) + denom - 1) // denom
+    valid &= lib_raw_in > 0
+
+    _, eff_in, k_pass, valid = _pair_buy(ops, rQ, rB, buyTax, lib_raw_in, o, valid)
+    diff = eff_in - lib_net_in
+    success = k_pass & (diff >= 0)
+    return valid, success, np.abs(diff)
+
+
+_KERNELS = {
+    "buy_exact_in": _buy_exact_in,
+    "sell_exact_in": _sell_exact_in,
+    "sell_exact_out": _sell_exact_out,
+    "buy_exact_out": _buy_exact_out,
+}
+
+
+# ─── Batch Container ───
+
+_FIELDS = (
+    "r_quote",
+    "r_base",
+    "buy_tax",
+    "sell_tax",
+    "quote_in",
+    "base_in",
+    "net_quote_out",
+    "base_out",
+)
+
+
+@dataclass
+class VectorBatch:
+    """Column arrays of test vectors; one row feeds all four directions."""
+
+    r_quote: np.ndarray
+    r_base: np.ndarray
+    buy_tax: np.ndarray
+    sell_tax: np.ndarray
+    is_quote0: np.ndarray
+    quote_in: np.ndarray       # direction 1 rawQuoteIn
+    base_in: np.ndarray        # direction 2 baseIn
+    net_quote_out: np.ndarray  # direction 3 netQuoteOut
+    base_out: np.ndarray       # direction 4 baseOut
+
+    def __len__(self) -> int:
+        return len(self.r_quote)
+
+    def fast_mask(self) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for name in _FIELDS:
+            col = getattr(self, name)
+            if col.dtype == object:
+                mask &= np.array([0 <= x < _FAST_INPUT_LIMIT for x in col], dtype=bool)
+            else:
+                mask &= (col >= 0) & (col < _FAST_INPUT_LIMIT)
+        return mask
+
+    def columns(self, idx: np.ndarray, dtype) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name)[idx].astype(dtype) for name in _FIELDS}
+
+
+@dataclass
+class DirectionOutcome:
+    """Per-direction results for the rows of one lane chunk."""
+
+    index: np.ndarray    # row indices into the batch
+    valid: np.ndarray    # row was a legal vector (scalar path would not skip it)
+    success: np.ndarray
+    error_wei: np.ndarray
+
+
+@dataclass
+class BatchOutcome:
+    batch: VectorBatch
+    chunks: Dict[str, List[DirectionOutcome]]
+    fast_rows: int
+    exact_rows: int
+
+
+def evaluate(batch: VectorBatch) -> BatchOutcome:
+    """Evaluate all four directions for every row of `batch`."""
+    chunks: Dict[str, List[DirectionOutcome]] = {d: [] for d in DIRECTIONS}
+    fast = batch.fast_mask()
+    fast_idx = np.nonzero(fast)[0]
+    exact_parts = [np.nonzero(~fast)[0]]
+
+    if fast_idx.size:
+        ops = _Int64Ops(fast_idx.size)
+        cols = batch.columns(fast_idx, np.int64)
+        with np.errstate(over="ignore"):
+            lane = {d: _KERNELS[d](ops, cols) for d in DIRECTIONS}
+        ok = ~ops.overflow
+        for d, (valid, success, err) in lane.items():
+            chunks[d].append(DirectionOutcome(fast_idx[ok], valid[ok], success[ok], err[ok]))
+        exact_parts.append(fast_idx[ops.overflow])
+
+    exact_idx = np.sort(np.concatenate(exact_parts))
+    if exact_idx.size:
+        ops = _ExactOps()
+        cols = batch.columns(exact_idx, object)
+        for d in DIRECTIONS:
+            valid, success, err = _KERNELS[d](ops, cols)
+            chunks[d].append(
+                DirectionOutcome(exact_idx, valid.astype(bool), success.astype(bool), err)
+            )
+
+    return BatchOutcome(batch, chunks, int(len(batch) - exact_idx.size), int(exact_idx.size))
+
+
+# ─── Grid Construction ───
+
+def _derive_amounts_scalar(rQuote, rBase, sellTax, frac):
+    return (
+        max(1, int(rQuote * frac)),
+        max(1, int(rBase * frac)),
+        max(1, int(rQuote * frac * (BPS - sellTax) // BPS)),
+        max(1, int(rBase * frac)),
+    )
+
+
+def build_grid(
+    reserves: Sequence[Tuple[int, int]],
+    taxes: Sequence[Tuple[int, int]],
+    fractions: Sequence[float],
+) -> VectorBatch:
+    """Cartesian grid in `run_verification` order: reserves × taxes × isQuote0 × fraction.
+
+    Amounts are derived exactly as the scalar loop does (float fraction of the
+    reserve, truncated, floored at 1).
+    """
+    res = np.array(reserves, dtype=object).reshape(-1, 2)
+    tax = np.array(taxes, dtype=np.int64).reshape(-1, 2)
+    fr = np.array(fractions, dtype=np.float64)
+    sides = np.array([True, False])
+    shape = (len(res), len(tax), 2, len(fr))
+
+    ri, ti, si, fi = (a.ravel() for a in np.indices(shape))
+    buy_tax = tax[ti, 0]
+    sell_tax = tax[ti, 1]
+    is_quote0 = sides[si]
+    frac = fr[fi]
+
+    if all(0 < int(x) < _FAST_INPUT_LIMIT for x in res.ravel()):
+        r_quote = res[:, 0].astype(np.int64)[ri]
+        r_base = res[:, 1].astype(np.int64)[ri]
+        q_scaled = r_quote.astype(np.float64) * frac
+        b_scaled = r_base.astype(np.float64) * frac
+        quote_in = np.maximum(1, q_scaled.astype(np.int64))
+        base_in = np.maximum(1, b_scaled.astype(np.int64))
+        net_quote_out = np.maximum(1, ((q_scaled * (BPS - sell_tax)) // BPS).astype(np.int64))
+        base_out = base_in.copy()
+    else:
+        r_quote = res[ri, 0]
+        r_base = res[ri, 1]
+        derived = [
+            _derive_amounts_scalar(q, b, int(s), float(f))
+            for q, b, s, f in zip(r_quote, r_base, sell_tax, frac)
+        ]
+        cols = np.array(derived, dtype=object).reshape(-1, 4)
+        quote_in, base_in, net_quote_out, base_out = (cols[:, k] for k in range(4))
+
+    return VectorBatch(
+        r_quote=r_quote,
+        r_base=r_base,
+        buy_tax=buy_tax,
+        sell_tax=sell_tax,
+        is_quote0=is_quote0,
+        quote_in=quote_in,
+        base_in=base_in,
+        net_quote_out=net_quote_out,
+        base_out=base_out,
+    )
+
+
+def wide_grid(
+    reserve_points: int,
+    fraction_points: int,
+    taxes: Sequence[Tuple[int, int]],
+    chunk_rows: int = 1 << 20,
+) -> Iterator[VectorBatch]:
+    """Dense grid: log-spaced reserves in [1e2, 1e9] on both sides, fractions in [1e-6, 0.5].
+
+    Yields batches of roughly `chunk_rows` rows so memory stays bounded as the
+    grid widens.
+    """
+    levels = sorted({int(x) for x in np.geomspace(1e2, 1e9, reserve_points)})
+    reserves = [(q, b) for q in levels for b in levels]
+    fractions = np.geomspace(1e-6, 0.5, fraction_points).tolist()
+    rows_per_reserve = len(taxes) * 2 * len(fractions)
+    step = max(1, chunk_rows // rows_per_reserve)
+    for start in range(0, len(reserves), step):
+        yield build_grid(reserves[start:start + step], taxes, fractions)
+
+
+# ─── Aggregation ───
+
+def _detail(batch: VectorBatch, direction: str, row: int) -> str:
+    side = "token0" if batch.is_quote0[row] else "token1"
+    amount_field = {
+        "buy_exact_in": "quote_in",
+        "sell_exact_in": "base_in",
+        "sell_exact_out": "net_quote_out",
+        "buy_exact_out": "base_out",
+    }[direction]
+    return (
+        f"side={side} rQ={batch.r_quote[row]} rB={batch.r_base[row]} "
+        f"{amount_field}={getattr(batch, amount_field)[row]} "
+        f"tax=({batch.buy_tax[row]},{batch.sell_tax[row]})"
+    )
+
+
+def _failures(batch: VectorBatch, direction: str, rows: np.ndarray):
+    for row in rows.tolist():
+        signature = model.failure_signature(
+            int(batch.r_quote[row]), int(batch.r_base[row]), int(batch.buy_tax[row]), int(batch.sell_tax[row]))
+        yield signature, _detail(batch, direction, row)
+
+
+def fold_into(results, outcome: BatchOutcome) -> None:
+    """Fold a batch outcome into a `Results` accumulator, keyed like `run_verification`.
+    Every failing row is handed over lazily, in row order."""
+    batch = outcome.batch
+    for direction in DIRECTIONS:
+        for side_flag, side in ((True, "token0"), (False, "token1")):
+            label = f"{direction}/{side}"
+            total = failed = 0
+            max_err = 0
+            failure_rows: List[np.ndarray] = []
+            for chunk in outcome.chunks[direction]:
+                rows = chunk.valid & (batch.is_quote0[chunk.index] == side_flag)
+                count = int(np.count_nonzero(rows))
+                if not count:
+                    continue
+                total += count
+                bad = rows & ~chunk.success
+                failed += int(np.count_nonzero(bad))
+                max_err = max(max_err, int(chunk.error_wei[rows].max()))
+                failure_rows.append(chunk.index[bad])
+            if total:
+                rows = np.sort(np.concatenate(failure_rows)) if failed else np.empty(0, dtype=np.int64)
+                results.record_many(label, total, failed, max_err, _failures(batch, direction, rows))
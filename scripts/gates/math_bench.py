@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Pair swap model hot path.
+
+Runs `pair_swap_buy`/`pair_swap_sell` (dict results, dataclass state) side by
+side with `pair_swap_buy_lean`/`pair_swap_sell_lean` (tuple results, slotted
+state) over the legal vectors of the default grid, and reports per variant:
+
+  - calls/s (best of `repeat` timed passes)
+  - peak bytes allocated while a call runs (tracemalloc)
+  - bytes still held per call by the returned result
+
+Every lean output is compared against the dict variant first; a mismatch makes
+the benchmark fail regardless of timings.
+
+`run_backend_bench` times the same kernels per integer backend (`int`,
+`gmpy2` when installed) on large-reserve vectors: the ≥10**18 grid cells plus
+Library-quoted swaps at 2^100..2^111 reserves. Every backend's outputs must
+equal the `int` ones, as must the default-grid result document.
+"""
+
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+import check_math_consistency as model
+
+_MEMORY_SAMPLE = 2_000
+
+
+@dataclass
+class BenchRow:
+    name: str
+    calls: int
+    calls_per_s: float
+    peak_bytes_per_call: float
+    retained_bytes_per_call: float
+
+
+@dataclass
+class BenchReport:
+    rows: List[BenchRow]
+    mismatches: List[str]
+
+    def speedup(self, kernel: str) -> float:
+        by_name = {row.name: row for row in self.rows}
+        return by_name[f"{kernel}_lean"].calls_per_s / by_name[kernel].calls_per_s
+
+
+@dataclass
+class BackendRow:
+    kernel: str
+    backend: str
+    calls: int
+    calls_per_s: float
+
+
+@dataclass
+class BackendReport:
+    vectors: int
+    rows: List[BackendRow]
+    mismatches: List[str]
+
+    def speedup(self, kernel: str, backend: str) -> float:
+        by_key = {(row.kernel, row.backend): row for row in self.rows}
+        return by_key[(kernel, backend)].calls_per_s / by_key[(kernel, "int")].calls_per_s
+
+
+def grid_vectors() -> Tuple[List[tuple], List[tuple]]:
+    """(state, amountIn, amountOut) triples for the buy and sell kernels, quoted
+    through the Library on the default grid so every call is a legal swap."""
+    buys, sells = [], []
+    for rQuote, rBase, buyTax, sellTax, isQuote0 in model.grid_cells():
+        state = model.PairState(rQuote, rBase, 0, buyTax, sellTax, isQuote0)
+        for frac in model.AMOUNTS_FACTOR:
+            rawIn = max(1, int(rQuote * frac))
+            baseOut = model.library_getAmountsOut_buy(rawIn, buyTax, rQuote, rBase)[2]
+            if 0 < baseOut < rBase:
+                buys.append((state, rawIn, baseOut))
+            baseIn = max(1, int(rBase * frac))
+            grossOut, _, netOut = model.library_getAmountsOut_sell(baseIn, sellTax, rBase, rQuote)
+            if netOut > 0 and grossOut < rQuote:
+                sells.append((state, baseIn, netOut))
+    return buys, sells
+
+
+def _lean(vectors: Sequence[tuple]) -> List[tuple]:
+    return [(model.LeanPairState.from_state(state), a, b) for state, a, b in vectors]
+
+
+def check_equal(name: str, reference: Callable, lean: Callable, vectors: Sequence[tuple]) -> List[str]:
+    mismatches = []
+    for state, a, b in vectors:
+        expected = tuple(reference(state, a, b).values())
+        for candidate in (state, model.LeanPairState.from_state(state)):
+            got = lean(candidate, a, b)
+            if got != expected:
+                mismatches.append(f"{name} {state} in={a} out={b}: {got} != {expected}")
+    return mismatches
+
+
+def _calls_per_s(fn: Callable, vectors: Sequence[tuple], min_calls: int, repeat: int) -> Tuple[int, float]:
+    loops = max(1, -(-min_calls // len(vectors)))
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            for state, a, b in vectors:
+                fn(state, a, b)
+        best = min(best, time.perf_counter() - started)
+    calls = loops * len(vectors)
+    return calls, calls / max(best, 1e-9)
+
+
+def _bytes_per_call(fn: Callable, vectors: Sequence[tuple]) -> Tuple[float, float]:
+    sample = [vectors[i % len(vectors)] for i in range(_MEMORY_SAMPLE)]
+    kept = []
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        base, _ = tracemalloc.get_traced_memory()
+        for state, a, b in sample:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            kept.append(fn(state, a, b))
+            peak_total += tracemalloc.get_traced_memory()[1] - current
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The `kept` list's own growth is shared by both variants.
+    return peak_total / len(sample), (retained - base) / len(sample)
+
+
+def run_bench(min_calls: int = 200_000, repeat: int = 3) -> BenchReport:
+    buys, sells = grid_vectors()
+    kernels = [
+        ("pair_swap_buy", model.pair_swap_buy, model.pair_swap_buy_lean, buys),
+        ("pair_swap_sell", model.pair_swap_sell, model.pair_swap_sell_lean, sells),
+    ]
+
+    mismatches = []
+    for name, reference, lean, vectors in kernels:
+        mismatches.extend(check_equal(name, reference, lean, vectors))
+
+    rows = []
+    for name, reference, lean, vectors in kernels:
+        for label, fn, inputs in ((name, reference, vectors), (f"{name}_lean", lean, _lean(vectors))):
+            calls, rate = _calls_per_s(fn, inputs, min_calls, repeat)
+            peak, retained = _bytes_per_call(fn, inputs)
+            rows.append(BenchRow(label, calls, rate, peak, retained))
+    return BenchReport(rows, mismatches)
+
+
+def large_vectors(seed: int = 20_250_305, per_bucket: int = 16) -> Tuple[List[tuple], List[tuple]]:
+    """Buy and sell vectors with 10**18-scale and 2^100..2^111 reserves that
+    every kernel executes without reverting."""
+    import math_domain
+
+    buys, sells = grid_vectors()
+    buys = [v for v in buys if max(v[0].rQuote, v[0].rBase) >= 10**18]
+    sells = [v for v in sells if max(v[0].rQuote, v[0].rBase) >= 10**18]
+    rng = random.Random(seed)
+    for family, out in (("buy_k", buys), ("sell_k", sells)):
+        for reserve_bits in math_domain.RESERVE_BUCKETS:
+            for amount_bits in math_domain.AMOUNT_BUCKETS[family]:
+                for _ in range(per_bucket):
+                    sample = math_domain.draw(rng, family, reserve_bits, amount_bits)
+                    if sample is not None and sample[4] == math_domain.OK:
+                        out.append(sample[1:4])
+    return buys, sells
+
+
+def _lift(vectors: Sequence[tuple], lean: bool) -> List[tuple]:
+    return [(model.lift_state(model.LeanPairState.from_state(state) if lean else state), model.lift(a), model.lift(b))
+            for state, a, b in vectors]
+
+
+def _as_ints(result) -> tuple:
+    values = result.values() if isinstance(result, dict) else result
+    return tuple(v if isinstance(v, bool) else int(v) for v in values)
+
+
+def run_backend_bench(min_calls: int = 200_000, repeat: int = 3) -> BackendReport:
+    buys, sells = large_vectors()
+    kernels = [
+        ("pair_swap_buy", model.pair_swap_buy, False, buys),
+        ("pair_swap_buy_lean", model.pair_swap_buy_lean, True, buys),
+        ("pair_swap_sell", model.pair_swap_sell, False, sells),
+        ("pair_swap_sell_lean", model.pair_swap_sell_lean, True, sells),
+    ]
+    expected = {name: [_as_ints(fn(*v)) for v in vectors] for name, fn, _, vectors in kernels}
+    expected_doc = model.run_verification().to_dict()
+
+    previous = model.backend
+    rows, mismatches = [], []
+    try:
+        for backend in model.BACKENDS:
+            model.set_backend(backend)
+            for name, fn, lean, vectors in kernels:
+                inputs = _lift(vectors, lean)
+                for v, want in zip(inputs, expected[name]):
+                    got = _as_ints(fn(*v))
+                    if got != want:
+                        mismatches.append(f"{name}[{backend}] {v[0]} in={v[1]} out={v[2]}: {got} != {want}")
+                calls, rate = _calls_per_s(fn, inputs, min_calls, repeat)
+                rows.append(BackendRow(name, backend, calls, rate))
+            if model.run_verification().to_dict() != expected_doc:
+                mismatches.append(f"default grid result document differs under {backend}")
+    finally:
+        model.set_backend(previous)
+    return BackendReport(len(buys) + len(sells), rows, mismatches)
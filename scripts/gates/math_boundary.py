@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Bisection boundary search over swap input amounts.
+
+Instead of scanning fixed amount ranges, each boundary is located with
+O(log n) model calls, which makes 10**18-scale reserves as cheap to probe as
+small pools:
+
+  - `tax_flip`: first amount at which the Pair (and the Library) charge a
+    non-zero tax. Taxes are monotone in the amount for all four directions.
+  - `delta`: amounts where the Pair−Library difference (effIn, gross roundtrip,
+    overpayment) changes value, found by galloping from log-spaced probes.
+    Deltas are not monotone, so an excursion narrower than the gallop stride
+    can be stepped over; every boundary that is reported is exact.
+  - `k_edge`: for a Library-quoted output, the smallest input the Pair still
+    accepts (K margin crosses zero). The quoted input must not be below it.
+"""
+
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from check_math_consistency import (
+    BPS,
+    library_getAmountsIn_buy,
+    library_getAmountsIn_sell,
+    library_getAmountsOut_buy,
+    library_getAmountsOut_sell,
+    pair_swap_buy_lean,
+    pair_swap_sell_lean,
+)
+
+# Lean tuple indices (BUY_FIELDS / SELL_FIELDS).
+_BUY_TAX, _BUY_EFFIN, _BUY_KPASS = 0, 2, 7
+_SELL_TAX, _SELL_GROSS, _SELL_KPASS = 1, 2, 8
+
+DIRECTIONS = ("buy_exact_in", "sell_exact_in", "sell_exact_out", "buy_exact_out")
+
+
+class Boundary(NamedTuple):
+    kind: str
+    direction: str
+    amount: int       # first amount on the new side
+    before: object    # observable at amount - 1
+    after: object     # observable at amount
+
+
+# ─── Search primitives ───
+
+def first_true(pred: Callable[[int], bool], lo: int, hi: int) -> Optional[int]:
+    """Smallest x in [lo, hi] with pred(x), for pred monotone False→True."""
+    if lo > hi or not pred(hi):
+        return None
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if pred(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def bisect_change(f: Callable[[int], object], lo: int, hi: int, f_lo=None) -> int:
+    """x in (lo, hi] with f(x - 1) == f(lo) != f(x), given f(lo) != f(hi).
+
+    Works for any f: the bracket keeps f(lo) on the left and a different value
+    on the right, so it always ends on a real transition.
+    """
+    f_lo = f(lo) if f_lo is None else f_lo
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if f(mid) == f_lo:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def next_change(f: Callable[[int], object], start: int, hi: int) -> Optional[int]:
+    """Nearest transition above `start` (galloping, then bisection)."""
+    v0 = f(start)
+    step, lo = 1, start
+    while True:
+        probe = min(start + step, hi)
+        if f(probe) != v0:
+            return bisect_change(f, lo, probe, v0)
+        if probe == hi:
+            return None
+        lo, step = probe, step * 2
+
+
+def transitions(f: Callable[[int], object], lo: int, hi: int, limit: int) -> List[int]:
+    """Leftmost `limit` transitions of a monotone step function on [lo, hi]."""
+    found: List[int] = []
+
+    def split(a: int, b: int, fa, fb):
+        if fa == fb or len(found) >= limit:
+            return
+        if b - a == 1:
+            found.append(b)
+            return
+        mid = (a + b) // 2
+        fm = f(mid)
+        split(a, mid, fa, fm)
+        split(mid, b, fm, fb)
+
+    split(lo, hi, f(lo), f(hi))
+    return found
+
+
+# ─── Direction observables ───
+
+class DirectionModel:
+    """Library quote + Pair execution of one direction as functions of the amount.
+
+    `execute(a)` returns (library_tax, pair_tax, delta, quoted_in, accepts)
+    or None when the amount is not a legal quote; `accepts(x)` re-runs the
+    Pair with input x for the same quoted output and returns k_pass.
+    `calls` counts executions so searches can report their cost.
+    """
+
+    def __init__(self, state, direction: str):
+        self.state = state
+        self.direction = direction
+        self.calls = 0
+        rQuote, rBase = state.rQuote, state.rBase
+        if direction == "buy_exact_in":
+            self.hi = rQuote * 1000
+        elif direction == "sell_exact_in":
+            self.hi = rBase * 1000
+        elif direction == "sell_exact_out":
+            self.hi = (rQuote - 1) * (BPS - state.sellTax) // BPS
+        else:
+            self.hi = rBase - 1
+
+    def execute(self, amount: int):
+        self.calls += 1
+        s = self.state
+        rQuote, rBase = s.rQuote, s.rBase
+        try:
+            if self.direction == "buy_exact_in":
+                lib_tax, lib_effIn, baseOut = library_getAmountsOut_buy(amount, s.buyTax, rQuote, rBase)
+                if not 0 < baseOut < rBase:
+                    return None
+                pair = pair_swap_buy_lean(s, amount, baseOut)
+                delta = (pair[_BUY_TAX] - lib_tax, pair[_BUY_EFFIN] - lib_effIn)
+                return lib_tax, pair[_BUY_TAX], delta, amount, lambda x: _buy_k(s, x, baseOut)
+            if self.direction == "sell_exact_in":
+                lib_gross, lib_tax, netOut = library_getAmountsOut_sell(amount, s.sellTax, rBase, rQuote)
+                if netOut <= 0 or lib_gross >= rQuote:
+                    return None
+                pair = pair_swap_sell_lean(s, amount, netOut)
+                delta = lib_gross - pair[_SELL_GROSS]
+                return lib_tax, pair[_SELL_TAX], delta, amount, lambda x: _sell_k(s, x, netOut)
+            if self.direction == "sell_exact_out":
+                lib_gross, lib_tax, baseIn = library_getAmountsIn_sell(amount, s.sellTax, rBase, rQuote)
+                if lib_gross >= rQuote:
+                    return None
+                pair = pair_swap_sell_lean(s, baseIn, amount)
+                delta = pair[_SELL_GROSS] - lib_gross
+                return lib_tax, pair[_SELL_TAX], delta, baseIn, lambda x: _sell_k(s, x, amount)
+            lib_netIn, lib_tax, rawIn = library_getAmountsIn_buy(amount, s.buyTax, rQuote, rBase)
+            pair = pair_swap_buy_lean(s, rawIn, amount)
+            delta = pair[_BUY_EFFIN] - lib_netIn
+            return lib_tax, pair[_BUY_TAX], delta, rawIn, lambda x: _buy_k(s, x, amount)
+        except (AssertionError, ZeroDivisionError):
+            return None
+
+    def delta_ok(self, delta) -> bool:
+        if self.direction == "buy_exact_in":
+            return delta == (0, 0)
+        if self.direction == "sell_exact_in":
+            return 0 <= delta <= 1
+        if self.direction == "sell_exact_out":
+            return delta == 0
+        return delta >= 0
+
+    def observable(self, kind: str) -> Callable[[int], object]:
+        """Step function for `kind`; illegal amounts map to None."""
+        index = {"lib_tax": 0, "pair_tax": 1, "delta": 2}[kind]
+
+        def f(amount: int):
+            outcome = self.execute(amount)
+            return None if outcome is None else outcome[index]
+        return f
+
+
+def _buy_k(state, rawQuoteIn: int, baseOut: int) -> bool:
+    try:
+        return pair_swap_buy_lean(state, rawQuoteIn, baseOut)[_BUY_KPASS]
+    except AssertionError:
+        return False
+
+
+def _sell_k(state, baseIn: int, netQuoteOut: int) -> bool:
+    try:
+        return pair_swap_sell_lean(state, baseIn, netQuoteOut)[_SELL_KPASS]
+    except AssertionError:
+        return False
+
+
+def probes(hi: int, per_decade: int = 1) -> List[int]:
+    """Log-spaced amounts in [1, hi]."""
+    points, x = [], 1
+    step = 10 ** (1 / per_decade)
+    while x <= hi:
+        points.append(int(x))
+        x *= step
+    return sorted(set(points))
+
+
+def legal_range(model: DirectionModel) -> Optional[Tuple[int, int]]:
+    """[lo, hi] of amounts the Library can quote and the Pair can execute.
+
+    Legal amounts form one interval: small exact-in amounts quote zero output,
+    large ones (and large exact-out targets) run out of liquidity or overflow
+    the uint96 vault.
+    """
+    legal = lambda a: model.execute(a) is not None
+    hi = model.hi
+    if hi < 1:
+        return None
+    lo = 1 if legal(1) else first_true(legal, 1, hi)
+    if lo is None:
+        return None
+    if not legal(hi):
+        hi = first_true(lambda a: not legal(a), lo, hi) - 1
+    return lo, hi
+
+
+def tax_flip(model: DirectionModel, source: str = "pair_tax") -> Optional[int]:
+    """First legal amount with a non-zero tax."""
+    bounds = legal_range(model)
+    if bounds is None:
+        return None
+    tax = model.observable(source)
+    return first_true(lambda a: tax(a) >= 1, *bounds)
+
+
+def delta_boundaries(model: DirectionModel, per_decade: int = 1) -> List[Boundary]:
+    """Pair−Library delta transitions reached by galloping up from each probe.
+    Edges of the legal quote domain are not reported (see `legal_range`)."""
+    bounds = legal_range(model)
+    if bounds is None:
+        return []
+    lo, hi = bounds
+    f = model.observable("delta")
+    found = {}
+    for probe in probes(hi, per_decade):
+        if probe < lo:
+            continue
+        x = next_change(f, probe, hi)
+        if x is not None and x not in found:
+            found[x] = Boundary("delta", model.direction, x, f(x - 1), f(x))
+    return [found[x] for x in sorted(found)]
+
+
+def k_edge(model: DirectionModel, amount: int):
+    """(quoted input, smallest input the Pair accepts for the same output) or None."""
+    outcome = model.execute(amount)
+    if outcome is None:
+        return None
+    quoted_in, accepts = outcome[3], outcome[4]
+    return quoted_in, first_true(accepts, 0, quoted_in)
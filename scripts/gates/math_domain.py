@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Log2-stratified large-domain sampler mirroring `PairKOverflowDomain.t.sol`.
+
+Samples are drawn in equal numbers from every (family, reserve bucket, amount
+bucket) stratum, where a bucket is one power of two [2^b, 2^(b+1)):
+
+  - buy_k / sell_k: reserves in 2^100..2^112, Library-quoted exact-in buys
+    and exact-out sells with amounts from 1 wei up to the uint112 bound
+    (sell outputs capped at 1% of the quote reserve, as in the Solidity test).
+    A Library quote must never fail K; it reverts with `UniswapV2: OVERFLOW`
+    exactly when a post-swap reserve passes uint112 (or earlier, with
+    VAULT_OVERFLOW, when the tax passes uint96).
+  - sell_huge: the same reserves and a base input of 2^112..2^246 for one
+    wei of quote out, straddling the 2^256 / 1000^2 product at which
+    `K_MULTIPLY_OVERFLOW` takes over from the uint112 `_update` bound. With
+    reserves ≥ 2^108 and input ≥ 2^220 (the Solidity fuzz domain) it must
+    be K_MULTIPLY_OVERFLOW.
+
+Each sample runs through the token-space `pair_swap_buy` / `pair_swap_sell`
+kernels with a random token order and is compared with `expected_outcome`,
+an independent quote/base restatement of the Pair's revert order
+(VAULT_OVERFLOW → K_MULTIPLY_OVERFLOW → K → _update). Inputs stay below
+2^246 so SafeMath's `mul(1000)` cannot overflow first.
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from check_math_consistency import (
+    BPS,
+    UINT112_MAX,
+    UINT256_MAX,
+    VAULT_MAX,
+    PairState,
+    ceilDiv,
+    library_getAmountsIn_sell,
+    library_getAmountsOut_buy,
+    lift,
+    lift_state,
+    pair_swap_buy,
+    pair_swap_sell,
+    set_backend,
+)
+
+RESERVE_BUCKETS = tuple(range(100, 112))
+AMOUNT_BUCKETS = {
+    "buy_k": tuple(range(3, 112, 4)),
+    "sell_k": tuple(range(3, 112, 4)),
+    "sell_huge": tuple(range(112, 246, 6)),
+}
+FAMILIES = tuple(AMOUNT_BUCKETS)
+
+OK = "OK"
+OUTCOMES = (OK, "VAULT_OVERFLOW", "K_MULTIPLY_OVERFLOW", "K", "UniswapV2: OVERFLOW")
+
+
+def _in_bucket(rng: random.Random, bits: int) -> int:
+    return rng.randint(1 << bits, (1 << (bits + 1)) - 1)
+
+
+def expected_outcome(rQuote: int, rBase: int, tax: int, effInQuote: int, effInBase: int,
+                     effQuote: int, effBase: int) -> str:
+    """The Pair's verdict from post-swap effective reserves, checks in revert order."""
+    if tax > VAULT_MAX:
+        return "VAULT_OVERFLOW"
+    product = (effQuote * 1000 - effInQuote * 2) * (effBase * 1000 - effInBase * 2)
+    if product > UINT256_MAX:
+        return "K_MULTIPLY_OVERFLOW"
+    if product < rQuote * rBase * 1000**2:
+        return "K"
+    if effQuote > UINT112_MAX or effBase > UINT112_MAX:
+        return "UniswapV2: OVERFLOW"
+    return OK
+
+
+def _model_outcome(fn, state: PairState, amountIn: int, amountOut: int) -> str:
+    try:
+        result = fn(lift_state(state), lift(amountIn), lift(amountOut))
+    except AssertionError as exc:
+        message = str(exc)
+        return next((o for o in OUTCOMES if message.startswith(o)), message)
+    return OK if result["k_pass"] else "K"
+
+
+def draw(rng: random.Random, family: str, reserve_bits: int, amount_bits: int):
+    """One sample: (model fn, state, amountIn, amountOut, expected verdict), or
+    None when the Library cannot quote it."""
+    rQuote = _in_bucket(rng, reserve_bits)
+    rBase = _in_bucket(rng, reserve_bits)
+    # Untaxed quarter: without a buy tax large buys reach the uint112 bound before uint96.
+    buyTax = 0 if rng.random() < 0.25 else rng.randint(1, 2000)
+    sellTax = rng.randint(0, 2000)
+    state = PairState(rQuote, rBase, 0, buyTax, sellTax, rng.random() < 0.5)
+
+    if family == "buy_k":
+        rawIn = _in_bucket(rng, amount_bits)
+        _, _, baseOut = library_getAmountsOut_buy(rawIn, buyTax, rQuote, rBase)
+        if baseOut == 0:
+            return None
+        tax = rawIn * buyTax // BPS
+        effQuote = rQuote + rawIn - tax
+        expected = expected_outcome(rQuote, rBase, tax, effQuote - rQuote, 0, effQuote, rBase - baseOut)
+        return pair_swap_buy, state, rawIn, baseOut, expected
+
+    if family == "sell_k":
+        netOut = min(_in_bucket(rng, amount_bits), rQuote // 100)  # sellCap, as in the Solidity test
+        grossOut, _, baseIn = library_getAmountsIn_sell(netOut, sellTax, rBase, rQuote)
+        effBase = rBase + baseIn
+        expected = expected_outcome(rQuote, rBase, grossOut - netOut, 0, baseIn, rQuote - grossOut, effBase)
+        return pair_swap_sell, state, baseIn, netOut, expected
+
+    baseIn = _in_bucket(rng, amount_bits)
+    grossOut = ceilDiv(BPS, BPS - sellTax)
+    expected = expected_outcome(rQuote, rBase, grossOut - 1, 0, baseIn, rQuote - grossOut, rBase + baseIn)
+    if reserve_bits >= 108 and amount_bits >= 220 and expected != "K_MULTIPLY_OVERFLOW":
+        expected = "K_MULTIPLY_OVERFLOW (solidity domain)"
+    return pair_swap_sell, state, baseIn, 1, expected
+
+
+@dataclass
+class BucketStats:
+    family: str
+    reserve_bits: int
+    amount_bits: int
+    samples: int = 0
+    passed: int = 0
+    skipped: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return self.samples - self.passed
+
+
+def run_bucket(task: Tuple[int, str, int, int, int, str]) -> BucketStats:
+    seed, family, reserve_bits, amount_bits, samples, backend = task
+    set_backend(backend)
+    rng = random.Random(f"{seed}:{family}:{reserve_bits}:{amount_bits}")
+    stats = BucketStats(family, reserve_bits, amount_bits)
+    attempts = 0
+    while stats.samples < samples and attempts < 4 * samples:
+        attempts += 1
+        sample = draw(rng, family, reserve_bits, amount_bits)
+        if sample is None:
+            stats.skipped += 1
+            continue
+        fn, state, amountIn, amountOut, expected = sample
+        outcome = _model_outcome(fn, state, amountIn, amountOut)
+        stats.samples += 1
+        stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+        # A Library quote failing K is a finding even when the restatement agrees.
+        if outcome == expected and not (outcome == "K" and family != "sell_huge"):
+            stats.passed += 1
+        elif len(stats.failures) < 3:
+            stats.failures.append(
+                f"rQ={state.rQuote} rB={state.rBase} tax=({state.buyTax},{state.sellTax}) "
+                f"isQuote0={state.isQuote0} in={amountIn} out={amountOut}: model={outcome} expected={expected}")
+    return stats
+
+
+@dataclass
+class DomainReport:
+    buckets: List[BucketStats]
+    elapsed_s: float
+
+    @property
+    def samples(self) -> int:
+        return sum(b.samples for b in self.buckets)
+
+    @property
+    def failed(self) -> int:
+        return sum(b.failed for b in self.buckets)
+
+
+def run_domain(seed: int, samples_per_bucket: int, workers: int = 0,
+               families: Optional[Tuple[str, ...]] = None, backend: str = "int") -> DomainReport:
+    """Every stratum gets `samples_per_bucket` samples; buckets run on a
+    process pool and come back in grid order. `backend` names the integer
+    type the Pair kernels run on (see `check_math_consistency.BACKENDS`)."""
+    tasks = [(seed, family, rb, ab, samples_per_bucket, backend)
+             for family in (families or FAMILIES)
+             for rb in RESERVE_BUCKETS
+             for ab in AMOUNT_BUCKETS[family]]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers == 1:
+        buckets = [run_bucket(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            buckets = list(pool.map(run_bucket, tasks, chunksize=8))
+    return DomainReport(buckets, time.perf_counter() - started)
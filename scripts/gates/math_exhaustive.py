@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Exhaustive small-domain enumerator for the four swap directions.
+
+Covers every reserve pair (rQuote, rBase) in [1, bound]², every tax in
+0..MAX_TAX_BPS and every legal amount (exact-in inputs up to `bound`, exact-out
+outputs up to the reserve). Brute force is ~10^14 vectors at bound=2^12, so the
+domain is folded into provably-equivalent classes first:
+
+  - isQuote0: the Pair math is symmetric under token ordering (one pass, ×2).
+  - buy exact-in: Library and Pair apply the same floor tax, so a vector only
+    depends on effIn = a - floor(a·t/BPS). Enumerate effIn and weight each class
+    by its (a, t) multiplicity.
+  - sell exact-in: the floor→ceil roundtrip delta depends only on (grossOut, t);
+    a table of per-gross delta counts collapses the tax axis. K is evaluated at
+    the two reachable Pair gross values (g, g-1); any other delta falls back to
+    the scalar model.
+  - sell exact-out: Library and Pair compute the same ceil gross, so a vector
+    only depends on gross. Enumerate gross weighted by its (netOut, t) count.
+  - buy exact-out: effIn(n, t) - n is periodic in n with period BPS - t (checked
+    when the table is built), and K is monotone in effIn. K is evaluated once at
+    effIn = netIn (the tax=0 point); rows that fail it fall back to the scalar
+    model per tax.
+
+The reserve axis is sharded across a process pool by rQuote.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+import check_math_consistency as model
+
+BPS = model.BPS
+MAX_TAX_BPS = 2000
+# int64 headroom for every product in the block kernels below.
+MAX_BOUND = 2**16
+DIRECTIONS = ("buy_exact_in", "sell_exact_in", "sell_exact_out", "buy_exact_out")
+TAX_VALUES = np.arange(MAX_TAX_BPS + 1, dtype=np.int64)
+_TAX_CHUNK = 64
+
+
+@dataclass
+class TaxTables:
+    """Reserve-independent tax-axis tables for a given bound."""
+
+    bound: int
+    mult_eff_in: np.ndarray   # [e] -> #(a, t) with a <= bound and a - floor(a*t/BPS) == e
+    sell_same: np.ndarray     # [g] -> #t with netOut > 0 and roundtrip gross == g
+    sell_minus1: np.ndarray   # [g] -> #t with netOut > 0 and roundtrip gross == g - 1
+    sell_other: np.ndarray    # [g] -> #t with netOut > 0 and any other roundtrip delta
+    sell_max_err: np.ndarray  # [g] -> max |delta| over those t
+    mult_gross: np.ndarray    # [g] -> #(netOut, t) with ceil(netOut*BPS/(BPS-t)) == g
+    overpay: List[np.ndarray]  # [t] -> effIn - netIn over one period, index (netIn-1) % (BPS-t)
+    overpay_min: int
+    overpay_max: int
+
+
+@lru_cache(maxsize=None)
+def tax_tables(bound: int) -> TaxTables:
+    a = np.arange(bound + 1, dtype=np.int64)
+    mult_eff_in = np.zeros(bound + 1, dtype=np.int64)
+    sell_same = np.zeros(bound, dtype=np.int64)
+    sell_minus1 = np.zeros(bound, dtype=np.int64)
+    sell_other = np.zeros(bound, dtype=np.int64)
+    sell_max_err = np.zeros(bound, dtype=np.int64)
+    g = a[:bound]
+
+    for start in range(0, len(TAX_VALUES), _TAX_CHUNK):
+        t = TAX_VALUES[start:start + _TAX_CHUNK, None]
+        e = a[1:] - a[1:] * t // BPS
+        mult_eff_in += np.bincount(e.ravel(), minlength=bound + 1)
+
+        net = g * (BPS - t) // BPS
+        valid = net > 0
+        back = (net * BPS + (BPS - t) - 1) // (BPS - t)
+        delta = back - g
+        sell_same += np.count_nonzero(valid & (delta == 0), axis=0)
+        sell_minus1 += np.count_nonzero(valid & (delta == -1), axis=0)
+        sell_other += np.count_nonzero(valid & (delta != 0) & (delta != -1), axis=0)
+        sell_max_err = np.maximum(sell_max_err, np.where(valid, np.abs(delta), 0).max(axis=0))
+
+    mult_gross = np.zeros(bound, dtype=np.int64)
+    overpay = []
+    for t in range(MAX_TAX_BPS + 1):
+        period = BPS - t
+        n_max = (bound - 1) * period // BPS
+        n = np.arange(1, n_max + 1, dtype=np.int64)
+        mult_gross += np.bincount((n * BPS + period - 1) // period, minlength=bound)[:bound]
+
+        n = np.arange(1, 2 * period + 1, dtype=np.int64)
+        raw = (n * BPS + period - 1) // period
+        diff = raw - raw * t // BPS - n
+        if not np.array_equal(diff[:period], diff[period:]):
+            raise AssertionError(f"buy exact-out overpay is not periodic for tax={t}")
+        overpay.append(diff[:period])
+
+    return TaxTables(
+        bound=bound,
+        mult_eff_in=mult_eff_in,
+        sell_same=sell_same,
+        sell_minus1=sell_minus1,
+        sell_other=sell_other,
+        sell_max_err=sell_max_err,
+        mult_gross=mult_gross,
+        overpay=overpay,
+        overpay_min=int(min(d.min() for d in overpay)),
+        overpay_max=int(max(d.max() for d in overpay)),
+    )
+
+
+# ─── Scalar Fallbacks ───
+
+def _state(rQ: int, rB: int, buyTax: int, sellTax: int):
+    return model.PairState(rQuote=rQ, rBase=rB, vault=0, buyTax=buyTax, sellTax=sellTax, isQuote0=True)
+
+
+def _sell_exact_in_scalar(rQ: int, rB: int, baseIn: int, sellTax: int) -> Tuple[bool, int]:
+    grossOut, _, netOut = model.library_getAmountsOut_sell(baseIn, sellTax, rB, rQ)
+    pair = model.pair_swap_sell(_state(rQ, rB, 0, sellTax), baseIn, netOut)
+    diff = pair["grossQuoteOut"] - grossOut
+    return pair["k_pass"] and abs(diff) <= 1, diff
+
+
+def _buy_exact_out_scalar(rQ: int, rB: int, baseOut: int, buyTax: int) -> Tuple[bool, int]:
+    netIn, _, rawIn = model.library_getAmountsIn_buy(baseOut, buyTax, rQ, rB)
+    pair = model.pair_swap_buy(_state(rQ, rB, buyTax, 0), rawIn, baseOut)
+    diff = pair["effIn_quote"] - netIn
+    return pair["k_pass"] and diff >= 0, diff
+
+
+# ─── Block Kernels ───
+
+class _Tally:
+    def __init__(self, max_examples: int):
+        self.covered = {d: 0 for d in DIRECTIONS}
+        self.failed = {d: 0 for d in DIRECTIONS}
+        self.max_err = {d: 0 for d in DIRECTIONS}
+        self.examples = {d: [] for d in DIRECTIONS}
+        self.evaluations = 0
+        self.max_examples = max_examples
+
+    def add(self, direction, covered, failed, max_err=0):
+        self.covered[direction] += int(covered)
+        self.failed[direction] += int(failed)
+        self.max_err[direction] = max(self.max_err[direction], int(max_err))
+
+    def example(self, direction, detail):
+        if len(self.examples[direction]) < self.max_examples:
+            self.examples[direction].append(detail)
+
+
+def _buy_exact_in_block(tally, tables, rQ, rB, x):
+    e = x
+    with_fee = e * 998
+    base_out = with_fee * rB // (rQ * 1000 + with_fee)
+    valid = (base_out > 0) & (base_out < rB)
+    adj_quote = (rQ + e) * 1000 - e * 2
+    adj_base = (rB - base_out) * 1000
+    k_pass = adj_quote * adj_base >= rQ * rB * 1_000_000
+    weight = tables.mult_eff_in[e]
+    bad = valid & ~k_pass
+    tally.add("buy_exact_in", (weight * valid).sum(), (weight * bad).sum())
+    for i, j in zip(*np.nonzero(bad)):
+        tally.example("buy_exact_in", f"rQ={rQ} rB={rB[i, 0]} effIn={e[0, j]} K=✗")
+
+
+def _sell_exact_in_block(tally, tables, rQ, rB, x):
+    b = x
+    with_fee = b * 998
+    gross = with_fee * rQ // (rB * 1000 + with_fee)
+    adj_base = (rB + b) * 1000 - b * 2
+    k_old = rQ * rB * 1_000_000
+    k_same = (rQ - gross) * 1000 * adj_base >= k_old
+    k_minus1 = (rQ - gross + 1) * 1000 * adj_base >= k_old
+
+    same = tables.sell_same[gross]
+    minus1 = tables.sell_minus1[gross]
+    other = tables.sell_other[gross]
+    covered = same + minus1 + other
+    failed = same * ~k_same + minus1 * ~k_minus1
+    max_err = tables.sell_max_err[gross][covered > 0].max(initial=0)
+    tally.add("sell_exact_in", covered.sum(), failed.sum(), max_err)
+
+    for i, j in zip(*np.nonzero((same > 0) & ~k_same | (minus1 > 0) & ~k_minus1)):
+        tally.example("sell_exact_in", f"rQ={rQ} rB={rB[i, 0]} baseIn={b[0, j]} gross={gross[i, j]} K=✗")
+
+    # Roundtrip deltas outside {0, -1}: no equivalence class, evaluate per tax.
+    for i, j in zip(*np.nonzero(other)):
+        rb, bi = int(rB[i, 0]), int(b[0, j])
+        for t in range(MAX_TAX_BPS + 1):
+            net = int(gross[i, j]) * (BPS - t) // BPS
+            back = model.ceilDiv(net * BPS, BPS - t)
+            if net <= 0 or back - int(gross[i, j]) in (0, -1):
+                continue
+            ok, diff = _sell_exact_in_scalar(rQ, rb, bi, t)
+            tally.add("sell_exact_in", 0, 0 if ok else 1, abs(diff))
+            if not ok:
+                tally.example("sell_exact_in", f"rQ={rQ} rB={rb} baseIn={bi} sellTax={t} diff={diff}")
+
+
+def _sell_exact_out_block(tally, tables, rQ, rB, x):
+    g = np.minimum(x, rQ - 1)
+    in_range = x < rQ
+    den = (rQ - g) * 998
+    base_in = rB * g * 1000 // np.where(den > 0, den, 1) + 1
+    valid = in_range & (g > 0) & (base_in < rB * 10)
+    adj_quote = (rQ - g) * 1000
+    adj_base = (rB + base_in) * 1000 - base_in * 2
+    k_pass = adj_quote * adj_base >= rQ * rB * 1_000_000
+    weight = tables.mult_gross[g]
+    bad = valid & ~k_pass
+    tally.add("sell_exact_out", (weight * valid).sum(), (weight * bad).sum())
+    for i, j in zip(*np.nonzero(bad)):
+        tally.example("sell_exact_out", f"rQ={rQ} rB={rB[i, 0]} gross={g[i, j]} K=✗")
+
+
+def _buy_exact_out_block(tally, tables, rQ, rB, x):
+    valid = x < rB
+    o = np.where(valid, x, 1)
+    den = (rB - o) * 998
+    net_in = rQ * o * 1000 // np.where(den > 0, den, 1) + 1
+    adj_quote = (rQ + net_in) * 1000 - net_in * 2
+    adj_base = (rB - o) * 1000
+    # adj_quote * adj_base can exceed int64 here; compare against ceil(k_old / adj_base) instead.
+    k_pass = adj_quote >= -(-(rQ * rB * 1_000_000) // np.where(adj_base > 0, adj_base, 1))
+    taxes = len(TAX_VALUES)
+    failed = 0
+
+    if tables.overpay_min < 0:
+        for t, diff in enumerate(tables.overpay):
+            if diff.min() < 0:
+                failed += np.count_nonzero(valid & k_pass & (diff[(net_in - 1) % (BPS - t)] < 0))
+
+    # K failed at the smallest reachable effIn: evaluate every tax explicitly.
+    for i, j in zip(*np.nonzero(valid & ~k_pass)):
+        rb, bo = int(rB[i, 0]), int(o[i, j])
+        for t in range(MAX_TAX_BPS + 1):
+            ok, diff = _buy_exact_out_scalar(rQ, rb, bo, t)
+            if not ok:
+                failed += 1
+                tally.example("buy_exact_out", f"rQ={rQ} rB={rb} baseOut={bo} buyTax={t} diff={diff}")
+
+    tally.add("buy_exact_out", np.count_nonzero(valid) * taxes, failed, tables.overpay_max)
+
+
+_BLOCKS = (_buy_exact_in_block, _sell_exact_in_block, _sell_exact_out_block, _buy_exact_out_block)
+
+
+def enumerate_quote_reserve(rQ: int, bound: int, block_rows: int = 256, max_examples: int = 10) -> _Tally:
+    """Enumerate every rBase in [1, bound] and every amount for a single rQuote."""
+    tables = tax_tables(bound)
+    tally = _Tally(max_examples)
+    x = np.arange(1, bound + 1, dtype=np.int64)[None, :]
+    for start in range(1, bound + 1, block_rows):
+        rB = np.arange(start, min(start + block_rows, bound + 1), dtype=np.int64)[:, None]
+        for kernel in _BLOCKS:
+            kernel(tally, tables, rQ, rB, x)
+        tally.evaluations += rB.size * x.size * len(_BLOCKS)
+    return tally
+
+
+def _enumerate_shard(args):
+    return enumerate_quote_reserve(*args)
+
+
+# ─── Driver ───
+
+def run_exhaustive(bound: int, workers: int = 0, max_examples: int = 10):
+    """Enumerate the full [1, bound]² domain. Returns (Results, evaluations, elapsed)."""
+    if not 2 <= bound <= MAX_BOUND:
+        raise ValueError(f"bound must be in [2, {MAX_BOUND}], got {bound}")
+
+    started = time.perf_counter()
+    tax_tables(bound)
+    shards = [(rQ, bound, 256, max_examples) for rQ in range(1, bound + 1)]
+    totals = _Tally(max_examples)
+
+    def fold(part):
+        for d in DIRECTIONS:
+            totals.add(d, part.covered[d], part.failed[d], part.max_err[d])
+            for detail in part.examples[d]:
+                totals.example(d, detail)
+        totals.evaluations += part.evaluations
+
+    if workers == 1:
+        for shard in shards:
+            fold(_enumerate_shard(shard))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            for part in pool.map(_enumerate_shard, shards, chunksize=max(1, len(shards) // 256)):
+                fold(part)
+
+    results = model.Results(max_errors=max_examples * len(DIRECTIONS))
+    for d in DIRECTIONS:
+        # token0/token1 quote sides are identical under relabeling.
+        results.record_many(
+            f"{d}/exhaustive",
+            totals.covered[d] * 2,
+            totals.failed[d] * 2,
+            totals.max_err[d],
+            [(model.NO_SIGNATURE, detail) for detail in totals.examples[d]],
+        )
+    return results, totals.evaluations, time.perf_counter() - started
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Seeded property-based fuzzing of the Python Pair model.
+
+Samples reserves and amounts log-uniformly over the full uint112 domain (taxes
+uniformly over 0..MAX_TAX_BPS with extra weight on the edges), runs every
+sample through the four direction checks of `check_math_consistency.py` for a
+fixed time budget, and shrinks each failing case (K failure, tax mismatch,
+>1 wei gross divergence, ...) to a minimal reproducer written as JSON.
+
+A run is fully determined by its seed; the seed is printed and stored in every
+reproducer so the exact sequence can be regenerated.
+"""
+
+import json
+import random
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import check_math_consistency as model
+
+UINT112_MAX = 2**112 - 1
+MAX_TAX_BPS = 2000
+_TAX_EDGES = (0, 1, 2, MAX_TAX_BPS - 1, MAX_TAX_BPS)
+_SHRINK_BUDGET = 20_000
+
+
+@dataclass(frozen=True)
+class FuzzCase:
+    direction: str
+    rQuote: int
+    rBase: int
+    buyTax: int
+    sellTax: int
+    isQuote0: bool
+    amount: int
+
+    def state(self) -> "model.PairState":
+        return model.PairState(
+            rQuote=self.rQuote,
+            rBase=self.rBase,
+            vault=0,
+            buyTax=self.buyTax,
+            sellTax=self.sellTax,
+            isQuote0=self.isQuote0,
+        )
+
+
+@dataclass
+class FuzzFinding:
+    seed: int
+    iteration: int
+    failure: str
+    original: FuzzCase
+    shrunk: FuzzCase
+    detail: str
+    shrink_steps: int
+
+
+@dataclass
+class FuzzReport:
+    seed: int
+    budget_s: float
+    elapsed_s: float
+    samples: int
+    vectors: int
+    skipped: int
+    findings: List[FuzzFinding]
+
+    @property
+    def vectors_per_s(self) -> float:
+        return self.vectors / max(self.elapsed_s, 1e-9)
+
+
+def check_case(case: FuzzCase) -> Optional["model.Check"]:
+    return model.DIRECTION_CHECKS[case.direction](case.state(), case.amount)
+
+
+def _log_uniform(rng: random.Random, lo: int, hi: int) -> int:
+    """Integer in [lo, hi] whose bit length is uniform."""
+    if hi <= lo:
+        return lo
+    bits = rng.randint(lo.bit_length(), hi.bit_length())
+    low = max(lo, 1 << (bits - 1) if bits else 0)
+    high = min(hi, (1 << bits) - 1)
+    return rng.randint(low, high) if low <= high else lo
+
+
+def _tax(rng: random.Random) -> int:
+    if rng.random() < 0.25:
+        return rng.choice(_TAX_EDGES)
+    return rng.randint(0, MAX_TAX_BPS)
+
+
+def sample_cases(rng: random.Random) -> List[FuzzCase]:
+    """One random pair state with an amount per direction."""
+    rQuote = _log_uniform(rng, 1, UINT112_MAX)
+    rBase = _log_uniform(rng, 1, UINT112_MAX)
+    buyTax, sellTax = _tax(rng), _tax(rng)
+    isQuote0 = rng.random() < 0.5
+    amounts = {
+        "buy_exact_in": _log_uniform(rng, 1, UINT112_MAX),
+        "sell_exact_in": _log_uniform(rng, 1, UINT112_MAX),
+        "sell_exact_out": _log_uniform(rng, 1, max(1, rQuote - 1)),
+        "buy_exact_out": _log_uniform(rng, 1, max(1, rBase - 1)),
+    }
+    return [
+        FuzzCase(direction, rQuote, rBase, buyTax, sellTax, isQuote0, amount)
+        for direction, amount in amounts.items()
+    ]
+
+
+def _candidates(value: int, lo: int):
+    """Smaller values to try for one field, most aggressive first."""
+    if value <= lo:
+        return
+    yield lo
+    gap = value - lo
+    while gap > 1:
+        gap //= 2
+        yield value - gap
+    yield value - 1
+
+
+def shrink(case: FuzzCase, failure: str, budget: int = _SHRINK_BUDGET):
+    """Greedy per-field minimization keeping the same failure tag.
+
+    Returns (shrunk case, check, steps). Each accepted step makes one field
+    strictly smaller, so the loop terminates.
+    """
+    best = case
+    best_check = check_case(case)
+    steps = 0
+
+    def still_fails(candidate: FuzzCase):
+        outcome = check_case(candidate)
+        return outcome if outcome is not None and outcome.failure == failure else None
+
+    improved = True
+    while improved and steps < budget:
+        improved = False
+        if best.isQuote0 is False:
+            outcome = still_fails(replace(best, isQuote0=True))
+            steps += 1
+            if outcome is not None:
+                best, best_check, improved = replace(best, isQuote0=True), outcome, True
+        for field, lo in (("rQuote", 1), ("rBase", 1), ("amount", 1), ("buyTax", 0), ("sellTax", 0)):
+            for value in _candidates(getattr(best, field), lo):
+                if steps >= budget:
+                    break
+                steps += 1
+                candidate = replace(best, **{field: value})
+                outcome = still_fails(candidate)
+                if outcome is not None:
+                    best, best_check, improved = candidate, outcome, True
+                    break
+    return best, best_check, steps
+
+
+def write_reproducer(finding: FuzzFinding, out_dir: Path) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    case = finding.shrunk
+    path = out_dir / f"repro-{finding.seed}-{finding.iteration}-{case.direction}.json"
+    payload = {
+        "seed": finding.seed,
+        "iteration": finding.iteration,
+        "failure": finding.failure,
+        "detail": finding.detail,
+        "shrink_steps": finding.shrink_steps,
+        "case": asdict(case),
+        "original": asdict(finding.original),
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    return path
+
+
+def load_reproducer(path: Path) -> FuzzCase:
+    return FuzzCase(**json.loads(path.read_text())["case"])
+
+
+def run_fuzz(seed: int, budget_s: float, out_dir: Optional[Path] = None, max_findings: int = 10) -> FuzzReport:
+    """Fuzz for `budget_s` seconds. Findings are de-duplicated per (direction, failure)."""
+    rng = random.Random(seed)
+    seen: Dict[tuple, FuzzFinding] = {}
+    samples = vectors = skipped = 0
+    started = time.perf_counter()
+    deadline = started + budget_s
+
+    while time.perf_counter() < deadline and len(seen) < max_findings:
+        for case in sample_cases(rng):
+            outcome = check_case(case)
+            vectors += 1
+            if outcome is None:
+                skipped += 1
+                continue
+            if outcome.success:
+                continue
+            key = (case.direction, outcome.failure)
+            if key in seen:
+                continue
+            shrunk, shrunk_check, steps = shrink(case, outcome.failure)
+            finding = FuzzFinding(seed, samples, outcome.failure, case, shrunk, shrunk_check.detail, steps)
+            seen[key] = finding
+            if out_dir is not None:
+                write_reproducer(finding, out_dir)
+        samples += 1
+
+    return FuzzReport(
+        seed=seed,
+        budget_s=budget_s,
+        elapsed_s=time.perf_counter() - started,
+        samples=samples,
+        vectors=vectors,
+        skipped=skipped,
+        findings=list(seen.values()),
+    )
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Minimal-input solver for exact-out swaps and the Library's overpayment.
+
+`library_getAmountsIn_*` stack two ceilings: getAmountIn's `+1` and, on a buy,
+the `ceilDiv` gross-up of the net input for the buy tax. For an exact-out
+request `min_input` finds the smallest raw input the Pair itself accepts
+(K passes with tax computed the Pair's way) by galloping down from the
+Library quote and bisecting against `pair_swap_buy_lean`/`pair_swap_sell_lean`.
+
+The overpayment (quote − minimum) is split by cause:
+
+  - tax: buy only — raw input above the smallest raw whose Pair-side effIn
+    reaches the Library's netIn (the Pair's sell gross-up is the same ceil as
+    the Library's, so sells have no tax part);
+  - fee: the rest, i.e. getAmountIn's rounding against the Pair's K check.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from check_math_consistency import BPS, LeanPairState, library_getAmountsIn_buy
+from math_boundary import DirectionModel, bisect_change, first_true
+
+EXACT_OUT_DIRECTIONS = ("buy_exact_out", "sell_exact_out")
+
+# Overpayment histogram buckets (inclusive upper bounds, wei).
+BUCKETS = (0, 1, 2, 3, 10, 100, 10**6)
+
+
+class Solution(NamedTuple):
+    quoted: int    # Library raw input
+    minimal: int   # smallest raw input the Pair accepts
+    tax_wei: int
+    fee_wei: int
+
+    @property
+    def overpay(self) -> int:
+        return self.quoted - self.minimal
+
+
+def gallop_down(accepts: Callable[[int], bool], quoted: int) -> Optional[int]:
+    """Smallest x <= quoted with accepts(x), for accepts monotone False→True.
+    The overpayment is usually a few wei, so gallop down before bisecting."""
+    if not accepts(quoted):
+        return None
+    hi, step = quoted, 1
+    while True:
+        lo = max(0, quoted - step)
+        if not accepts(lo):
+            return bisect_change(accepts, lo, hi, False)
+        if lo == 0:
+            return 0
+        hi, step = lo, step * 2
+
+
+def min_input(state, direction: str, amountOut: int) -> Optional[Solution]:
+    """None when the Library cannot quote `amountOut`; raises ValueError when the
+    Pair rejects the Library quote itself (an underquote)."""
+    model = DirectionModel(state, direction)
+    outcome = model.execute(amountOut)
+    if outcome is None:
+        return None
+    quoted, accepts = outcome[3], outcome[4]
+    minimal = gallop_down(accepts, quoted)
+    if minimal is None:
+        raise ValueError(f"{direction} out={amountOut}: Pair rejects the Library quote {quoted}")
+
+    tax_wei = 0
+    if direction == "buy_exact_out":
+        netIn = library_getAmountsIn_buy(amountOut, state.buyTax, state.rQuote, state.rBase)[0]
+        reaches = lambda raw: raw - raw * state.buyTax // BPS >= netIn
+        tax_wei = quoted - first_true(reaches, netIn, quoted)
+    return Solution(quoted, minimal, tax_wei, quoted - minimal - tax_wei)
+
+
+# ─── Domain survey ───
+
+@dataclass
+class OverpayStats:
+    direction: str
+    taxed: bool
+    samples: int = 0
+    histogram: Dict[int, int] = field(default_factory=lambda: {b: 0 for b in BUCKETS + (None,)})
+    tax_wei: int = 0
+    fee_wei: int = 0
+    max_wei: int = 0
+    ppm: List[float] = field(default_factory=list)
+    worst: Optional[str] = None
+
+    def add(self, solution: Solution, cell: str):
+        self.samples += 1
+        over = solution.overpay
+        bucket = next((b for b in BUCKETS if over <= b), None)
+        self.histogram[bucket] += 1
+        self.tax_wei += solution.tax_wei
+        self.fee_wei += solution.fee_wei
+        if over > self.max_wei or self.worst is None:
+            self.max_wei = max(self.max_wei, over)
+            self.worst = f"{cell} quoted={solution.quoted} minimal={solution.minimal}"
+        self.ppm.append(over * 1_000_000 / solution.quoted)
+
+    def percentile_ppm(self, q: float) -> float:
+        if not self.ppm:
+            return 0.0
+        ordered = sorted(self.ppm)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class SurveyReport:
+    stats: List[OverpayStats]
+    underquotes: List[str]
+    illegal: int
+    elapsed_s: float
+
+
+def random_state(rng: random.Random, taxed: bool) -> LeanPairState:
+    """Log2-uniform reserves in [2^10, 2^112); taxes in 1..2000 bps or zero."""
+    rQuote = rng.randint(1 << (b := rng.randint(10, 111)), (1 << (b + 1)) - 1)
+    rBase = rng.randint(1 << (b := rng.randint(10, 111)), (1 << (b + 1)) - 1)
+    buyTax = rng.randint(1, 2000) if taxed else 0
+    sellTax = rng.randint(1, 2000) if taxed else 0
+    return LeanPairState(rQuote, rBase, 0, buyTax, sellTax, rng.random() < 0.5)
+
+
+def survey(seed: int, samples: int) -> SurveyReport:
+    """`samples` exact-out requests per direction, half taxed, with log-uniform
+    targets up to each direction's largest quotable output."""
+    rng = random.Random(seed)
+    stats = {(d, taxed): OverpayStats(d, taxed) for d in EXACT_OUT_DIRECTIONS for taxed in (False, True)}
+    underquotes, illegal = [], 0
+    started = time.perf_counter()
+    for direction in EXACT_OUT_DIRECTIONS:
+        for i in range(samples):
+            taxed = i % 2 == 1
+            state = random_state(rng, taxed)
+            hi = DirectionModel(state, direction).hi
+            if hi < 1:
+                illegal += 1
+                continue
+            amountOut = rng.randint(1, 1 << rng.randint(0, hi.bit_length() - 1))
+            amountOut = min(amountOut, hi)
+            cell = (f"rQ={state.rQuote} rB={state.rBase} tax=({state.buyTax},{state.sellTax}) "
+                    f"out={amountOut}")
+            try:
+                solution = min_input(state, direction, amountOut)
+            except ValueError as exc:
+                underquotes.append(f"{cell}: {exc}")
+                continue
+            if solution is None:
+                illegal += 1
+                continue
+            stats[(direction, taxed)].add(solution, cell)
+    return SurveyReport(list(stats.values()), underquotes, illegal, time.perf_counter() - started)
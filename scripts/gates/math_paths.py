@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Multi-hop path engine over an in-memory pair graph.
+
+`PairGraph` holds pools keyed by their sorted token pair (token0 < token1, as
+the factory sorts them). `get_amounts_out`/`get_amounts_in` mirror
+`NadSwapV2Library.getAmountsOut`/`getAmountsIn` hop by hop — quote token
+detected per pair, buy tax on a quote input, sell tax on a quote output, ceil
+on the exact-out side. `execute_path` then replays the Router's `_swap` loop
+through the lean Pair kernel (each pair receives amounts[i] and is asked for
+amounts[i + 1]), applying every hop to a per-path overlay so a path that
+revisits a pool sees the reserves left by the earlier hop.
+
+Per hop it records the Pair−Library error in wei (buy: Pair effIn − Library
+effIn, sell exact-in: Library gross − Pair gross, exact-out: Pair overpayment)
+and the running sum along the path.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from check_math_consistency import (
+    BPS,
+    LeanPairState,
+    ceilDiv,
+    getAmountIn,
+    getAmountOut,
+    pair_swap_buy_lean,
+    pair_swap_sell_lean,
+)
+
+# Lean tuple indices (BUY_FIELDS / SELL_FIELDS).
+_BUY_TAX, _BUY_EFFIN, _BUY_VAULT, _BUY_KPASS, _BUY_EFFQ, _BUY_EFFB = 0, 2, 4, 7, 8, 9
+_SELL_GROSS, _SELL_VAULT, _SELL_KPASS, _SELL_EFFQ, _SELL_EFFB = 2, 5, 8, 9, 10
+
+
+class PathError(Exception):
+    """The Library (or Router) would revert on this path; carries the reason."""
+
+
+@dataclass
+class Pool:
+    token0: int
+    token1: int
+    reserve0: int
+    reserve1: int
+    quoteToken: int
+    buyTax: int
+    sellTax: int
+    vault: int = 0
+
+    def reserves(self, tokenIn: int) -> Tuple[int, int]:
+        """(reserveIn, reserveOut) as `UniswapV2Library.getReserves` orders them."""
+        if tokenIn == self.token0:
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+    def lean_state(self) -> LeanPairState:
+        isQuote0 = self.quoteToken == self.token0
+        rQuote, rBase = (self.reserve0, self.reserve1) if isQuote0 else (self.reserve1, self.reserve0)
+        return LeanPairState(rQuote, rBase, self.vault, self.buyTax, self.sellTax, isQuote0)
+
+
+class PairGraph:
+    """Pools plus a token → neighbour adjacency index."""
+
+    def __init__(self):
+        self.pools: Dict[Tuple[int, int], Pool] = {}
+        self.adjacency: Dict[int, List[int]] = {}
+
+    def add_pool(self, tokenA: int, tokenB: int, reserveA: int, reserveB: int, quoteToken: int,
+                 buyTax: int, sellTax: int) -> Pool:
+        if tokenA == tokenB:
+            raise ValueError("identical tokens")
+        if quoteToken not in (tokenA, tokenB):
+            raise ValueError("INVALID_QUOTE")
+        token0, token1 = sorted((tokenA, tokenB))
+        reserve0, reserve1 = (reserveA, reserveB) if tokenA == token0 else (reserveB, reserveA)
+        pool = Pool(token0, token1, reserve0, reserve1, quoteToken, buyTax, sellTax)
+        if (token0, token1) not in self.pools:
+            self.adjacency.setdefault(token0, []).append(token1)
+            self.adjacency.setdefault(token1, []).append(token0)
+        self.pools[(token0, token1)] = pool
+        return pool
+
+    def pool(self, tokenA: int, tokenB: int) -> Pool:
+        key = (tokenA, tokenB) if tokenA < tokenB else (tokenB, tokenA)
+        pool = self.pools.get(key)
+        if pool is None:
+            raise PathError("PAIR_NOT_FOUND")
+        return pool
+
+
+# ─── Library mirror ───
+
+def hop_amount_out(pool: Pool, tokenIn: int, tokenOut: int, amountIn: int) -> int:
+    """One iteration of `getAmountsOut`."""
+    reserveIn, reserveOut = pool.reserves(tokenIn)
+    if amountIn <= 0:
+        raise PathError("INSUFFICIENT_INPUT_AMOUNT")
+    if reserveIn <= 0 or reserveOut <= 0:
+        raise PathError("INSUFFICIENT_LIQUIDITY")
+    effIn = amountIn
+    if tokenIn == pool.quoteToken:
+        effIn -= effIn * pool.buyTax // BPS
+        if effIn <= 0:
+            raise PathError("INSUFFICIENT_INPUT_AMOUNT")
+    grossOut = getAmountOut(effIn, reserveIn, reserveOut)
+    if tokenOut == pool.quoteToken:
+        return grossOut * (BPS - pool.sellTax) // BPS
+    return grossOut
+
+
+def hop_amount_in(pool: Pool, tokenIn: int, tokenOut: int, amountOut: int) -> int:
+    """One iteration of `getAmountsIn`.
+
+    Solidity 0.5 would wrap `reserveOut - amountOut` when the target reaches the
+    reserve (and the Router then fails on execution); the mirror reverts here.
+    """
+    reserveIn, reserveOut = pool.reserves(tokenIn)
+    if amountOut <= 0:
+        raise PathError("INSUFFICIENT_OUTPUT_AMOUNT")
+    if reserveIn <= 0 or reserveOut <= 0:
+        raise PathError("INSUFFICIENT_LIQUIDITY")
+    targetOut = amountOut
+    if tokenOut == pool.quoteToken:
+        targetOut = ceilDiv(targetOut * BPS, BPS - pool.sellTax)
+    if targetOut >= reserveOut:
+        raise PathError("INSUFFICIENT_LIQUIDITY")
+    amountIn = getAmountIn(targetOut, reserveIn, reserveOut)
+    if tokenIn == pool.quoteToken:
+        amountIn = ceilDiv(amountIn * BPS, BPS - pool.buyTax)
+    return amountIn
+
+
+def get_amounts_out(graph: PairGraph, amountIn: int, path: Sequence[int]) -> List[int]:
+    if len(path) < 2:
+        raise PathError("INVALID_PATH")
+    amounts = [amountIn]
+    for tokenIn, tokenOut in zip(path, path[1:]):
+        amounts.append(hop_amount_out(graph.pool(tokenIn, tokenOut), tokenIn, tokenOut, amounts[-1]))
+    return amounts
+
+
+def get_amounts_in(graph: PairGraph, amountOut: int, path: Sequence[int]) -> List[int]:
+    if len(path) < 2:
+        raise PathError("INVALID_PATH")
+    amounts = [0] * len(path)
+    amounts[-1] = amountOut
+    for i in range(len(path) - 1, 0, -1):
+        tokenIn, tokenOut = path[i - 1], path[i]
+        amounts[i - 1] = hop_amount_in(graph.pool(tokenIn, tokenOut), tokenIn, tokenOut, amounts[i])
+    return amounts
+
+
+# ─── Pair execution ───
+
+@dataclass
+class HopReport:
+    tokenIn: int
+    tokenOut: int
+    side: str          # "buy" (quote in) or "sell" (quote out)
+    amountIn: int
+    amountOut: int
+    error_wei: int     # Pair − Library, sign as described in the module docstring
+    cumulative_wei: int
+    k_pass: bool
+
+
+@dataclass
+class PathReport:
+    path: Tuple[int, ...]
+    exact_out: bool
+    amounts: List[int]
+    hops: List[HopReport] = field(default_factory=list)
+    failure: str = ""  # "" when every hop executed, else the failing property
+
+    @property
+    def drift_wei(self) -> int:
+        return self.hops[-1].cumulative_wei if self.hops else 0
+
+
+def _library_hop_terms(pool: Pool, tokenIn: int, tokenOut: int, amountIn: int, amountOut: int, exact_out: bool):
+    """Library-side effIn (buy) or gross output (sell) for the error terms."""
+    reserveIn, reserveOut = pool.reserves(tokenIn)
+    if tokenIn == pool.quoteToken:
+        if exact_out:
+            return getAmountIn(amountOut, reserveIn, reserveOut)  # netIn the Pair must see
+        return amountIn - amountIn * pool.buyTax // BPS
+    if exact_out:
+        return ceilDiv(amountOut * BPS, BPS - pool.sellTax)
+    return getAmountOut(amountIn, reserveIn, reserveOut)
+
+
+def execute_path(graph: PairGraph, path: Sequence[int], amount: int, exact_out: bool = False) -> PathReport:
+    """Quote `path` like the Library, then run each hop through the Pair model.
+
+    Raises PathError where the Library or the Pair's own requires would revert
+    the whole Router call; Pair-model findings are returned in `failure`.
+    """
+    quote = get_amounts_in if exact_out else get_amounts_out
+    amounts = quote(graph, amount, path)
+    report = PathReport(tuple(path), exact_out, amounts)
+    overlay: Dict[Tuple[int, int], Pool] = {}
+    cumulative = 0
+
+    for i, (tokenIn, tokenOut) in enumerate(zip(path, path[1:])):
+        base = graph.pool(tokenIn, tokenOut)
+        key = (base.token0, base.token1)
+        pool = overlay.get(key, base)
+        amountIn, amountOut = amounts[i], amounts[i + 1]
+        if amountOut == 0:
+            raise PathError("INSUFFICIENT_OUTPUT")  # Pair.swap require; the Router call reverts
+        if amountOut >= pool.reserves(tokenIn)[1]:
+            raise PathError("INSUFFICIENT_LIQUIDITY")
+        lib_term = _library_hop_terms(base, tokenIn, tokenOut, amountIn, amountOut, exact_out)
+        state = pool.lean_state()
+        buy = tokenIn == pool.quoteToken
+        try:
+            if buy:
+                result = pair_swap_buy_lean(state, amountIn, amountOut)
+                error = result[_BUY_EFFIN] - lib_term
+                k_pass, vault, effQ, effB = result[_BUY_KPASS], result[_BUY_VAULT], result[_BUY_EFFQ], result[_BUY_EFFB]
+            else:
+                result = pair_swap_sell_lean(state, amountIn, amountOut)
+                error = result[_SELL_GROSS] - lib_term if exact_out else lib_term - result[_SELL_GROSS]
+                k_pass, vault, effQ, effB = result[_SELL_KPASS], result[_SELL_VAULT], result[_SELL_EFFQ], result[_SELL_EFFB]
+        except AssertionError as exc:
+            report.failure = f"hop {i}: {str(exc).split(':')[0]}"
+            return report
+
+        cumulative += error
+        report.hops.append(HopReport(tokenIn, tokenOut, "buy" if buy else "sell", amountIn, amountOut,
+                                     error, cumulative, k_pass))
+        if not k_pass:
+            report.failure = f"hop {i}: K"
+            return report
+        if not hop_error_ok(buy, exact_out, error):
+            report.failure = f"hop {i}: ERROR_BOUND"
+            return report
+
+        if pool.quoteToken == pool.token0:
+            reserve0, reserve1 = effQ, effB
+        else:
+            reserve0, reserve1 = effB, effQ
+        overlay[key] = Pool(pool.token0, pool.token1, reserve0, reserve1, pool.quoteToken,
+                            pool.buyTax, pool.sellTax, vault)
+    return report
+
+
+def hop_error_ok(buy: bool, exact_out: bool, error: int) -> bool:
+    """Same tolerances as the single-hop checks of `check_math_consistency.py`."""
+    if exact_out:
+        return error >= 0 if buy else error == 0
+    return error == 0 if buy else 0 <= error <= 1
+
+
+# ─── Random graphs and path sweeps ───
+
+def random_graph(rng: random.Random, tokens: int = 64, pools: int = 256) -> PairGraph:
+    """Connected graph (a random spanning tree plus extra edges) with log-spread
+    reserves up to 10**24, taxes across 0..2000 bps and random quote sides."""
+    graph = PairGraph()
+
+    def add(a: int, b: int):
+        graph.add_pool(
+            a, b,
+            rng.randint(10**3, 10**rng.randint(6, 24)),
+            rng.randint(10**3, 10**rng.randint(6, 24)),
+            rng.choice((a, b)),
+            rng.choice((0, 1, 300, 1000, 2000, rng.randint(0, 2000))),
+            rng.choice((0, 1, 500, 1000, 2000, rng.randint(0, 2000))),
+        )
+
+    for token in range(1, tokens):
+        add(token, rng.randrange(token))
+    while len(graph.pools) < pools:
+        a, b = rng.sample(range(tokens), 2)
+        if (min(a, b), max(a, b)) not in graph.pools:
+            add(a, b)
+    return graph
+
+
+def random_path(graph: PairGraph, rng: random.Random, length: int) -> Optional[List[int]]:
+    """Simple random walk of `length` tokens without repeating a token."""
+    path = [rng.choice(list(graph.adjacency))]
+    while len(path) < length:
+        options = [t for t in graph.adjacency[path[-1]] if t not in path]
+        if not options:
+            return None
+        path.append(rng.choice(options))
+    return path
+
+
+@dataclass
+class SweepStats:
+    length: int
+    paths: int = 0
+    executed: int = 0
+    quote_reverts: int = 0
+    failures: List[PathReport] = field(default_factory=list)
+    max_drift_wei: int = 0
+    max_hop_error_wei: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def paths_per_s(self) -> float:
+        return self.paths / max(self.elapsed_s, 1e-9)
+
+
+def sweep(graph: PairGraph, rng: random.Random, lengths=range(2, 7), paths_per_length: int = 500,
+          exact_out: bool = False) -> List[SweepStats]:
+    """Execute random paths of each length; amounts are a log-spread fraction of
+    the first (exact-in) or last (exact-out) hop's reserve."""
+    stats = []
+    for length in lengths:
+        s = SweepStats(length)
+        started = time.perf_counter()
+        while s.paths < paths_per_length:
+            path = random_path(graph, rng, length)
+            if path is None:
+                continue
+            s.paths += 1
+            if exact_out:
+                reserve = graph.pool(path[-2], path[-1]).reserves(path[-2])[1]
+            else:
+                reserve = graph.pool(path[0], path[1]).reserves(path[0])[0]
+            amount = max(1, reserve >> rng.randint(1, 40))
+            try:
+                report = execute_path(graph, path, amount, exact_out)
+            except (PathError, AssertionError, ZeroDivisionError):
+                s.quote_reverts += 1
+                continue
+            s.executed += 1
+            if report.failure:
+                s.failures.append(report)
+            s.max_drift_wei = max(s.max_drift_wei, abs(report.drift_wei))
+            s.max_hop_error_wei = max([s.max_hop_error_wei] + [abs(h.error_wei) for h in report.hops])
+        s.elapsed_s = time.perf_counter() - started
+        stats.append(s)
+    return stats
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Best-route search over a `math_paths.PairGraph`.
+
+Routes are searched depth-first up to `max_hops` pools over every simple
+path: by default any token may be an intermediate. The last intermediate is
+drawn only from the target's neighbours, which prunes nothing a full search
+would find. `hubs=quote_hubs(graph)` opts into restricting intermediates to
+quote tokens, a heuristic that can miss the best route —
+`run_route_bench(prune_hubs=True)` measures it against exhaustive search.
+Within one request every (tokenIn, tokenOut, amount) hop quote is memoized,
+and each hop is the Library mirror from `math_paths`, so the returned amounts
+are bit-identical to `get_amounts_out` / `get_amounts_in` on the chosen path.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from math_paths import PairGraph, PathError, hop_amount_in, hop_amount_out
+
+
+@dataclass
+class Route:
+    path: Tuple[int, ...]
+    amounts: List[int]
+    quotes: int  # hop quotes computed (memo misses) for this request
+
+
+def quote_hubs(graph: PairGraph) -> Set[int]:
+    """Every token that is the quote token of some pool."""
+    return {pool.quoteToken for pool in graph.pools.values()}
+
+
+class Router:
+    def __init__(self, graph: PairGraph, max_hops: int = 3, hubs: Optional[Iterable[int]] = None):
+        self.graph = graph
+        self.max_hops = max_hops
+        # None = every token may be an intermediate (exact search)
+        self.hubs: Optional[Set[int]] = None if hubs is None else set(hubs)
+        # token -> {neighbour: pool}; built once, shared by all requests
+        self.index: Dict[int, Dict[int, object]] = {}
+        for (token0, token1), pool in graph.pools.items():
+            self.index.setdefault(token0, {})[token1] = pool
+            self.index.setdefault(token1, {})[token0] = pool
+
+    def _next_tokens(self, token: int, target: int, visited) -> List[int]:
+        neighbours = self.index.get(token, {})
+        remaining = self.max_hops - len(visited)  # pools left after this hop
+        candidates: Iterable[int] = ()
+        if remaining == 1:
+            # The next token is the last intermediate: it must touch the target.
+            ends = self.index.get(target, {})
+            small, large = (ends, neighbours) if len(ends) < len(neighbours) else (neighbours, ends)
+            candidates = [t for t in small if t in large]
+        elif remaining > 1:
+            candidates = neighbours
+        hubs = self.hubs
+        nexts = [t for t in candidates if t != target and t not in visited and (hubs is None or t in hubs)]
+        if target in neighbours:
+            nexts.append(target)
+        return nexts
+
+    def paths(self, tokenIn: int, tokenOut: int) -> List[Tuple[int, ...]]:
+        """Every candidate path the searches consider, unquoted."""
+        found: List[Tuple[int, ...]] = []
+
+        def walk(path: List[int]):
+            last_hop = len(path) == self.max_hops
+            for nxt in self._next_tokens(path[-1], tokenOut, path):
+                if nxt == tokenOut:
+                    found.append(tuple(path) + (nxt,))
+                elif not last_hop:
+                    path.append(nxt)
+                    walk(path)
+                    path.pop()
+
+        walk([tokenIn])
+        return found
+
+    def best_amount_out(self, tokenIn: int, tokenOut: int, amountIn: int) -> Optional[Route]:
+        """Path maximizing the final `getAmountsOut` amount, or None if unreachable."""
+        memo: Dict[Tuple[int, int, int], Optional[int]] = {}
+        index = self.index
+        best: List = [None, -1]  # path, amount
+
+        def quote(a: int, b: int, amount: int) -> Optional[int]:
+            key = (a, b, amount)
+            if key not in memo:
+                try:
+                    memo[key] = hop_amount_out(index[a][b], a, b, amount)
+                except (PathError, AssertionError, ZeroDivisionError):
+                    memo[key] = None
+            return memo[key]
+
+        def walk(path: List[int], amount: int):
+            token = path[-1]
+            last_hop = len(path) == self.max_hops
+            for nxt in self._next_tokens(token, tokenOut, path):
+                if last_hop and nxt != tokenOut:
+                    continue
+                out = quote(token, nxt, amount)
+                if out is None or out == 0:
+                    continue
+                path.append(nxt)
+                if nxt == tokenOut:
+                    if out > best[1]:
+                        best[0], best[1] = tuple(path), out
+                else:
+                    walk(path, out)
+                path.pop()
+
+        walk([tokenIn], amountIn)
+        if best[0] is None:
+            return None
+        return Route(best[0], self._replay_out(best[0], amountIn, memo), len(memo))
+
+    def best_amount_in(self, tokenIn: int, tokenOut: int, amountOut: int) -> Optional[Route]:
+        """Path minimizing the `getAmountsIn` input, or None if unreachable."""
+        memo: Dict[Tuple[int, int, int], Optional[int]] = {}
+        index = self.index
+        best: List = [None, None]
+
+        def quote(a: int, b: int, amount: int) -> Optional[int]:
+            key = (a, b, amount)
+            if key not in memo:
+                try:
+                    memo[key] = hop_amount_in(index[a][b], a, b, amount)
+                except (PathError, AssertionError, ZeroDivisionError):
+                    memo[key] = None
+            return memo[key]
+
+        def walk(path: List[int], amount: int):
+            # path is built backwards from tokenOut
+            token = path[-1]
+            last_hop = len(path) == self.max_hops
+            for prev in self._next_tokens(token, tokenIn, path):
+                if last_hop and prev != tokenIn:
+                    continue
+                need = quote(prev, token, amount)
+                if need is None:
+                    continue
+                path.append(prev)
+                if prev == tokenIn:
+                    if best[1] is None or need < best[1]:
+                        best[0], best[1] = tuple(reversed(path)), need
+                else:
+                    walk(path, need)
+                path.pop()
+
+        walk([tokenOut], amountOut)
+        if best[0] is None:
+            return None
+        return Route(best[0], self._replay_in(best[0], amountOut, memo), len(memo))
+
+    def _replay_out(self, path, amountIn: int, memo) -> List[int]:
+        amounts = [amountIn]
+        for a, b in zip(path, path[1:]):
+            amounts.append(memo[(a, b, amounts[-1])])
+        return amounts
+
+    def _replay_in(self, path, amountOut: int, memo) -> List[int]:
+        amounts = [amountOut]
+        for a, b in zip(reversed(path[:-1]), reversed(path[1:])):
+            amounts.append(memo[(a, b, amounts[-1])])
+        return amounts[::-1]
+
+
+# ─── Benchmark graph ───
+
+def hub_graph(rng: random.Random, pairs: int = 10_000, hubs: int = 8) -> PairGraph:
+    """Quoting-service shaped graph: a few quote assets (hubs) paired with each
+    other, and base tokens paired with 1-3 hubs, each hub as the quote token."""
+    graph = PairGraph()
+
+    def reserve() -> int:
+        return rng.randint(10**6, 10**rng.randint(9, 27))
+
+    def taxes() -> Tuple[int, int]:
+        return rng.choice((0, 100, 300, 1000, 2000)), rng.choice((0, 100, 500, 1000, 2000))
+
+    for a in range(hubs):
+        for b in range(a + 1, hubs):
+            graph.add_pool(a, b, reserve(), reserve(), rng.choice((a, b)), *taxes())
+    token = hubs
+    while len(graph.pools) < pairs:
+        for hub in rng.sample(range(hubs), rng.randint(1, 3)):
+            if len(graph.pools) < pairs:
+                graph.add_pool(token, hub, reserve(), reserve(), hub, *taxes())
+        token += 1
+    return graph
+
+
+@dataclass
+class RouteBenchReport:
+    pairs: int
+    queries: int
+    routed: int
+    mean_ms: float
+    p99_ms: float
+    mean_quotes: float
+    mismatches: List[str]
+
+
+def run_route_bench(seed: int, pairs: int = 10_000, queries: int = 2_000, max_hops: int = 3,
+                    prune_hubs: bool = False) -> RouteBenchReport:
+    """Time random exact-in/exact-out queries and check every route's amounts
+    against `get_amounts_out` / `get_amounts_in`; the same router
+    configuration (`prune_hubs` = quote tokens only as intermediates) must
+    also match an exhaustive search on a small random graph and a small hub
+    graph."""
+    from math_paths import get_amounts_in, get_amounts_out, random_graph
+
+    def build(g: PairGraph) -> Router:
+        return Router(g, max_hops, hubs=quote_hubs(g) if prune_hubs else None)
+
+    rng = random.Random(seed)
+    graph = hub_graph(rng, pairs)
+    router = build(graph)
+    tokens = list(router.index)
+    latencies, quotes, routed, mismatches = [], [], 0, []
+
+    for i in range(queries):
+        a, b = rng.sample(tokens, 2)
+        amount = 10 ** rng.randint(3, 20)
+        started = time.perf_counter()
+        route = router.best_amount_in(a, b, amount) if i % 2 else router.best_amount_out(a, b, amount)
+        latencies.append(time.perf_counter() - started)
+        if route is None:
+            continue
+        routed += 1
+        quotes.append(route.quotes)
+        try:
+            expected = get_amounts_in(graph, amount, route.path) if i % 2 else get_amounts_out(graph, amount, route.path)
+        except PathError as exc:
+            expected = str(exc)
+        if expected != route.amounts:
+            mismatches.append(f"path={route.path} router={route.amounts} library={expected}")
+
+    # Exhaustive check: best amount equals the max over every simple path.
+    for small in (random_graph(rng, tokens=24, pools=72), hub_graph(rng, pairs=96, hubs=4)):
+        full = build(small)
+        for _ in range(100):
+            a, b = rng.sample(list(small.adjacency), 2)
+            amount = 10 ** rng.randint(3, 12)
+            route = full.best_amount_out(a, b, amount)
+            brute = _brute_best_out(small, a, b, amount, max_hops)
+            if (route.amounts[-1] if route else None) != brute:
+                mismatches.append(f"exhaustive {a}->{b} amount={amount}: router={route and route.amounts[-1]} brute={brute}")
+
+    latencies.sort()
+    return RouteBenchReport(
+        pairs=len(graph.pools),
+        queries=queries,
+        routed=routed,
+        mean_ms=1000 * sum(latencies) / len(latencies),
+        p99_ms=1000 * latencies[int(len(latencies) * 0.99) - 1],
+        mean_quotes=sum(quotes) / max(1, len(quotes)),
+        mismatches=mismatches,
+    )
+
+
+def _brute_best_out(graph: PairGraph, a: int, b: int, amount: int, max_hops: int) -> Optional[int]:
+    from math_paths import get_amounts_out
+
+    best = None
+    stack = [[a]]
+    while stack:
+        path = stack.pop()
+        if path[-1] == b:
+            try:
+                out = get_amounts_out(graph, amount, path)
+            except (PathError, AssertionError, ZeroDivisionError):
+                continue
+            if out[-1] > 0 and (best is None or out[-1] > best) and all(out[1:]):
+                best = out[-1]
+            continue
+        if len(path) > max_hops:
+            continue
+        for nxt in graph.adjacency[path[-1]]:
+            if nxt not in path:
+                stack.append(path + [nxt])
+    return best
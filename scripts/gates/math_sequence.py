@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Stateful sequence simulator for NadSwapV2Pair.
+
+`StatefulPair` mirrors the token-space state of `NadSwapV2Pair.sol` — raw
+balances, reserves, `accumulatedQuoteTax`, LP supply and `kLast` — and applies
+swap, mint, burn (with `_mintFee`), sync, skim and `claimQuoteTax` the way the
+contract does. A reverting call raises `Revert` and leaves the state untouched.
+
+`simulate` drives one randomized stream of operations (swaps are quoted through
+the Library functions of `check_math_consistency.py`, donations make skim/sync
+meaningful), checks the pair invariants after every step and keeps a periodic
+checkpoint (state + RNG state). When a step fails, the nearest checkpoint is
+written out so `replay` can rerun just the tail of the sequence.
+
+Not modelled: price accumulators / timestamps and ERC20 transfers of LP tokens
+other than the burn path.
+"""
+
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from check_math_consistency import (
+    BPS,
+    library_getAmountsIn_buy,
+    library_getAmountsIn_sell,
+    library_getAmountsOut_buy,
+    library_getAmountsOut_sell,
+)
+
+UINT96_MAX = 2**96 - 1
+UINT112_MAX = 2**112 - 1
+UINT256_MAX = 2**256 - 1
+MINIMUM_LIQUIDITY = 10**3
+MAX_TAX_BPS = 2000
+
+# Reverts a Library-quoted swap may legitimately hit; anything else is a finding.
+QUOTED_SWAP_REVERTS = ("UniswapV2: OVERFLOW", "VAULT_OVERFLOW")
+
+OPS = ("swap", "mint", "burn", "donate", "sync", "skim", "claimQuoteTax", "setFeeTo", "setTaxConfig")
+_OP_WEIGHTS = (700, 70, 60, 50, 30, 30, 30, 5, 5)
+SWAP_DIRECTIONS = ("buy_exact_in", "sell_exact_in", "sell_exact_out", "buy_exact_out")
+
+
+class Revert(Exception):
+    """A call that would revert on-chain; carries the revert reason."""
+
+
+class StatefulPair:
+    """Token-space pair state; each method is one transaction."""
+
+    __slots__ = (
+        "raw0", "raw1", "reserve0", "reserve1", "vault", "isQuote0", "buyTax", "sellTax",
+        "totalSupply", "lp", "feeLp", "kLast", "feeOn",
+    )
+
+    def __init__(self, isQuote0: bool, buyTax: int, sellTax: int, feeOn: bool):
+        self.raw0 = self.raw1 = self.reserve0 = self.reserve1 = self.vault = 0
+        self.isQuote0 = isQuote0
+        self.buyTax = buyTax
+        self.sellTax = sellTax
+        self.totalSupply = self.lp = self.feeLp = self.kLast = 0
+        self.feeOn = feeOn
+
+    def snapshot(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def restore(cls, values) -> "StatefulPair":
+        pair = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            setattr(pair, name, value)
+        return pair
+
+    # ─── views ───
+
+    def quote_reserves(self) -> Tuple[int, int]:
+        """(rQuote, rBase) as the Library reads them."""
+        if self.isQuote0:
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+    def _effective(self, raw0: int, raw1: int, vault: int) -> Tuple[int, int]:
+        if self.isQuote0:
+            if raw0 < vault:
+                raise Revert("VAULT_DRIFT")
+            return raw0 - vault, raw1
+        if raw1 < vault:
+            raise Revert("VAULT_DRIFT")
+        return raw0, raw1 - vault
+
+    @staticmethod
+    def _check_update(balance0: int, balance1: int):
+        if balance0 > UINT112_MAX or balance1 > UINT112_MAX:
+            raise Revert("UniswapV2: OVERFLOW")
+
+    def _mint_fee(self, r0: int, r1: int) -> Tuple[bool, int]:
+        """Returns (feeOn, LP minted to feeTo); kLast is reset by the caller."""
+        if not self.feeOn or self.kLast == 0:
+            return self.feeOn, 0
+        rootK = math.isqrt(r0 * r1)
+        rootKLast = math.isqrt(self.kLast)
+        if rootK <= rootKLast:
+            return True, 0
+        return True, self.totalSupply * (rootK - rootKLast) // (rootK * 5 + rootKLast)
+
+    # ─── transactions ───
+
+    def swap(self, amount0Out: int, amount1Out: int, in0: int = 0, in1: int = 0):
+        """User transfers (in0, in1) to the pair, then calls swap(amount0Out, amount1Out)."""
+        if amount0Out == 0 and amount1Out == 0:
+            raise Revert("INSUFFICIENT_OUTPUT")
+        if amount0Out and amount1Out:
+            raise Revert("SINGLE_SIDE_ONLY")
+        r0, r1 = self.reserve0, self.reserve1
+        if amount0Out >= r0 or amount1Out >= r1:
+            raise Revert("INSUFFICIENT_LIQUIDITY")
+
+        raw0 = self.raw0 + in0 - amount0Out
+        raw1 = self.raw1 + in1 - amount1Out
+        oldVault = self.vault
+        q0 = self.isQuote0
+        rawQuote = raw0 if q0 else raw1
+        if rawQuote < oldVault:
+            raise Revert("VAULT_DRIFT")
+        eff0old = raw0 - oldVault if q0 else raw0
+        eff1old = raw1 if q0 else raw1 - oldVault
+
+        gross0, gross1, quoteTaxOut = amount0Out, amount1Out, 0
+        den = BPS - self.sellTax
+        if q0 and amount0Out:
+            gross0 = (amount0Out * BPS + den - 1) // den
+            if gross0 >= r0:
+                raise Revert("INSUFFICIENT_LIQUIDITY_GROSS")
+            quoteTaxOut = gross0 - amount0Out
+        elif not q0 and amount1Out:
+            gross1 = (amount1Out * BPS + den - 1) // den
+            if gross1 >= r1:
+                raise Revert("INSUFFICIENT_LIQUIDITY_GROSS")
+            quoteTaxOut = gross1 - amount1Out
+
+        if eff0old <= r0 - amount0Out and eff1old <= r1 - amount1Out:
+            raise Revert("INSUFFICIENT_INPUT")
+
+        amount0In = eff0old - (r0 - gross0) if eff0old > r0 - gross0 else 0
+        amount1In = eff1old - (r1 - gross1) if eff1old > r1 - gross1 else 0
+        quoteTaxIn = 0
+        if q0 and amount0In and amount1Out:
+            quoteTaxIn = amount0In * self.buyTax // BPS
+        elif not q0 and amount1In and amount0Out:
+            quoteTaxIn = amount1In * self.buyTax // BPS
+
+        newVault = oldVault + quoteTaxIn + quoteTaxOut
+        if newVault > UINT96_MAX:
+            raise Revert("VAULT_OVERFLOW")
+        if rawQuote < newVault:
+            raise Revert("VAULT_DRIFT")
+        eff0 = raw0 - newVault if q0 else raw0
+        eff1 = raw1 if q0 else raw1 - newVault
+        effIn0 = eff0 - (r0 - gross0) if eff0 > r0 - gross0 else 0
+        effIn1 = eff1 - (r1 - gross1) if eff1 > r1 - gross1 else 0
+
+        adj0 = eff0 * 1000 - effIn0 * 2
+        adj1 = eff1 * 1000 - effIn1 * 2
+        if adj0 > 0 and adj1 > UINT256_MAX // adj0:
+            raise Revert("K_MULTIPLY_OVERFLOW")
+        if adj0 * adj1 < r0 * r1 * 1_000_000:
+            raise Revert("K")
+        self._check_update(eff0, eff1)
+
+        self.raw0, self.raw1 = raw0, raw1
+        self.vault = newVault
+        self.reserve0, self.reserve1 = eff0, eff1
+
+    def mint(self, in0: int, in1: int) -> int:
+        r0, r1 = self.reserve0, self.reserve1
+        raw0, raw1 = self.raw0 + in0, self.raw1 + in1
+        balance0, balance1 = self._effective(raw0, raw1, self.vault)
+        if balance0 < r0 or balance1 < r1:
+            raise Revert("ds-math-sub-underflow")
+        amount0, amount1 = balance0 - r0, balance1 - r1
+
+        feeOn, feeLiquidity = self._mint_fee(r0, r1)
+        supply = self.totalSupply + feeLiquidity
+        if supply == 0:
+            root = math.isqrt(amount0 * amount1)
+            if root < MINIMUM_LIQUIDITY:
+                raise Revert("ds-math-sub-underflow")
+            liquidity = root - MINIMUM_LIQUIDITY
+            supply = MINIMUM_LIQUIDITY
+        else:
+            liquidity = min(amount0 * supply // r0, amount1 * supply // r1)
+        if liquidity == 0:
+            raise Revert("UniswapV2: INSUFFICIENT_LIQUIDITY_MINTED")
+        self._check_update(balance0, balance1)
+
+        self.raw0, self.raw1 = raw0, raw1
+        self.feeLp += feeLiquidity
+        self.lp += liquidity
+        self.totalSupply = supply + liquidity
+        self.reserve0, self.reserve1 = balance0, balance1
+        self.kLast = balance0 * balance1 if feeOn else 0
+        return liquidity
+
+    def burn(self, liquidity: int) -> Tuple[int, int]:
+        """LP holder transfers `liquidity` to the pair, then calls burn."""
+        if liquidity > self.lp:
+            raise Revert("ds-math-sub-underflow")
+        r0, r1 = self.reserve0, self.reserve1
+        balance0, balance1 = self._effective(self.raw0, self.raw1, self.vault)
+        feeOn, feeLiquidity = self._mint_fee(r0, r1)
+        supply = self.totalSupply + feeLiquidity
+        amount0 = liquidity * balance0 // supply
+        amount1 = liquidity * balance1 // supply
+        if amount0 == 0 or amount1 == 0:
+            raise Revert("UniswapV2: INSUFFICIENT_LIQUIDITY_BURNED")
+        raw0, raw1 = self.raw0 - amount0, self.raw1 - amount1
+        balance0, balance1 = self._effective(raw0, raw1, self.vault)
+        self._check_update(balance0, balance1)
+
+        self.raw0, self.raw1 = raw0, raw1
+        self.feeLp += feeLiquidity
+        self.lp -= liquidity
+        self.totalSupply = supply - liquidity
+        self.reserve0, self.reserve1 = balance0, balance1
+        self.kLast = balance0 * balance1 if feeOn else 0
+        return amount0, amount1
+
+    def donate(self, in0: int, in1: int):
+        """Plain ERC20 transfer to the pair (no pair call)."""
+        self.raw0 += in0
+        self.raw1 += in1
+
+    def skim(self) -> Tuple[int, int]:
+        if self.isQuote0:
+            excess0 = max(0, self.raw0 - (self.reserve0 + self.vault))
+            excess1 = max(0, self.raw1 - self.reserve1)
+        else:
+            excess0 = max(0, self.raw0 - self.reserve0)
+            excess1 = max(0, self.raw1 - (self.reserve1 + self.vault))
+        self.raw0 -= excess0
+        self.raw1 -= excess1
+        return excess0, excess1
+
+    def sync(self):
+        balance0, balance1 = self._effective(self.raw0, self.raw1, self.vault)
+        self._check_update(balance0, balance1)
+        self.reserve0, self.reserve1 = balance0, balance1
+
+    def claimQuoteTax(self) -> int:
+        taxAmount = self.vault
+        if taxAmount == 0:
+            raise Revert("NO_TAX")
+        if self.isQuote0:
+            if self.raw0 < taxAmount:
+                raise Revert("VAULT_DRIFT")
+            self.raw0 -= taxAmount
+        else:
+            if self.raw1 < taxAmount:
+                raise Revert("VAULT_DRIFT")
+            self.raw1 -= taxAmount
+        self.vault = 0
+        return taxAmount
+
+    def setFeeTo(self, on: bool):
+        self.feeOn = on
+
+    def setTaxConfig(self, buyTax: int, sellTax: int):
+        if buyTax > MAX_TAX_BPS or sellTax > MAX_TAX_BPS:
+            raise Revert("TAX_TOO_HIGH")
+        self.buyTax, self.sellTax = buyTax, sellTax
+
+
+# ─── Invariants ───
+
+class InvariantError(Exception):
+    def __init__(self, invariant: str, detail: str, op: str = "", call: str = ""):
+        super().__init__(f"{invariant}: {detail}")
+        self.invariant = invariant
+        self.detail = detail
+        self.op = op
+        self.call = call
+
+
+def check_invariants(pair: StatefulPair, op: str, before: Tuple):
+    """Properties that hold after every successful transaction, plus per-op post-conditions."""
+    q0 = pair.isQuote0
+    rawQuote, rawBase = (pair.raw0, pair.raw1) if q0 else (pair.raw1, pair.raw0)
+    rQuote, rBase = pair.quote_reserves()
+
+    if rawQuote < rQuote + pair.vault or rawBase < rBase:
+        raise InvariantError("SOLVENCY", f"raw=({rawQuote},{rawBase}) reserves=({rQuote},{rBase}) vault={pair.vault}")
+    if pair.vault > UINT96_MAX or rQuote > UINT112_MAX or rBase > UINT112_MAX:
+        raise InvariantError("BOUNDS", f"reserves=({rQuote},{rBase}) vault={pair.vault}")
+    locked = MINIMUM_LIQUIDITY if pair.totalSupply else 0
+    if pair.totalSupply != pair.lp + pair.feeLp + locked:
+        raise InvariantError("LP_SUPPLY", f"totalSupply={pair.totalSupply} lp={pair.lp} feeLp={pair.feeLp}")
+    if pair.totalSupply and (pair.reserve0 == 0 or pair.reserve1 == 0):
+        raise InvariantError("EMPTY_RESERVE", f"totalSupply={pair.totalSupply} reserves=({pair.reserve0},{pair.reserve1})")
+
+    b_raw0, b_raw1, b_r0, b_r1, b_vault = before[:5]
+    if op == "swap":
+        if pair.reserve0 * pair.reserve1 < b_r0 * b_r1:
+            raise InvariantError("K_DECREASED", f"{b_r0}*{b_r1} -> {pair.reserve0}*{pair.reserve1}")
+        if pair.vault < b_vault:
+            raise InvariantError("VAULT_DECREASED", f"{b_vault} -> {pair.vault}")
+    elif op in ("mint", "burn"):
+        expected = pair.reserve0 * pair.reserve1 if pair.feeOn else 0
+        if pair.kLast != expected:
+            raise InvariantError("KLAST", f"kLast={pair.kLast} expected={expected}")
+    elif op == "sync":
+        if (rQuote, rBase) != (rawQuote - pair.vault, rawBase):
+            raise InvariantError("SYNC", f"reserves=({rQuote},{rBase}) raw=({rawQuote},{rawBase}) vault={pair.vault}")
+    elif op == "skim":
+        if (rawQuote, rawBase) != (rQuote + pair.vault, rBase):
+            raise InvariantError("SKIM", f"raw=({rawQuote},{rawBase}) reserves=({rQuote},{rBase}) vault={pair.vault}")
+    elif op == "claimQuoteTax":
+        if pair.vault != 0 or (pair.reserve0, pair.reserve1) != (b_r0, b_r1):
+            raise InvariantError("CLAIM", f"vault={pair.vault} reserves changed={(b_r0, b_r1) != (pair.reserve0, pair.reserve1)}")
+
+
+# ─── Randomized driver ───
+
+def _fraction(rng: random.Random, value: int, octaves: int = 40, lo: int = 0) -> int:
+    """Amount in [0, value >> lo) with a log-uniform spread over `octaves` octaves."""
+    return (value * rng.getrandbits(32)) >> (32 + rng.randrange(lo, lo + octaves))
+
+
+def _log_amount(rng: random.Random, lo_bits: int, hi_bits: int) -> int:
+    bits = rng.randint(lo_bits, hi_bits)
+    return rng.getrandbits(bits) | (1 << (bits - 1))
+
+
+def _quoted_swap(pair: StatefulPair, rng: random.Random):
+    """Quote one swap through the Library and return the pair call, or None if it is not quotable.
+
+    Exact-out amounts stay below half the reserve so the input side cannot
+    explode and pin the pool at the uint112 ceiling.
+    """
+    direction = SWAP_DIRECTIONS[rng.randrange(4)]
+    rQuote, rBase = pair.quote_reserves()
+    buyTax, sellTax = pair.buyTax, pair.sellTax
+    try:
+        if direction == "buy_exact_in":
+            quoteIn = _fraction(rng, rQuote) or 1
+            baseOut = library_getAmountsOut_buy(quoteIn, buyTax, rQuote, rBase)[2]
+            baseIn = quoteOut = 0
+        elif direction == "sell_exact_in":
+            baseIn = _fraction(rng, rBase) or 1
+            quoteOut = library_getAmountsOut_sell(baseIn, sellTax, rBase, rQuote)[2]
+            quoteIn = baseOut = 0
+        elif direction == "sell_exact_out":
+            quoteOut = _fraction(rng, rQuote, lo=1)
+            gross, _, baseIn = library_getAmountsIn_sell(quoteOut, sellTax, rBase, rQuote)
+            if gross >= rQuote:
+                return None
+            quoteIn = baseOut = 0
+        else:
+            baseOut = _fraction(rng, rBase, lo=1)
+            quoteIn = library_getAmountsIn_buy(baseOut, buyTax, rQuote, rBase)[2]
+            baseIn = quoteOut = 0
+    except (AssertionError, ZeroDivisionError):
+        return None
+    if baseOut + quoteOut == 0:
+        return None
+    if pair.isQuote0:
+        return direction, (quoteOut, baseOut, quoteIn, baseIn)
+    return direction, (baseOut, quoteOut, baseIn, quoteIn)
+
+
+def _degenerate(pair: StatefulPair) -> bool:
+    """Pool pinned at the uint112 ceiling or priced so lopsidedly that most calls
+    revert on rounding; the driver then starts over on a fresh pair."""
+    bits0, bits1 = pair.reserve0.bit_length(), pair.reserve1.bit_length()
+    return max(bits0, bits1) > 108 or abs(bits0 - bits1) > 64
+
+
+def step(pair: StatefulPair, rng: random.Random) -> Tuple[str, str, Optional[str]]:
+    """Draw and apply one operation. Returns (op, args description, revert reason).
+
+    Raises InvariantError when a post-condition fails or a Library-quoted swap
+    reverts for a reason other than QUOTED_SWAP_REVERTS.
+    """
+    if pair.totalSupply == 0:
+        op = "mint"
+    elif _degenerate(pair):
+        pair.__init__(**_genesis_config(rng))
+        return "genesis", "", None
+    else:
+        op = rng.choices(OPS, _OP_WEIGHTS)[0]
+    before = pair.snapshot()
+    args = ""
+    try:
+        if op == "swap":
+            quoted = _quoted_swap(pair, rng)
+            if quoted is None:
+                return op, "unquotable", "SKIPPED"
+            direction, call = quoted
+            args = f"{direction} {call}"
+            try:
+                pair.swap(*call)
+            except Revert as exc:
+                if str(exc) not in QUOTED_SWAP_REVERTS:
+                    raise InvariantError("QUOTED_SWAP_REVERT", f"{exc} state={before}", op, args)
+                raise
+        elif op == "mint":
+            if pair.totalSupply == 0:
+                in0, in1 = _log_amount(rng, 11, 80), _log_amount(rng, 11, 80)
+            else:
+                # Mostly balanced deposits so LP supply tracks sqrt(k); 10% lopsided.
+                # Drained pools are regrown by up to 2^24x, pools near uint112 only topped up.
+                size = max(pair.reserve0, pair.reserve1).bit_length()
+                lo = -24 if size < 40 else (8 if size > 100 else 0)
+                numerator, shift = rng.getrandbits(32), 32 + rng.randrange(lo, lo + 8)
+                in0 = (pair.reserve0 * numerator) >> shift
+                in1 = (pair.reserve1 * numerator) >> shift
+                if rng.random() < 0.1:
+                    in1 = _fraction(rng, pair.reserve1, 8)
+            args = f"({in0},{in1})"
+            pair.mint(in0, in1)
+        elif op == "burn":
+            liquidity = _fraction(rng, pair.lp, 8) if rng.random() < 0.98 else pair.lp
+            args = f"{liquidity}"
+            pair.burn(liquidity)
+        elif op == "donate":
+            in0 = _fraction(rng, pair.reserve0, 32, 4) if rng.random() < 0.5 else 0
+            in1 = _fraction(rng, pair.reserve1, 32, 4) if rng.random() < 0.5 else 0
+            args = f"({in0},{in1})"
+            pair.donate(in0, in1)
+        elif op == "sync":
+            pair.sync()
+        elif op == "skim":
+            args = str(pair.skim())
+        elif op == "claimQuoteTax":
+            args = str(pair.claimQuoteTax())
+        elif op == "setFeeTo":
+            pair.setFeeTo(not pair.feeOn)
+            args = str(pair.feeOn)
+        else:
+            buyTax, sellTax = rng.randint(0, MAX_TAX_BPS), rng.randint(0, MAX_TAX_BPS)
+            args = f"({buyTax},{sellTax})"
+            pair.setTaxConfig(buyTax, sellTax)
+    except Revert as exc:
+        return op, args, str(exc)
+    try:
+        check_invariants(pair, op, before)
+    except InvariantError as exc:
+        exc.op, exc.call = op, args
+        raise
+    return op, args, None
+
+
+def _genesis_config(rng: random.Random) -> dict:
+    return {
+        "isQuote0": rng.random() < 0.5,
+        "buyTax": rng.randint(0, MAX_TAX_BPS),
+        "sellTax": rng.randint(0, MAX_TAX_BPS),
+        "feeOn": rng.random() < 0.5,
+    }
+
+
+def new_pair(rng: random.Random) -> StatefulPair:
+    return StatefulPair(**_genesis_config(rng))
+
+
+def stream_rng(seed: int, stream: int) -> random.Random:
+    return random.Random(f"{seed}/{stream}")
+
+
+@dataclass
+class Checkpoint:
+    step: int
+    state: Tuple
+    rng_state: Tuple
+
+    def to_json(self) -> dict:
+        version, internal, gauss = self.rng_state
+        return {"step": self.step, "state": list(self.state), "rng_state": [version, list(internal), gauss]}
+
+    @classmethod
+    def from_json(cls, payload: dict) -> "Checkpoint":
+        version, internal, gauss = payload["rng_state"]
+        return cls(payload["step"], tuple(payload["state"]), (version, tuple(internal), gauss))
+
+
+@dataclass
+class SequenceFailure:
+    seed: int
+    stream: int
+    step: int
+    op: str
+    args: str
+    invariant: str
+    detail: str
+    checkpoint: Checkpoint
+
+
+@dataclass
+class StreamResult:
+    ops: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    reverts: Dict[str, int] = field(default_factory=dict)
+    failure: Optional[SequenceFailure] = None
+
+
+def simulate(seed: int, stream: int, ops: int, checkpoint_every: int = 10_000) -> StreamResult:
+    """Run one stream for `ops` operations, stopping at the first invariant failure."""
+    rng = stream_rng(seed, stream)
+    pair = new_pair(rng)
+    result = StreamResult()
+    counts, reverts = result.counts, result.reverts
+    checkpoint = Checkpoint(0, pair.snapshot(), rng.getstate())
+
+    for i in range(ops):
+        if i and i % checkpoint_every == 0:
+            checkpoint = Checkpoint(i, pair.snapshot(), rng.getstate())
+        try:
+            op, args, reason = step(pair, rng)
+        except InvariantError as exc:
+            result.ops = i + 1
+            result.failure = SequenceFailure(seed, stream, i, exc.op, exc.call, exc.invariant, exc.detail,
+                                             checkpoint)
+            return result
+        counts[op] = counts.get(op, 0) + 1
+        if reason is not None:
+            reverts[reason] = reverts.get(reason, 0) + 1
+    result.ops = ops
+    return result
+
+
+def _simulate_shard(shard):
+    return simulate(*shard)
+
+
+@dataclass
+class SequenceReport:
+    seed: int
+    streams: int
+    ops: int
+    elapsed_s: float
+    counts: Dict[str, int]
+    reverts: Dict[str, int]
+    failures: List[SequenceFailure]
+
+    @property
+    def ops_per_s(self) -> float:
+        return self.ops / max(self.elapsed_s, 1e-9)
+
+
+def run_sequences(seed: int, total_ops: int, streams: int = 0, workers: int = 0,
+                  checkpoint_every: int = 10_000) -> SequenceReport:
+    """Split `total_ops` over independent streams (one pair each) across a process pool."""
+    workers = workers or os.cpu_count() or 1
+    streams = streams or workers
+    per_stream = -(-total_ops // streams)
+    shards = [(seed, s, per_stream, checkpoint_every) for s in range(streams)]
+
+    started = time.perf_counter()
+    if workers == 1:
+        parts = [simulate(*shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_shard, shards))
+    elapsed = time.perf_counter() - started
+
+    counts: Dict[str, int] = {}
+    reverts: Dict[str, int] = {}
+    for part in parts:
+        for key, value in part.counts.items():
+            counts[key] = counts.get(key, 0) + value
+        for key, value in part.reverts.items():
+            reverts[key] = reverts.get(key, 0) + value
+    return SequenceReport(
+        seed=seed,
+        streams=streams,
+        ops=sum(part.ops for part in parts),
+        elapsed_s=elapsed,
+        counts=counts,
+        reverts=reverts,
+        failures=[part.failure for part in parts if part.failure is not None],
+    )
+
+
+def write_failure(failure: SequenceFailure, out_dir: Path) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"sequence-{failure.seed}-{failure.stream}-{failure.step}.json"
+    payload = {
+        "seed": failure.seed,
+        "stream": failure.stream,
+        "step": failure.step,
+        "op": failure.op,
+        "args": failure.args,
+        "invariant": failure.invariant,
+        "detail": failure.detail,
+        "checkpoint": failure.checkpoint.to_json(),
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    return path
+
+
+def replay(path: Path, trace=None) -> Optional[InvariantError]:
+    """Resume from the stored checkpoint and run up to the failing step.
+
+    `trace(step, op, args, reason)` is called for every operation. Returns the
+    invariant error if it reproduces, else None.
+    """
+    payload = json.loads(path.read_text())
+    checkpoint = Checkpoint.from_json(payload["checkpoint"])
+    pair = StatefulPair.restore(checkpoint.state)
+    rng = random.Random()
+    rng.setstate(checkpoint.rng_state)
+    for i in range(checkpoint.step, payload["step"] + 1):
+        try:
+            op, args, reason = step(pair, rng)
+        except InvariantError as exc:
+            return exc
+        if trace is not None:
+            trace(i, op, args, reason)
+    return None
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Split-order optimizer: one exact-in order spread over parallel paths.
+
+Candidate paths come from `math_router.Router.paths`, ranked by their quote for
+the whole order; legs are kept pool-disjoint so each leg's `getAmountsOut` is
+independent of the others and the summed output is exact. The order is then
+allocated in `chunks` equal slices, each to the leg with the largest marginal
+output (a heap of marginal gains), and the integer split is refined by moving
+halving step sizes between leg pairs while the total improves.
+
+Every leg of the final split is executed through the Pair model
+(`math_paths.execute_path`); the optimizer never returns less than the best
+single path.
+"""
+
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from math_paths import PairGraph, PathError, execute_path, get_amounts_out
+from math_router import Router, hub_graph, quote_hubs
+
+
+@dataclass
+class Leg:
+    path: Tuple[int, ...]
+    amountIn: int
+    amounts: List[int]
+
+
+@dataclass
+class SplitQuote:
+    legs: List[Leg]
+    total_out: int
+    single_out: int   # best single path for the whole order
+    evaluations: int  # getAmountsOut calls spent
+    failures: List[str] = field(default_factory=list)  # Pair-model execution findings
+
+    @property
+    def gain_bps(self) -> float:
+        return 0.0 if self.single_out == 0 else (self.total_out - self.single_out) * 10_000 / self.single_out
+
+
+class _Evaluator:
+    """Leg output as a function of its input, memoized for one request."""
+
+    def __init__(self, graph: PairGraph):
+        self.graph = graph
+        self.memo: Dict[Tuple[Tuple[int, ...], int], int] = {}
+
+    def out(self, path: Tuple[int, ...], amount: int) -> int:
+        if amount <= 0:
+            return 0
+        key = (path, amount)
+        if key not in self.memo:
+            try:
+                amounts = get_amounts_out(self.graph, amount, path)
+                # A zero intermediate output reverts in Pair.swap.
+                self.memo[key] = amounts[-1] if all(amounts[1:]) else -1
+            except (PathError, AssertionError, ZeroDivisionError):
+                self.memo[key] = -1
+        return self.memo[key]
+
+
+def _pools(path: Sequence[int]):
+    return {(min(a, b), max(a, b)) for a, b in zip(path, path[1:])}
+
+
+def candidate_legs(router: Router, ev: _Evaluator, tokenIn: int, tokenOut: int, amountIn: int,
+                   max_legs: int) -> List[Tuple[int, ...]]:
+    """Pool-disjoint paths, best whole-order quote first."""
+    ranked = []
+    for path in router.paths(tokenIn, tokenOut):
+        probe = ev.out(path, amountIn)
+        if probe < 0:
+            probe = ev.out(path, max(1, amountIn // 64))  # usable for a slice only
+            if probe < 0:
+                continue
+            probe = -1
+        ranked.append((probe, path))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    chosen, used = [], set()
+    for _, path in ranked:
+        pools = _pools(path)
+        if pools & used:
+            continue
+        chosen.append(path)
+        used |= pools
+        if len(chosen) == max_legs:
+            break
+    return chosen
+
+
+def optimize_split(graph: PairGraph, router: Router, tokenIn: int, tokenOut: int, amountIn: int,
+                   max_legs: int = 4, chunks: int = 64) -> Optional[SplitQuote]:
+    ev = _Evaluator(graph)
+    paths = candidate_legs(router, ev, tokenIn, tokenOut, amountIn, max_legs)
+    if not paths:
+        return None
+
+    # Greedy marginal allocation in equal slices; the remainder joins leg 0.
+    alloc = [0] * len(paths)
+    chunks = max(1, min(chunks, amountIn))
+    size = amountIn // chunks
+
+    def gain(i: int) -> int:
+        new = ev.out(paths[i], alloc[i] + size)
+        return -1 if new < 0 else new - max(0, ev.out(paths[i], alloc[i]))
+
+    heap = [(-gain(i), i) for i in range(len(paths))]
+    heapq.heapify(heap)
+    for _ in range(chunks):
+        best_gain, i = heapq.heappop(heap)
+        if best_gain > 0:
+            break  # no leg can absorb another slice
+        alloc[i] += size
+        heapq.heappush(heap, (-gain(i), i))
+    alloc[0] += amountIn - sum(alloc)
+
+    # Refinement: move halving steps between legs while the total improves.
+    def total(a: List[int]) -> int:
+        outs = [ev.out(p, x) for p, x in zip(paths, a)]
+        return -1 if min(outs) < 0 else sum(outs)
+
+    current = total(alloc)
+    step = max(1, amountIn // chunks // 2)
+    while step >= 1:
+        improved = False
+        for src in range(len(paths)):
+            for dst in range(len(paths)):
+                if src == dst or alloc[src] < step:
+                    continue
+                trial = list(alloc)
+                trial[src] -= step
+                trial[dst] += step
+                value = total(trial)
+                if value > current:
+                    alloc, current, improved = trial, value, True
+        if not improved:
+            step //= 2
+
+    single = ev.out(paths[0], amountIn)
+    if current < single:
+        alloc, current = [amountIn] + [0] * (len(paths) - 1), single
+
+    legs, failures = [], []
+    for path, amount in zip(paths, alloc):
+        if amount == 0:
+            continue
+        try:
+            report = execute_path(graph, path, amount)
+        except PathError as exc:
+            failures.append(f"path={path} in={amount}: {exc}")
+            continue
+        if report.failure:
+            failures.append(f"path={path} in={amount}: {report.failure}")
+        legs.append(Leg(path, amount, report.amounts))
+    executed = sum(leg.amounts[-1] for leg in legs)
+    if executed != current:
+        failures.append(f"executed total {executed} != optimized total {current}")
+    return SplitQuote(legs, current, max(0, single), len(ev.memo), failures)
+
+
+# ─── Benchmark ───
+
+@dataclass
+class SplitBenchReport:
+    pairs: int
+    orders: int
+    quoted: int
+    split: int          # orders routed over more than one leg
+    mean_ms: float
+    p99_ms: float
+    mean_gain_bps: float
+    max_gain_bps: float
+    failures: List[str]
+
+
+def run_split_bench(seed: int, pairs: int = 10_000, orders: int = 200, max_legs: int = 4,
+                    chunks: int = 64) -> SplitBenchReport:
+    """Large random orders (1/2 .. 1/64 of the first hop's input reserve)
+    between base tokens of a hub graph."""
+    rng = random.Random(seed)
+    graph = hub_graph(rng, pairs)
+    router = Router(graph)
+    hubs = quote_hubs(graph)
+    bases = [t for t in router.index if t not in hubs]
+    latencies, gains, quoted, split, failures = [], [], 0, 0, []
+
+    for _ in range(orders):
+        a, b = rng.sample(bases, 2)
+        first = graph.pool(a, rng.choice([t for t in router.index[a] if t in hubs]))
+        amount = max(1, first.reserves(a)[0] >> rng.randint(1, 6))
+        started = time.perf_counter()
+        quote = optimize_split(graph, router, a, b, amount, max_legs, chunks)
+        latencies.append(time.perf_counter() - started)
+        if quote is None:
+            continue
+        quoted += 1
+        split += len(quote.legs) > 1
+        gains.append(quote.gain_bps)
+        failures.extend(quote.failures)
+        if quote.total_out < quote.single_out:
+            failures.append(f"{a}->{b} in={amount}: split {quote.total_out} < single {quote.single_out}")
+
+    latencies.sort()
+    return SplitBenchReport(
+        pairs=len(graph.pools),
+        orders=orders,
+        quoted=quoted,
+        split=split,
+        mean_ms=1000 * sum(latencies) / len(latencies),
+        p99_ms=1000 * latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        mean_gain_bps=sum(gains) / max(1, len(gains)),
+        max_gain_bps=max(gains, default=0.0),
+        failures=failures,
+    )
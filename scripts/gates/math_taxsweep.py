@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tax-domain sweep: rounding behaviour for every buy/sell tax 0..MAX_TAX_BPS.
+
+The tax roundings are reserve-independent, so they are tabulated once over
+the tax axis (NumPy, tax values in chunks):
+
+  buy.npy   [buyTax]            floor tax on the raw quote input
+    zero_tax_max_in       largest raw input charged no tax (-1: never taxed)
+    exact_out_overpay_max effIn above the requested netIn after the exact-out
+    exact_out_overpay_mean  ceil gross-up, over one full period of netIn
+                          (1..BPS-buyTax)
+    inout_gap_max         raw input above the exact-out quote for the same effIn
+  sell.npy  [sellTax]           floor net / ceil gross-up on the quote output
+    min_tax               smallest tax on a nonzero gross (0 only for sellTax=0)
+    roundtrip_same        grosses whose floor→ceil roundtrip returns gross
+    roundtrip_minus1      ... returns gross - 1
+    roundtrip_other       ... any other delta
+    roundtrip_max_err     max |delta|
+    exact_out_excess_max  net delivered above the requested exact-out net
+  pair.npy  [buyTax, sellTax]   quote → buy tax → sell tax, no curve
+    roundtrip_loss_max    wei below the exact q·(1-b)(1-s), max over q (signed:
+    roundtrip_loss_mean   the floor buy tax rounds for the trader); mean over q
+    min_nonzero_in        smallest q with a nonzero net (-1: none sampled)
+
+Per-side metrics are exact: the floor taxes and the floor→ceil roundtrip
+are periodic in the amount with period BPS, the exact-out ceil gross-ups
+with period BPS-tax, and `zero_tax_max_in` lies below BPS/tax, so amounts
+1..BPS cover at least one full period of each. The pair table samples
+q = 1..`amounts`.
+
+Tables are written as plain `.npy` files plus `meta.json`, so `load_sweep`
+(or any `np.load(..., mmap_mode="r")`) memory-maps them without copying.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+BPS = 10_000
+MAX_TAX_BPS = 2000
+SWEEP_SCHEMA = 2
+TAX_VALUES = np.arange(MAX_TAX_BPS + 1, dtype=np.int64)
+_TAX_CHUNK = 64
+
+BUY_DTYPE = np.dtype([
+    ("zero_tax_max_in", "<i4"),
+    ("exact_out_overpay_max", "<i4"),
+    ("exact_out_overpay_mean", "<f4"),
+    ("inout_gap_max", "<i4"),
+])
+SELL_DTYPE = np.dtype([
+    ("min_tax", "<i4"),
+    ("roundtrip_same", "<i4"),
+    ("roundtrip_minus1", "<i4"),
+    ("roundtrip_other", "<i4"),
+    ("roundtrip_max_err", "<i4"),
+    ("exact_out_excess_max", "<i4"),
+])
+PAIR_DTYPE = np.dtype([
+    ("roundtrip_loss_max", "<f4"),
+    ("roundtrip_loss_mean", "<f4"),
+    ("min_nonzero_in", "<i4"),
+])
+
+
+def _ceil_div(a, b):
+    return (a + b - 1) // b
+
+
+def buy_table() -> np.ndarray:
+    table = np.zeros(len(TAX_VALUES), dtype=BUY_DTYPE)
+    x = np.arange(1, BPS + 1, dtype=np.int64)
+    for start in range(0, len(TAX_VALUES), _TAX_CHUNK):
+        t = TAX_VALUES[start:start + _TAX_CHUNK, None]
+        rows = slice(start, start + t.shape[0])
+        keep = BPS - t
+
+        zero = x * t // BPS == 0
+        table["zero_tax_max_in"][rows] = np.where(t[:, 0] == 0, -1, (zero * x).max(axis=1))
+
+        raw = _ceil_div(x * BPS, keep)
+        overpay = raw - raw * t // BPS - x
+        table["exact_out_overpay_max"][rows] = overpay.max(axis=1)
+        table["exact_out_overpay_mean"][rows] = np.where(x <= keep, overpay, 0).sum(axis=1) / keep[:, 0]
+
+        eff = x - x * t // BPS
+        table["inout_gap_max"][rows] = (x - _ceil_div(eff * BPS, keep)).max(axis=1)
+    return table
+
+
+def sell_table() -> np.ndarray:
+    table = np.zeros(len(TAX_VALUES), dtype=SELL_DTYPE)
+    g = np.arange(1, BPS + 1, dtype=np.int64)
+    for start in range(0, len(TAX_VALUES), _TAX_CHUNK):
+        t = TAX_VALUES[start:start + _TAX_CHUNK, None]
+        rows = slice(start, start + t.shape[0])
+        keep = BPS - t
+
+        net = g * keep // BPS
+        table["min_tax"][rows] = (g - net).min(axis=1)
+
+        valid = net > 0
+        delta = _ceil_div(net * BPS, keep) - g
+        table["roundtrip_same"][rows] = np.count_nonzero(valid & (delta == 0), axis=1)
+        table["roundtrip_minus1"][rows] = np.count_nonzero(valid & (delta == -1), axis=1)
+        table["roundtrip_other"][rows] = np.count_nonzero(valid & (delta != 0) & (delta != -1), axis=1)
+        table["roundtrip_max_err"][rows] = np.where(valid, np.abs(delta), 0).max(axis=1)
+
+        gross = _ceil_div(g * BPS, keep)  # g as the requested net
+        table["exact_out_excess_max"][rows] = (gross * keep // BPS - g).max(axis=1)
+    return table
+
+
+def pair_table(amounts: int) -> np.ndarray:
+    """With eff = q - floor(q·b/BPS) and net = floor(eff·(BPS-s)/BPS), the loss
+    q·(BPS-b)(BPS-s)/BPS² - net equals (BPS·r2 - r1·(BPS-s)) / BPS², where
+    r1 = q·b mod BPS and r2 = eff·(BPS-s) mod BPS — int32 throughout."""
+    if amounts * BPS >= 2**31:
+        raise ValueError(f"pair sweep amounts must stay below {2**31 // BPS}")
+    table = np.zeros((len(TAX_VALUES), len(TAX_VALUES)), dtype=PAIR_DTYPE)
+    q = np.arange(1, amounts + 1, dtype=np.int32)
+    keep_s = (BPS - TAX_VALUES).astype(np.int32)[:, None]     # [sellTax, 1]
+    first_net = _ceil_div(BPS, keep_s[:, 0])                   # smallest eff with net > 0
+    for b in range(len(TAX_VALUES)):
+        r1 = q * b % BPS
+        eff = q - q * b // BPS                                  # nondecreasing in q
+        r2 = eff * keep_s % BPS                                 # [sellTax, amounts]
+        loss = BPS * r2 - r1 * keep_s
+        row = table[b]
+        row["roundtrip_loss_max"] = loss.max(axis=1) / BPS**2
+        row["roundtrip_loss_mean"] = loss.mean(axis=1) / BPS**2
+        idx = np.searchsorted(eff, first_net)
+        row["min_nonzero_in"] = np.where(idx < amounts, idx + 1, -1)
+    return table
+
+
+def write_sweep(out_dir: Path, amounts: int = 2048) -> Dict:
+    """Compute all three tables into `out_dir`; returns the metadata written."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    timings = {}
+    for name, build in (("buy", buy_table), ("sell", sell_table), ("pair", lambda: pair_table(amounts))):
+        started = time.perf_counter()
+        np.save(out_dir / f"{name}.npy", build())
+        timings[name] = round(time.perf_counter() - started, 3)
+    meta = {
+        "schema": SWEEP_SCHEMA,
+        "bps": BPS,
+        "max_tax_bps": MAX_TAX_BPS,
+        "side_amounts": BPS,
+        "pair_amounts": amounts,
+        "tables": {
+            "buy": {"shape": [len(TAX_VALUES)], "fields": list(BUY_DTYPE.names)},
+            "sell": {"shape": [len(TAX_VALUES)], "fields": list(SELL_DTYPE.names)},
+            "pair": {"shape": [len(TAX_VALUES)] * 2, "fields": list(PAIR_DTYPE.names)},
+        },
+        "timings_s": timings,
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+    return meta
+
+
+def check_sweep(tables: Dict[str, np.ndarray]) -> list:
+    """Rounding properties the rest of the tooling relies on (e.g. the
+    exhaustive enumerator's sell-roundtrip folding); returns violations."""
+    buy, sell, pair = tables["buy"], tables["sell"], tables["pair"]
+    checks = [
+        ("sell roundtrip delta outside {0, -1}", np.flatnonzero(sell["roundtrip_other"])),
+        ("sell exact-out delivers above the requested net", np.flatnonzero(sell["exact_out_excess_max"])),
+        ("sell tax is zero on a nonzero gross", np.flatnonzero(sell["min_tax"][1:] == 0) + 1),
+        ("buy exact-out effIn overpay above 1 wei", np.flatnonzero(buy["exact_out_overpay_max"] > 1)),
+        ("buy raw input above its exact-out quote", np.flatnonzero(buy["inout_gap_max"])),
+        ("buy→sell roundtrip loss of 1 wei or more", np.flatnonzero((pair["roundtrip_loss_max"] >= 1).any(axis=1))),
+    ]
+    return [f"{what}: taxes {idx[:8].tolist()}" for what, idx in checks if len(idx)]
+
+
+def load_sweep(out_dir: Path) -> Dict[str, np.ndarray]:
+    """Memory-mapped, read-only views of a written sweep."""
+    out_dir = Path(out_dir)
+    meta = json.loads((out_dir / "meta.json").read_text())
+    if meta.get("schema") != SWEEP_SCHEMA:
+        raise ValueError(f"{out_dir}: unsupported sweep schema {meta.get('schema')}")
+    return {name: np.load(out_dir / f"{name}.npy", mmap_mode="r") for name in meta["tables"]}
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Long-horizon Monte Carlo of `accumulatedQuoteTax` accrual.
+
+Many independent pools are stepped in lock-step with NumPy, one swap per
+pool per step:
+
+  - pools: quote decimals from DECIMALS (an equal share each), log-uniform
+    quote-side TVL of 10^2..10^10 whole tokens (`TVL_DECADES`, a stress
+    range well above the largest single AMM pools), base side 10^-3..10^3
+    times that, buy/sell tax 0..2000 bps;
+  - trades: buy or sell with equal odds, size a log-normal fraction of the
+    input-side reserve (median 0.01%, heavy tail clipped at 30%), priced
+    with the 998/1000 `getAmountOut` and taxed the Library way (buy tax on
+    the raw quote input, sell tax grossed up from the net quote output);
+  - reserves evolve with every trade, plus occasional proportional
+    mint/burn (`LP_EVENT_RATE`, log-normal factor);
+  - `claimQuoteTax` resets a pool's vault every `claim_every` of its swaps
+    (random phase per pool; 0 = never);
+  - a swap whose tax would push the vault past uint96 reverts with
+    VAULT_OVERFLOW, as does one whose effective reserve would pass uint112.
+
+Amounts are float64: the simulation estimates magnitudes (vault high-water
+mark, swaps until saturation) far above wei resolution. Statistics are
+streamed per decimals group into per-pool accumulators, so memory is
+O(pools) regardless of the horizon; nothing per swap is kept.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BPS = 10_000
+VAULT_MAX = float(2**96 - 1)
+RESERVE_MAX = float(2**112 - 1)
+
+DECIMALS = (6, 8, 18)
+TVL_DECADES = (2, 10)   # log10 of the quote reserve, whole tokens
+TRADE_MEDIAN = 1e-4     # median trade size, fraction of the input reserve
+TRADE_SIGMA = 2.0       # log-normal sigma of the trade size
+TRADE_MAX = 0.3
+LP_EVENT_RATE = 0.01    # per-swap chance of a proportional mint/burn
+LP_SIGMA = 0.2
+SECONDS_PER_YEAR = 365 * 86_400
+
+BLOCK_POOLS = 1 << 16   # pools stepped together; bounds the working set
+
+
+@dataclass
+class GroupStats:
+    """Streaming summary for one quote-decimals group."""
+
+    decimals: int
+    pools: int = 0
+    swaps: int = 0
+    vault_reverts: int = 0
+    reserve_reverts: int = 0
+    claims: int = 0
+    tax_total: float = 0.0
+    high_water: float = 0.0              # largest vault seen, wei
+    saturated_pools: int = 0             # pools that hit VAULT_OVERFLOW at least once
+    first_saturation: List[int] = field(default_factory=list)  # swap index, saturated pools only
+    projected: List[float] = field(default_factory=list)       # unclaimed swaps to saturation, per taxed pool
+
+    @property
+    def high_water_fill(self) -> float:
+        return self.high_water / VAULT_MAX
+
+    def projected_percentile(self, q: float) -> Optional[float]:
+        if not self.projected:
+            return None
+        return float(np.percentile(self.projected, 100 * q))
+
+    def to_dict(self, swaps_per_day: float) -> Dict:
+        years = lambda swaps: None if swaps is None else swaps / swaps_per_day / 365
+        p01, p50 = self.projected_percentile(0.01), self.projected_percentile(0.5)
+        return {
+            "decimals": self.decimals,
+            "pools": self.pools,
+            "swaps": self.swaps,
+            "claims": self.claims,
+            "vault_reverts": self.vault_reverts,
+            "reserve_reverts": self.reserve_reverts,
+            "high_water_wei": self.high_water,
+            "high_water_fill": self.high_water_fill,
+            "saturated_pools": self.saturated_pools,
+            "first_saturation_min_swaps": min(self.first_saturation, default=None),
+            "projected_saturation_p01_years": years(p01),
+            "projected_saturation_p50_years": years(p50),
+        }
+
+
+@dataclass
+class VaultSimReport:
+    pools: int
+    steps: int
+    claim_every: int
+    swaps_per_day: float
+    groups: List[GroupStats]
+    elapsed_s: float
+
+    @property
+    def swaps(self) -> int:
+        return sum(g.swaps for g in self.groups)
+
+    def to_dict(self) -> Dict:
+        return {
+            "pools": self.pools,
+            "steps": self.steps,
+            "swaps": self.swaps,
+            "claim_every": self.claim_every,
+            "swaps_per_day": self.swaps_per_day,
+            "by_decimals": [g.to_dict(self.swaps_per_day) for g in self.groups],
+        }
+
+
+def _get_amount_out(amount_in, reserve_in, reserve_out):
+    with_fee = amount_in * 998
+    return with_fee * reserve_out / (reserve_in * 1000 + with_fee)
+
+
+def _simulate_block(rng: np.random.Generator, stats: GroupStats, n: int, steps: int, claim_every: int):
+    unit = 10.0 ** stats.decimals
+    r_quote = 10.0 ** rng.uniform(*TVL_DECADES, n) * unit
+    r_base = r_quote * 10.0 ** rng.uniform(-3, 3, n)
+    buy_tax = rng.integers(0, 2001, n)
+    sell_tax = rng.integers(0, 2001, n)
+    vault = np.zeros(n)
+    tax_sum = np.zeros(n)
+    saturated_at = np.full(n, -1, dtype=np.int64)
+    phase = rng.integers(0, claim_every, n) if claim_every else None
+    log_median = np.log(TRADE_MEDIAN)
+
+    for step in range(steps):
+        is_buy = rng.random(n) < 0.5
+        size = np.minimum(np.exp(log_median + TRADE_SIGMA * rng.standard_normal(n)), TRADE_MAX)
+
+        # Buy: raw quote in, tax on the raw input, base out.
+        raw_in = size * r_quote
+        buy_tax_amt = np.floor(raw_in * buy_tax / BPS)
+        eff_in = raw_in - buy_tax_amt
+        base_out = _get_amount_out(eff_in, r_quote, r_base)
+        # Sell: base in, gross quote out, net = gross * (1 - tax).
+        base_in = size * r_base
+        gross = _get_amount_out(base_in, r_base, r_quote)
+        sell_tax_amt = np.ceil(gross * sell_tax / BPS)
+
+        tax = np.where(is_buy, buy_tax_amt, sell_tax_amt)
+        d_quote = np.where(is_buy, eff_in, -gross)
+        d_base = np.where(is_buy, -base_out, base_in)
+
+        vault_over = vault + tax > VAULT_MAX
+        reserve_over = (r_quote + d_quote > RESERVE_MAX) | (r_base + d_base > RESERVE_MAX)
+        ok = ~(vault_over | reserve_over)
+
+        r_quote = np.where(ok, r_quote + d_quote, r_quote)
+        r_base = np.where(ok, r_base + d_base, r_base)
+        accrued = np.where(ok, tax, 0.0)
+        vault += accrued
+        tax_sum += accrued
+
+        stats.vault_reverts += int(np.count_nonzero(vault_over))
+        stats.reserve_reverts += int(np.count_nonzero(reserve_over & ~vault_over))
+        newly = vault_over & (saturated_at < 0)
+        if newly.any():
+            saturated_at[newly] = step
+        stats.high_water = max(stats.high_water, float(vault.max()))
+
+        lp = rng.random(n) < LP_EVENT_RATE
+        if lp.any():
+            factor = np.exp(LP_SIGMA * rng.standard_normal(int(lp.sum())))
+            factor = np.minimum(factor, RESERVE_MAX / np.maximum(r_quote[lp], r_base[lp]))
+            r_quote[lp] *= factor
+            r_base[lp] *= factor
+
+        if claim_every:
+            claiming = (step + phase) % claim_every == claim_every - 1
+            stats.claims += int(np.count_nonzero(claiming & (vault > 0)))
+            vault[claiming] = 0.0
+
+    stats.pools += n
+    stats.swaps += n * steps
+    stats.tax_total += float(tax_sum.sum())
+    hit = saturated_at >= 0
+    stats.saturated_pools += int(hit.sum())
+    stats.first_saturation.extend(int(s) for s in saturated_at[hit])
+    taxed = tax_sum > 0
+    stats.projected.extend((VAULT_MAX * steps / tax_sum[taxed]).tolist())
+
+
+def simulate(seed: int, pools: int, steps: int, claim_every: int = 0,
+             swaps_per_day: float = 10_000) -> VaultSimReport:
+    """Step `pools` pools (split evenly over DECIMALS) through `steps` swaps
+    each. `swaps_per_day` only converts swap counts into years."""
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    groups = []
+    for i, decimals in enumerate(DECIMALS):
+        stats = GroupStats(decimals)
+        share = pools // len(DECIMALS) + (i < pools % len(DECIMALS))
+        while share > 0:
+            n = min(share, BLOCK_POOLS)
+            _simulate_block(rng, stats, n, steps, claim_every)
+            share -= n
+        groups.append(stats)
+    return VaultSimReport(pools, steps, claim_every, swaps_per_day, groups, time.perf_counter() - started)
@@ -2,14 +2,23 @@
 """Collect reproducible docs verification metrics into JSON."""
 
 import argparse
+import asyncio
+import contextlib
+import inspect
 import json
 import os
 import re
+import signal
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+import forge_timings
+import metrics_history
+
 ROOT = Path(__file__).resolve().parents[2]
 PROTOCOL_DIR = ROOT / "protocol"
 DOCS_DIR = ROOT / "docs"
@@ -18,6 +27,11 @@ REQUIREMENTS_PATH = DOCS_DIR / "traceability" / "NADSWAP_V2_REQUIREMENTS.yaml"
 SPEC_PATH = DOCS_DIR / "NADSWAP_V2_IMPL_SPEC_EN.md"
 MIGRATION_PATH = REPORTS_DIR / "NADSWAP_V2_MIGRATION_SIGNOFF.md"
 MATH_GATE_PATH = ROOT / "scripts" / "gates" / "check_math_consistency.py"
+GAS_GATE_PATH = ROOT / "scripts" / "gates" / "check_gas_snapshot.py"
+# The committed gas baseline has no recorded gas yet (every entry is null), so
+# NEW scenarios are allowed; drop this once --update-baseline has been run and
+# committed. Regressions and missing scenarios still fail.
+GAS_GATE_ARGS = ("--allow-new",)
 DEFAULT_OUTPUT = REPORTS_DIR / "NADSWAP_V2_VERIFICATION_METRICS.json"
 DEFAULT_BASELINE = REPORTS_DIR / "NADSWAP_V2_VERIFICATION_BASELINE.json"
 
@@ -26,7 +40,16 @@ SPEC_TEST_RE = re.compile(r"`(test_[A-Za-z0-9_]+)`")
 SPEC_INVARIANT_RE = re.compile(r"`(invariant_[A-Za-z0-9_]+)`")
 MIGRATION_ROW_RE = re.compile(r"^\|\s*(\d+)\s*\|")
 TEST_COUNT_RE = re.compile(r"(\d+) total tests\)")
-MATH_TOTAL_RE = re.compile(r"Results:\s*(\d+)\s*tests,\s*(\d+)\s*passed,\s*(\d+)\s*failed")
+
+# One `forge test --json` run covers both non-fork metrics; they are split by
+# test path (forge reports suites as `test/<dir>/<File>.t.sol:<Contract>`).
+# `test/gas/` holds gas scenarios for the gas snapshot gate and
+# `test/differential/` the opt-in Python<->Solidity vector run; neither is counted.
+FORGE_NON_FORK_CMD = ["forge", "test", "--json", "--no-match-path", "test/{fork,gas,differential}/**"]
+FORGE_PARTITIONS = {
+    "non_fork_all": ("test/fork/",),
+    "non_fork_strict": ("test/fork/", "test/invariant/"),
+}
 
 
 METRIC_KEYS = [
@@ -38,21 +61,41 @@ METRIC_KEYS = [
     "spec_invariant_count",
     "math_consistency_total",
     "migration_items_total",
+    "gas_snapshot_total",
 ]
 
+# Collectors run concurrently; each gets a timeout (seconds, `--timeout NAME=S`).
+# Collectors that invoke forge share protocol/out and protocol/cache, so they
+# hold one shared lock and run one at a time; the timeout starts once a
+# collector holds it.
+FORGE_COLLECTORS = ("forge", "gas")
+COLLECTOR_TIMEOUTS = {
+    "forge": 3600.0,
+    "math": 900.0,
+    "gas": 1800.0,
+    "fork_logs": 60.0,
+    "requirements": 60.0,
+    "spec": 60.0,
+    "migration": 60.0,
+}
+# Metrics that fall back to the baseline when their collector fails.
+BASELINE_KEYS = ("non_fork_all", "non_fork_strict", "fork_suite_total", "math_consistency_total")
+
 
 def fail(msg: str) -> None:
     print(f"[FAIL] {msg}")
     sys.exit(1)
 
 
-def set_metric(payload, key, status, value=None, detail="", source=""):
+def set_metric(payload, key, status, value=None, detail="", source="", elapsed_s=None):
     payload[key] = value
     payload["status"][key] = status
     payload["details"][key] = {
         "detail": detail,
         "source": source,
     }
+    if elapsed_s is not None:
+        payload["details"][key]["elapsed_s"] = elapsed_s
 
 
 def run_command(cmd, cwd=None, env=None):
@@ -61,6 +104,24 @@ def run_command(cmd, cwd=None, env=None):
     return proc.returncode, out
 
 
+async def run_command_async(cmd, cwd=None, env=None):
+    """(returncode, stdout, stderr); the process group is killed if the
+    awaiting task is cancelled, e.g. by a collector timeout, so children
+    holding the pipes (solc, worker pools) go with it."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, cwd=cwd, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+        await proc.wait()
+        raise
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
 def load_baseline(path: Path):
     if not path.exists():
         return {}
@@ -87,19 +148,38 @@ def with_baseline_if_error(key, status, value, detail, source, baseline):
     return status, value, detail, source
 
 
-def collect_forge_total(cmd):
+async def collect_forge_suites(cmd):
+    """Returns (status, suites, detail); forge exits non-zero when a test
+    fails, so its JSON is parsed regardless and failures are judged per test."""
     env = os.environ.copy()
     env.setdefault("FOUNDRY_OFFLINE", "true")
-    code, out = run_command(cmd, cwd=PROTOCOL_DIR, env=env)
-    if code != 0:
+    try:
+        code, stdout, stderr = await run_command_async(cmd, cwd=PROTOCOL_DIR, env=env)
+    except OSError as exc:
+        return "ERROR", None, f"forge command failed: {exc}"
+    try:
+        suites = forge_timings.parse_forge_json(stdout)
+    except ValueError as exc:
+        out = stdout + ("\n" + stderr if stderr else "")
         tail = "\n".join(out.strip().splitlines()[-25:])
-        return "ERROR", None, f"forge command failed (exit={code})\n{tail}", "command"
-
-    totals = TEST_COUNT_RE.findall(out)
-    if not totals:
-        return "ERROR", None, "unable to parse forge total test count", "command"
-
-    return "PASS", int(totals[-1]), "", "command"
+        return "ERROR", None, f"forge command failed (exit={code}): {exc}\n{tail}"
+    if not suites:
+        return "ERROR", None, "forge reported no test suites"
+    return "PASS", suites, ""
+
+
+def forge_partition_total(suites, excluded_dirs):
+    """(status, value, detail) for the tests outside `excluded_dirs`."""
+    tests = [
+        (suite["suite"], test)
+        for suite in suites
+        if not suite["path"].startswith(excluded_dirs)
+        for test in suite["tests"]
+    ]
+    failed = [f"{suite}::{test['name']}" for suite, test in tests if test["status"] == "Failure"]
+    if failed:
+        return "ERROR", len(tests), f"{len(failed)} failing tests: {', '.join(failed[:10])}"
+    return "PASS", len(tests), ""
 
 
 def collect_fork_total_from_logs(log_dir: Path):
@@ -155,26 +235,56 @@ def parse_spec_name_count(regex):
     return "PASS", len(found), "", "parse"
 
 
-def collect_math_consistency_total():
-    if not MATH_GATE_PATH.exists():
-        return "ERROR", None, f"missing math gate script: {MATH_GATE_PATH}", "command"
+async def run_gate_document(gate_path: Path, what: str, extra_args=()):
+    """Run a gate with `--json` (plus `extra_args`); returns (document, error
+    detail). The document is None when the gate could not produce one."""
+    if not gate_path.exists():
+        return None, f"missing {what} gate script: {gate_path}"
+
+    cmd = [sys.executable, str(gate_path), *extra_args, "--json"]
+    try:
+        code, stdout, stderr = await run_command_async(cmd, cwd=ROOT)
+    except OSError as exc:
+        return None, f"{what} gate failed: {exc}"
+    try:
+        return json.loads(stdout), ""
+    except ValueError:
+        tail = "\n".join((stderr.strip() or stdout.strip()).splitlines()[-25:])
+        return None, f"{what} gate exited {code} without a result document\n{tail}"
+
+
+async def collect_math_consistency_total():
+    """Returns (status, value, detail, source, document); `document` is the
+    gate's structured result (`check_math_consistency.py --json`)."""
+    document, detail = await run_gate_document(MATH_GATE_PATH, "math consistency")
+    if document is None:
+        return "ERROR", None, detail, "command", None
+
+    core = document["core"]
+    if not document["passed"] or core["failed"] != 0 or core["passed"] != core["total"]:
+        failed = [check["name"] for check in document["checks"] if not check["passed"]]
+        detail = f"math consistency reported failures: {', '.join(failed) or 'core vectors'}"
+        if core["errors"]:
+            detail += "\n" + "\n".join(core["errors"])
+        return "ERROR", core["total"], detail, "command", document
+
+    return "PASS", core["total"], "", "command", document
 
-    code, out = run_command([sys.executable, str(MATH_GATE_PATH)], cwd=ROOT)
-    if code != 0:
-        tail = "\n".join(out.strip().splitlines()[-30:])
-        return "ERROR", None, f"math consistency gate failed (exit={code})\n{tail}", "command"
 
-    m = MATH_TOTAL_RE.search(out)
-    if not m:
-        return "ERROR", None, "unable to parse math consistency totals", "command"
+async def collect_gas_snapshot_total():
+    """Returns (status, value, detail, source, document); the value counts the
+    gas scenarios measured (`check_gas_snapshot.py --json`)."""
+    document, detail = await run_gate_document(GAS_GATE_PATH, "gas snapshot", GAS_GATE_ARGS)
+    if document is None:
+        return "ERROR", None, detail, "command", None
 
-    total = int(m.group(1))
-    passed = int(m.group(2))
-    failed = int(m.group(3))
-    if failed != 0 or passed != total:
-        return "ERROR", total, "math consistency reported non-zero failures", "command"
+    measured = sum(row["gas"] is not None for row in document["functions"])
+    if not document["passed"]:
+        statuses = ("REGRESSION", "MISSING") if document.get("allow_new") else ("REGRESSION", "MISSING", "NEW")
+        failing = [f"{row['name']}={row['status']}" for row in document["functions"] if row["status"] in statuses]
+        return "ERROR", measured, f"gas snapshot reported failures: {', '.join(failing)}", "command", document
 
-    return "PASS", total, "", "command"
+    return "PASS", measured, "", "command", document
 
 
 def parse_migration_items_count():
@@ -200,6 +310,122 @@ def git_sha():
     return out.strip()
 
 
+# ─── Collectors ───
+# Each returns ({metric key: (status, value, detail, source)}, {payload key: extra}).
+
+async def forge_collector():
+    forge_status, suites, forge_detail = await collect_forge_suites(FORGE_NON_FORK_CMD)
+    metrics = {}
+    for key, excluded_dirs in FORGE_PARTITIONS.items():
+        if forge_status == "ERROR":
+            metrics[key] = (forge_status, None, forge_detail, "command")
+        else:
+            metrics[key] = (*forge_partition_total(suites, excluded_dirs), "command")
+    extras = {}
+    if suites is not None:
+        extras["forge_tests"] = {"command": " ".join(FORGE_NON_FORK_CMD), "suites": suites}
+    return metrics, extras
+
+
+async def math_collector():
+    status, value, detail, source, document = await collect_math_consistency_total()
+    extras = {} if document is None else {"math_consistency": document}
+    return {"math_consistency_total": (status, value, detail, source)}, extras
+
+
+async def gas_collector():
+    status, value, detail, source, document = await collect_gas_snapshot_total()
+    extras = {} if document is None else {"gas_snapshot": document}
+    return {"gas_snapshot_total": (status, value, detail, source)}, extras
+
+
+def parse_collector(**parsers):
+    """Wrap synchronous file parsers (metric key -> callable) as one collector."""
+    def collect():
+        return {key: parse() for key, parse in parsers.items()}, {}
+    return collect
+
+
+def build_collectors(args):
+    """name -> (metric keys, source, coroutine function or sync callable)."""
+    collectors = {}
+    if not args.skip_forge_tests:
+        collectors["forge"] = (tuple(FORGE_PARTITIONS), "command", forge_collector)
+    if not args.skip_math_consistency:
+        collectors["math"] = (("math_consistency_total",), "command", math_collector)
+    if not args.skip_gas_snapshot:
+        collectors["gas"] = (("gas_snapshot_total",), "command", gas_collector)
+    log_dir = Path(args.fork_log_dir)
+    collectors["fork_logs"] = (("fork_suite_total",), "fork-logs",
+                               parse_collector(fork_suite_total=lambda: collect_fork_total_from_logs(log_dir)))
+    collectors["requirements"] = (("requirements_count",), "parse",
+                                  parse_collector(requirements_count=parse_requirements_count))
+    collectors["spec"] = (("spec_test_count", "spec_invariant_count"), "parse", parse_collector(
+        spec_test_count=lambda: parse_spec_name_count(SPEC_TEST_RE),
+        spec_invariant_count=lambda: parse_spec_name_count(SPEC_INVARIANT_RE),
+    ))
+    collectors["migration"] = (("migration_items_total",), "parse",
+                               parse_collector(migration_items_total=parse_migration_items_count))
+    return collectors
+
+
+async def run_collector(name, keys, source, collect, timeout, pool, lock=None):
+    """Run one collector under its timeout, holding `lock` (if any) for the
+    whole run; returns (metrics, extras, elapsed_s). A timeout or crash turns
+    every metric of the collector into ERROR."""
+    if lock is None:
+        return await _run_collector(name, keys, source, collect, timeout, pool)
+    async with lock:
+        return await _run_collector(name, keys, source, collect, timeout, pool)
+
+
+async def _run_collector(name, keys, source, collect, timeout, pool):
+    started = time.perf_counter()
+    if inspect.iscoroutinefunction(collect):
+        work = collect()
+    else:
+        work = asyncio.get_running_loop().run_in_executor(pool, collect)
+    try:
+        metrics, extras = await asyncio.wait_for(work, timeout)
+    except asyncio.TimeoutError:
+        detail = f"{name} collector timed out after {timeout:g}s"
+        metrics, extras = {key: ("ERROR", None, detail, source) for key in keys}, {}
+    except Exception as exc:  # one broken collector must not take the others down
+        detail = f"{name} collector raised {type(exc).__name__}: {exc}"
+        metrics, extras = {key: ("ERROR", None, detail, source) for key in keys}, {}
+    return metrics, extras, round(time.perf_counter() - started, 3)
+
+
+async def collect_all(collectors, timeouts):
+    """Run every collector concurrently: subprocess collectors on the event
+    loop, file parsers on a thread pool. `FORGE_COLLECTORS` are serialized on
+    one lock. Results come back in `collectors` order."""
+    pool = ThreadPoolExecutor(max_workers=len(collectors))
+    forge_lock = asyncio.Semaphore(1)
+    try:
+        results = await asyncio.gather(*(
+            run_collector(name, keys, source, collect, timeouts[name], pool,
+                          forge_lock if name in FORGE_COLLECTORS else None)
+            for name, (keys, source, collect) in collectors.items()
+        ))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return dict(zip(collectors, results))
+
+
+def parse_timeouts(overrides):
+    timeouts = dict(COLLECTOR_TIMEOUTS)
+    for item in overrides:
+        name, sep, seconds = item.partition("=")
+        if not sep or name not in timeouts:
+            fail(f"--timeout expects NAME=SECONDS with NAME in {', '.join(timeouts)}: {item!r}")
+        try:
+            timeouts[name] = float(seconds)
+        except ValueError:
+            fail(f"--timeout {name}: not a number: {seconds!r}")
+    return timeouts
+
+
 def main():
     parser = argparse.ArgumentParser(description="Collect docs verification metrics.")
     parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Output JSON path")
@@ -223,12 +449,37 @@ def main():
         action="store_true",
         help="Do not run math consistency gate",
     )
+    parser.add_argument(
+        "--skip-gas-snapshot",
+        action="store_true",
+        help="Do not run the gas snapshot gate",
+    )
     parser.add_argument(
         "--tag",
         default="",
         help="Optional provenance tag to record in output",
     )
+    parser.add_argument(
+        "--timeout",
+        action="append",
+        default=[],
+        metavar="NAME=SECONDS",
+        help=f"Override a collector timeout ({', '.join(f'{k}={v:g}' for k, v in COLLECTOR_TIMEOUTS.items())})",
+    )
+    parser.add_argument(
+        "--history",
+        default=str(metrics_history.DEFAULT_HISTORY),
+        help="Append this run to the metrics history JSONL (see metrics_history.py)",
+    )
+    parser.add_argument("--no-history", action="store_true", help="Do not append to the metrics history")
+    parser.add_argument(
+        "--gate-timings",
+        default=None,
+        metavar="FILE",
+        help="Per-gate wall times (name<TAB>seconds) from run_local_gates.sh to record in the history",
+    )
     args = parser.parse_args()
+    timeouts = parse_timeouts(args.timeout)
     baseline_path = Path(args.baseline)
     if not baseline_path.is_absolute():
         baseline_path = ROOT / baseline_path
@@ -254,54 +505,36 @@ def main():
         "spec_invariant_count": None,
         "math_consistency_total": None,
         "migration_items_total": None,
+        "gas_snapshot_total": None,
         "status": {},
         "details": {},
     }
 
+    skipped = {}
     if args.skip_forge_tests:
-        set_metric(payload, "non_fork_all", "SKIP", None, "skipped by option", "command")
-        set_metric(payload, "non_fork_strict", "SKIP", None, "skipped by option", "command")
-    else:
-        status, value, detail, source = collect_forge_total(["forge", "test", "--no-match-path", "test/fork/**"])
-        status, value, detail, source = with_baseline_if_error(
-            "non_fork_all", status, value, detail, source, baseline
-        )
-        set_metric(payload, "non_fork_all", status, value, detail, source)
-
-        status, value, detail, source = collect_forge_total(
-            ["forge", "test", "--no-match-path", "test/{fork,invariant}/**"]
-        )
-        status, value, detail, source = with_baseline_if_error(
-            "non_fork_strict", status, value, detail, source, baseline
-        )
-        set_metric(payload, "non_fork_strict", status, value, detail, source)
-
-    status, value, detail, source = collect_fork_total_from_logs(Path(args.fork_log_dir))
-    status, value, detail, source = with_baseline_if_error(
-        "fork_suite_total", status, value, detail, source, baseline
-    )
-    set_metric(payload, "fork_suite_total", status, value, detail, source)
-
-    status, value, detail, source = parse_requirements_count()
-    set_metric(payload, "requirements_count", status, value, detail, source)
-
-    status, value, detail, source = parse_spec_name_count(SPEC_TEST_RE)
-    set_metric(payload, "spec_test_count", status, value, detail, source)
-
-    status, value, detail, source = parse_spec_name_count(SPEC_INVARIANT_RE)
-    set_metric(payload, "spec_invariant_count", status, value, detail, source)
-
+        skipped.update(dict.fromkeys(FORGE_PARTITIONS, ("SKIP", None, "skipped by option", "command")))
     if args.skip_math_consistency:
-        set_metric(payload, "math_consistency_total", "SKIP", None, "skipped by option", "command")
-    else:
-        status, value, detail, source = collect_math_consistency_total()
-        status, value, detail, source = with_baseline_if_error(
-            "math_consistency_total", status, value, detail, source, baseline
-        )
-        set_metric(payload, "math_consistency_total", status, value, detail, source)
+        skipped["math_consistency_total"] = ("SKIP", None, "skipped by option", "command")
+    if args.skip_gas_snapshot:
+        skipped["gas_snapshot_total"] = ("SKIP", None, "skipped by option", "command")
+
+    metrics, extras, elapsed, collectors_s = dict(skipped), {}, {}, {}
+    for name, (collected, collected_extras, seconds) in asyncio.run(
+        collect_all(build_collectors(args), timeouts)
+    ).items():
+        metrics.update(collected)
+        extras.update(collected_extras)
+        elapsed.update(dict.fromkeys(collected, seconds))
+        collectors_s[name] = seconds
 
-    status, value, detail, source = parse_migration_items_count()
-    set_metric(payload, "migration_items_total", status, value, detail, source)
+    for key in METRIC_KEYS:
+        status, value, detail, source = metrics[key]
+        if key in BASELINE_KEYS:
+            status, value, detail, source = with_baseline_if_error(key, status, value, detail, source, baseline)
+        set_metric(payload, key, status, value, detail, source, elapsed.get(key))
+    for key in ("forge_tests", "math_consistency", "gas_snapshot"):
+        if key in extras:
+            payload[key] = extras[key]
 
     out_path = Path(args.output)
     if not out_path.is_absolute():
@@ -310,6 +543,15 @@ def main():
     out_path.write_text(json.dumps(payload, indent=2) + "\n")
 
     print(f"[PASS] wrote metrics: {out_path}")
+    if not args.no_history:
+        history_path = Path(args.history)
+        if not history_path.is_absolute():
+            history_path = ROOT / history_path
+        gates_s = metrics_history.load_gate_timings(Path(args.gate_timings)) if args.gate_timings else {}
+        metrics_history.append_record(
+            history_path, metrics_history.build_record(payload, METRIC_KEYS, collectors_s, gates_s)
+        )
+        print(f"[INFO] appended run to history: {history_path}")
     for key in METRIC_KEYS:
         st = payload["status"].get(key, "UNKNOWN")
         val = payload.get(key)
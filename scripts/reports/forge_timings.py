@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Per-test timing, fuzz runs and gas from forge output, with a slowest-test report.
+
+Sources (detected per file):
+  - `forge test --json` stdout
+  - a metrics JSON written by `collect_verification_metrics.py` (its
+    `forge_tests` key holds the parsed `forge test --json` run)
+  - text logs tee'd by `run_local_gates.sh` / `run_fork_tests.sh`; these carry
+    suite durations, gas and runs, but forge prints no per-test durations
+    in text mode
+
+Every source is normalised to the suites shape of `parse_forge_json`:
+
+  [{"suite", "path", "duration_s", "source",
+    "tests": [{"name", "status", "duration_s", "kind", "runs", "gas"}]}]
+
+`kind` is Unit / Fuzz / Invariant; `gas` is the unit gas or the fuzz median.
+`ingest` appends one line per call to `.verification-history/forge-tests.jsonl`
+(local, not committed) and prints the report; `top` reports on the latest
+stored run, or on files given directly without storing them.
+
+Usage:
+  forge_timings.py ingest FILE... [-n N]
+  forge_timings.py top [FILE...] [-n N] [--sha PREFIX]
+
+Shares are of the summed suite (or test) durations. forge runs suites in
+parallel, so the sum exceeds the run's wall-clock time.
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_STORE = ROOT / ".verification-history" / "forge-tests.jsonl"
+
+DURATION_PART_RE = re.compile(r"([\d.]+)\s*(ns|µs|us|ms|s|m|h)")
+DURATION_UNITS = {"ns": 1e-9, "µs": 1e-6, "us": 1e-6, "ms": 1e-3, "s": 1.0, "m": 60.0, "h": 3600.0}
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+LOG_SUITE_RE = re.compile(r"^Ran \d+ tests? for (?P<suite>\S+:\S+)")
+LOG_TEST_RE = re.compile(r"^\[(?P<status>PASS|FAIL.*?)\] (?P<name>\w+\([^)]*\)) \((?P<stats>[^)]*)\)")
+LOG_RESULT_RE = re.compile(r"^(?:Suite|Test) result: .*finished in (?P<duration>[^(]+)")
+LOG_STAT_RE = re.compile(r"(\w+|μ|~): (\d+)")
+
+
+def parse_duration(value):
+    """Seconds from a forge duration: `{"secs", "nanos"}` or humantime text ("1s 20ms")."""
+    if isinstance(value, dict):
+        return value.get("secs", 0) + value.get("nanos", 0) / 1e9
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        parts = DURATION_PART_RE.findall(value)
+        if parts:
+            return sum(float(n) * DURATION_UNITS[unit] for n, unit in parts)
+    return None
+
+
+def _json_kind(kind):
+    """(kind, runs, gas) from a forge JSON `kind` object."""
+    if not isinstance(kind, dict) or not kind:
+        return None, None, None
+    name, stats = next(iter(kind.items()))
+    stats = stats or {}
+    return name, stats.get("runs"), stats.get("gas", stats.get("median_gas"))
+
+
+def parse_forge_json(text: str):
+    """Suites from `forge test --json` stdout, in report order (see module docstring)."""
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in forge output")
+    data, _ = json.JSONDecoder().raw_decode(text[start:])
+    suites = []
+    for suite, result in data.items():
+        tests = []
+        for name, test in result.get("test_results", {}).items():
+            kind, runs, gas = _json_kind(test.get("kind"))
+            tests.append({
+                "name": name,
+                "status": test.get("status", "Unknown"),
+                "duration_s": parse_duration(test.get("duration")),
+                "kind": kind,
+                "runs": runs,
+                "gas": gas,
+            })
+        suites.append({
+            "suite": suite,
+            "path": suite.split(":", 1)[0],
+            "duration_s": parse_duration(result.get("duration")),
+            "tests": tests,
+        })
+    return suites
+
+
+def parse_forge_log(text: str):
+    """Suites from forge's text output (`Ran N tests for ...` blocks)."""
+    suites, current = [], None
+    for raw in text.splitlines():
+        line = ANSI_RE.sub("", raw).strip()
+        m = LOG_SUITE_RE.match(line)
+        if m:
+            current = {"suite": m.group("suite"), "path": m.group("suite").split(":", 1)[0],
+                       "duration_s": None, "tests": []}
+            suites.append(current)
+            continue
+        if current is None:
+            continue
+        m = LOG_TEST_RE.match(line)
+        if m:
+            stats = dict(LOG_STAT_RE.findall(m.group("stats")))
+            kind = "Invariant" if "calls" in stats else "Fuzz" if "runs" in stats else "Unit"
+            gas = stats.get("gas", stats.get("~"))
+            current["tests"].append({
+                "name": m.group("name"),
+                "status": "Success" if m.group("status") == "PASS" else "Failure",
+                "duration_s": None,
+                "kind": kind,
+                "runs": int(stats["runs"]) if "runs" in stats else None,
+                "gas": int(gas) if gas is not None else None,
+            })
+            continue
+        m = LOG_RESULT_RE.match(line)
+        if m:
+            current["duration_s"] = parse_duration(m.group("duration"))
+    return suites
+
+
+def load_source(path: Path):
+    """Suites from one file, each tagged with the file name as `source`."""
+    text = path.read_text(errors="replace")
+    stripped = text.lstrip()
+    suites = None
+    if stripped.startswith("{"):
+        try:
+            data = json.loads(stripped)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and "git_sha" in data:  # metrics JSON; no forge_tests when skipped
+            suites = data.get("forge_tests", {}).get("suites", [])
+    if suites is None:
+        try:
+            suites = parse_forge_json(text) if stripped.startswith("{") else parse_forge_log(text)
+        except ValueError:
+            suites = parse_forge_log(text)
+    for suite in suites:
+        suite["source"] = path.name
+    return suites
+
+
+def git_sha():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "UNKNOWN"
+
+
+def append_record(path: Path, record) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def load_records(path: Path):
+    """Stored runs in append order; unreadable lines are skipped."""
+    if not path.exists():
+        return []
+    records = []
+    for line in path.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def _share(seconds, total):
+    return f"{seconds / total:6.1%}" if total else "     -"
+
+
+def print_report(suites, top: int) -> None:
+    tests = [(suite, test) for suite in suites for test in suite["tests"]]
+    suite_total = sum(s["duration_s"] or 0.0 for s in suites)
+    test_total = sum(t["duration_s"] or 0.0 for _, t in tests)
+    sources = sorted({s.get("source", "-") for s in suites})
+    tag = (lambda s: f" [{s.get('source', '-')}]") if len(sources) > 1 else (lambda s: "")
+    print(f"[INFO] {len(suites)} suites, {len(tests)} tests, {suite_total:.2f}s summed suite time "
+          f"({', '.join(sources)})")
+
+    print(f"\n  Slowest suites{'':56s} {'time':>9} {'share':>6} {'tests':>5}")
+    print("  " + "-" * 90)
+    for suite in sorted(suites, key=lambda s: s["duration_s"] or 0.0, reverse=True)[:top]:
+        seconds = suite["duration_s"] or 0.0
+        print(f"  {(suite['suite'] + tag(suite))[:70]:70s} {seconds:8.2f}s {_share(seconds, suite_total)} "
+              f"{len(suite['tests']):5d}")
+
+    if not test_total:
+        print("\n[INFO] no per-test durations in these sources (forge prints them only with --json)")
+    else:
+        print(f"\n  Slowest tests{'':45s} {'time':>9} {'share':>6} {'kind':>9} {'runs':>6} {'gas':>11}")
+        print("  " + "-" * 104)
+        ranked = sorted(tests, key=lambda st: st[1]["duration_s"] or 0.0, reverse=True)[:top]
+        for suite, test in ranked:
+            seconds = test["duration_s"] or 0.0
+            contract = suite["suite"].rsplit(":", 1)[-1]
+            runs = "-" if test.get("runs") is None else str(test["runs"])
+            gas = "-" if test.get("gas") is None else f"{test['gas']:,}"
+            print(f"  {(contract + '::' + test['name'])[:58]:58s} {seconds:8.2f}s {_share(seconds, test_total)} "
+                  f"{test.get('kind') or '-':>9} {runs:>6} {gas:>11}")
+
+    failed = [f"{s['suite']}::{t['name']}" for s, t in tests if t["status"] == "Failure"]
+    if failed:
+        print(f"\n[INFO] {len(failed)} failing tests: {', '.join(failed[:10])}")
+
+
+def cmd_ingest(args, store: Path) -> int:
+    suites = []
+    for name in args.files:
+        path = Path(name)
+        if not path.exists():
+            print(f"[WARN] skipping missing source: {path}")
+            continue
+        found = load_source(path)
+        if not found:
+            print(f"[WARN] no forge test suites in {path}")
+        suites.extend(found)
+    if not suites:
+        print("[FAIL] nothing to ingest")
+        return 1
+    append_record(store, {
+        "git_sha": git_sha(),
+        "ingested_at": datetime.now(timezone.utc).isoformat(),
+        "sources": [str(Path(name)) for name in args.files if Path(name).exists()],
+        "suites": suites,
+    })
+    print(f"[INFO] stored {len(suites)} suites: {store}")
+    print_report(suites, args.top)
+    return 0
+
+
+def cmd_top(args, store: Path) -> int:
+    if args.files:
+        suites = [suite for name in args.files for suite in load_source(Path(name))]
+    else:
+        records = [r for r in load_records(store) if r["git_sha"].startswith(args.sha)]
+        if not records:
+            print(f"[INFO] no stored forge runs in {store}; run `ingest` first")
+            return 0
+        record = records[-1]
+        print(f"[INFO] run {record['git_sha'][:10]} ingested at {record['ingested_at']}")
+        suites = record["suites"]
+    if not suites:
+        print("[FAIL] no forge test suites found")
+        return 1
+    print_report(suites, args.top)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-test forge timings and the slowest tests/suites.")
+    parser.add_argument("--store", default=str(DEFAULT_STORE), help="Stored runs JSONL path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Parse forge output, store it and print the report")
+    ingest.add_argument("files", nargs="+", help="forge --json output, metrics JSON or forge text logs")
+    ingest.add_argument("-n", "--top", type=int, default=10, help="Rows per table")
+
+    top = sub.add_parser("top", help="Slowest suites and tests of the latest stored run (or of FILEs)")
+    top.add_argument("files", nargs="*", help="Report on these sources instead of the store")
+    top.add_argument("-n", "--top", type=int, default=10, help="Rows per table")
+    top.add_argument("--sha", default="", help="Latest stored run whose git SHA starts with this prefix")
+
+    args = parser.parse_args(argv)
+    store = Path(args.store)
+    if not store.is_absolute():
+        store = ROOT / store
+    if args.command == "ingest":
+        return cmd_ingest(args, store)
+    return cmd_top(args, store)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
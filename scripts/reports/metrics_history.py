@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Append-only history of verification metrics runs, with a regression report.
+
+`collect_verification_metrics.py` appends one JSON line per run to
+`.verification-history/metrics.jsonl` (local, not committed):
+
+  {"git_sha", "generated_at", "tag",
+   "metrics":     {metric key: value},          # counts, as in the metrics JSON
+   "status":      {metric key: status},
+   "collectors_s": {collector: wall seconds},
+   "gates_s":     {gate: wall seconds},         # run_local_gates.sh step timings
+   "math_s":      {section: seconds},           # math gate timings_s
+   "forge_s":     {"total": sum of suite durations, "<suite>": seconds}}
+
+Usage:
+  metrics_history.py show [--last N] [--sha PREFIX]
+  metrics_history.py report [--window N] [--threshold F] [--min-seconds S] [--check]
+
+`report` compares the latest run with the median of up to `--window`
+earlier runs. A timing is a regression when it is more than `--threshold`
+(default 0.30) above that median and at least `--min-seconds` slower. A
+metric drops when, against the previous run, its count falls, its value
+becomes null, or its status leaves PASS for ERROR or BASELINE (a skipped
+collector is not a drop). With `--check` any finding exits 1.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_HISTORY = ROOT / ".verification-history" / "metrics.jsonl"
+TIMING_GROUPS = ("collectors_s", "gates_s", "math_s", "forge_s")
+
+
+def load_gate_timings(path: Path):
+    """`name<TAB>seconds` lines written by run_local_gates.sh; later lines win."""
+    timings = {}
+    if not path.exists():
+        return timings
+    for line in path.read_text().splitlines():
+        name, _, seconds = line.rpartition("\t")
+        try:
+            timings[name] = round(float(seconds), 3)
+        except ValueError:
+            continue
+    return timings
+
+
+def build_record(payload, metric_keys, collectors_s, gates_s=None):
+    """History line for one collector run (see module docstring)."""
+    forge_s = {}
+    for suite in payload.get("forge_tests", {}).get("suites", []):
+        if suite["duration_s"] is not None:
+            forge_s[suite["suite"]] = round(suite["duration_s"], 3)
+    if forge_s:
+        forge_s = {"total": round(sum(forge_s.values()), 3), **forge_s}
+    return {
+        "git_sha": payload.get("git_sha", "UNKNOWN"),
+        "generated_at": payload.get("generated_at", ""),
+        "tag": payload.get("tag", ""),
+        "metrics": {key: payload.get(key) for key in metric_keys},
+        "status": {key: payload["status"].get(key) for key in metric_keys},
+        "collectors_s": collectors_s,
+        "gates_s": gates_s or {},
+        "math_s": payload.get("math_consistency", {}).get("timings_s", {}),
+        "forge_s": forge_s,
+    }
+
+
+def append_record(path: Path, record) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def load_history(path: Path):
+    """Records in append order; unreadable lines are skipped."""
+    if not path.exists():
+        return []
+    records = []
+    for line in path.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def timing_regressions(records, window: int, threshold: float, min_seconds: float):
+    """(group, name, current, median, ratio) for timings of the latest record
+    that exceed the median of the previous `window` records."""
+    if len(records) < 2:
+        return []
+    current, previous = records[-1], records[-1 - window:-1]
+    found = []
+    for group in TIMING_GROUPS:
+        for name, seconds in sorted(current.get(group, {}).items()):
+            history = [r[group][name] for r in previous if r.get(group, {}).get(name) is not None]
+            if seconds is None or not history:
+                continue
+            median = statistics.median(history)
+            if seconds > median * (1 + threshold) and seconds - median >= min_seconds:
+                found.append((group, name, seconds, median, seconds / median if median else float("inf")))
+    return found
+
+
+DROPPED_STATUSES = ("ERROR", "BASELINE")
+
+
+def metric_drops(records):
+    """(metric, field, current, previous) against the previous run: field
+    "status" when a PASS metric became ERROR or BASELINE, "value" when a
+    recorded value became null, "count" when a count fell."""
+    if len(records) < 2:
+        return []
+    current, previous = records[-1], records[-2]
+    found = []
+    status, status_before = current.get("status", {}), previous.get("status", {})
+    for key, state in status.items():
+        if status_before.get(key) == "PASS" and state in DROPPED_STATUSES:
+            found.append((key, "status", state, "PASS"))
+    metrics, metrics_before = current["metrics"], previous["metrics"]
+    for key, value in metrics.items():
+        before = metrics_before.get(key)
+        if value is None and before is not None:
+            found.append((key, "value", None, before))
+        elif isinstance(value, int) and isinstance(before, int) and value < before:
+            found.append((key, "count", value, before))
+    return found
+
+
+def cmd_show(records, args) -> int:
+    if args.sha:
+        records = [r for r in records if r["git_sha"].startswith(args.sha)]
+    for record in records[-args.last:]:
+        counts = " ".join(f"{k}={v}" for k, v in record["metrics"].items() if v is not None)
+        collectors = " ".join(f"{k}={v:.1f}s" for k, v in record["collectors_s"].items())
+        print(f"{record['generated_at']}  {record['git_sha'][:10]}  {record['tag'] or '-'}")
+        print(f"    {counts}")
+        print(f"    collectors: {collectors or '-'}")
+    return 0
+
+
+def cmd_report(records, args) -> int:
+    if len(records) < 2:
+        print(f"[INFO] {len(records)} run(s) in history; need at least 2 to compare")
+        return 0
+    current = records[-1]
+    baseline_runs = len(records[-1 - args.window:-1])
+    print(f"[INFO] latest run {current['git_sha'][:10]} at {current['generated_at']} "
+          f"vs median of {baseline_runs} earlier run(s)")
+
+    regressions = timing_regressions(records, args.window, args.threshold, args.min_seconds)
+    drops = metric_drops(records)
+    for group, name, seconds, median, ratio in regressions:
+        print(f"[REGRESSION] {group}.{name}: {seconds:.2f}s vs median {median:.2f}s (+{(ratio - 1) * 100:.0f}%)")
+    for key, field, value, before in drops:
+        print(f"[DROP] {key}: {field} {value} (previous run {before})")
+    if not regressions and not drops:
+        print(f"[PASS] no runtime regressions above {args.threshold:.0%} and no metric drops")
+        return 0
+    return 1 if args.check else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the verification metrics history.")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY), help="History JSONL path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    show = sub.add_parser("show", help="List recorded runs")
+    show.add_argument("--last", type=int, default=10, help="Runs to list")
+    show.add_argument("--sha", default="", help="Only runs whose git SHA starts with this prefix")
+
+    report = sub.add_parser("report", help="Flag runtime regressions and metric drops in the latest run")
+    report.add_argument("--window", type=int, default=10, help="Earlier runs in the rolling median")
+    report.add_argument("--threshold", type=float, default=0.30, help="Relative slowdown that counts as a regression")
+    report.add_argument("--min-seconds", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    report.add_argument("--check", action="store_true", help="Exit 1 on any regression or drop")
+
+    args = parser.parse_args(argv)
+    history = Path(args.history)
+    if not history.is_absolute():
+        history = ROOT / history
+    records = load_history(history)
+    if args.command == "show":
+        return cmd_show(records, args)
+    return cmd_report(records, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -43,6 +43,20 @@ def metric_line(metrics, key, label):
     return line
 
 
+def gas_lines(metrics):
+    """One nested line per gas scenario from the gas snapshot gate document."""
+    lines = []
+    for row in metrics.get("gas_snapshot", {}).get("functions", []):
+        gas = "n/a" if row["gas"] is None else f"{row['gas']:,}"
+        line = f"  - {row['label']}: `{gas}` gas"
+        if row["baseline"] is not None and row["delta_pct"] is not None:
+            line += f" (baseline `{row['baseline']:,}`, {row['delta_pct']:+.2f}%, tolerance {row['tolerance_pct']:g}%)"
+        if row["status"] != "PASS":
+            line += f" — {row['status']}"
+        lines.append(line)
+    return lines
+
+
 def build_generated_lines(metrics, metrics_path: Path):
     try:
         metrics_ref = metrics_path.relative_to(ROOT).as_posix()
@@ -74,6 +88,10 @@ def build_generated_lines(metrics, metrics_path: Path):
             metric_line(metrics, "migration_items_total", "Migration checklist items"),
         ]
     )
+    # Snapshots collected before the gas snapshot gate existed carry no gas metric.
+    if "gas_snapshot_total" in metrics:
+        lines.append(metric_line(metrics, "gas_snapshot_total", "Gas snapshot scenarios"))
+        lines.extend(gas_lines(metrics))
     return lines
 
 
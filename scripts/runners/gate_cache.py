@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Content-hash result cache for the Python gates in run_local_gates.sh.
+
+Usage:
+  gate_cache.py --name NAME --inputs GLOB [GLOB ...] [--modules MOD ...] -- CMD [ARG ...]
+
+The key is a SHA-256 over the command line and every file matched by the
+input globs (paths relative to the repo root, sorted, path + content). With
+`--modules`, the Python version and the installed version of each named
+distribution ("absent" if missing) are part of the key too, for gates whose
+verdict depends on optional dependencies. When
+`.gate-cache/NAME.json` holds a PASS for the same key, the recorded output is
+replayed and the command is not run. Otherwise the command runs with its
+output streamed through, and a zero exit is recorded. Failures are never
+cached. `--disable` (or NADSWAP_GATE_CACHE=0) runs the command unconditionally
+and leaves the cache untouched.
+"""
+
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = ROOT / ".gate-cache"
+CACHE_SCHEMA = 2
+
+
+def input_files(patterns):
+    files = set()
+    for pattern in patterns:
+        for path in ROOT.glob(pattern):
+            if path.is_file() and "__pycache__" not in path.parts:
+                files.add(path)
+    return sorted(files)
+
+
+def environment(modules):
+    """Python version plus the installed version of each distribution."""
+    if not modules:
+        return {}
+    env = {"python": sys.version.split()[0]}
+    for name in modules:
+        try:
+            env[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            env[name] = "absent"
+    return env
+
+
+def cache_key(command, patterns, env=None):
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"schema": CACHE_SCHEMA, "command": command, "inputs": patterns,
+                              "env": env or {}}, sort_keys=True).encode())
+    files = input_files(patterns)
+    for path in files:
+        digest.update(path.relative_to(ROOT).as_posix().encode() + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest(), len(files)
+
+
+def load_entry(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def run_streamed(command):
+    """Run `command`, echoing combined stdout/stderr as it arrives."""
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    captured = []
+    for line in proc.stdout:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+        captured.append(line)
+    return proc.wait(), "".join(captured)
+
+
+def parse_args(argv):
+    if "--" not in argv:
+        print("[FAIL] gate_cache.py: missing `-- CMD`", file=sys.stderr)
+        sys.exit(2)
+    split = argv.index("--")
+    parser = argparse.ArgumentParser(description="Replay a cached PASS when a gate's inputs are unchanged.")
+    parser.add_argument("--name", required=True, help="Cache entry name (one per gate)")
+    parser.add_argument("--inputs", nargs="+", required=True, help="Input globs relative to the repo root")
+    parser.add_argument("--modules", nargs="+", default=[],
+                        help="Python distributions whose installed versions (plus the Python version) join the key")
+    parser.add_argument("--disable", action="store_true", help="Always run the command; do not read or write the cache")
+    args = parser.parse_args(argv[:split])
+    args.command = argv[split + 1:]
+    if not args.command:
+        parser.error("empty command after `--`")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.disable or os.environ.get("NADSWAP_GATE_CACHE", "1") == "0":
+        return subprocess.call(args.command)
+
+    # Keys are repo-relative so the cache survives moving the checkout.
+    command = [os.path.relpath(a, ROOT) if a.startswith(str(ROOT)) else a for a in args.command]
+    env = environment(args.modules)
+    key, n_files = cache_key(command, args.inputs, env)
+    entry_path = CACHE_DIR / f"{args.name}.json"
+    entry = load_entry(entry_path)
+
+    if entry and entry.get("key") == key and entry.get("verdict") == "PASS":
+        print(f"[gate-cache] HIT {args.name} key={key[:12]} files={n_files} "
+              f"(recorded {entry.get('recorded_at')}, {entry.get('elapsed_s', 0):.1f}s saved); replaying output")
+        sys.stdout.write(entry.get("output", ""))
+        return 0
+
+    print(f"[gate-cache] MISS {args.name} key={key[:12]} files={n_files}")
+    sys.stdout.flush()
+    started = time.perf_counter()
+    code, output = run_streamed(args.command)
+    if code == 0:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp = entry_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "schema": CACHE_SCHEMA,
+            "name": args.name,
+            "key": key,
+            "verdict": "PASS",
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "elapsed_s": round(time.perf_counter() - started, 3),
+            "command": command,
+            "env": env,
+            "output": output,
+        }, indent=2) + "\n")
+        tmp.replace(entry_path)
+    elif entry_path.exists():
+        entry_path.unlink()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -134,4 +134,7 @@ python3 "${ROOT}/scripts/fork/preflight_monad.py" | tee "${LOG_DIR}/00-preflight
   fi
 )
 
+# Per-suite timings, gas and fuzz runs from the tee'd logs (informational).
+python3 "${ROOT}/scripts/reports/forge_timings.py" ingest "${LOG_DIR}"/[2-4]0-*.log || true
+
 echo "[PASS] Fork suite completed. Logs at ${LOG_DIR}"
@@ -15,6 +15,11 @@ SKIP_SLITHER=0
 SKIP_UPSTREAM_SYNC=0
 SKIP_FORK=0
 DEV_MODE=0
+GATE_CACHE="${NADSWAP_GATE_CACHE:-1}"
+HISTORY_DIR="${ROOT}/.verification-history"
+GATE_TIMINGS="${HISTORY_DIR}/gate-timings.tsv"
+STEP_NAME=""
+STEP_STARTED=""
 
 if [[ "${1-}" == "--" ]]; then
   shift
@@ -33,6 +38,7 @@ Options:
   --skip-upstream-sync      Skip cloning/syncing upstream pinned refs.
   --skip-fork               Skip fork test suite in this runner.
   --dev                     Development mode (no report writes; skips docs consistency).
+  --no-gate-cache           Always re-run the Python gates (ignore .gate-cache/ results).
   -h, --help                Show this help.
 
 Examples:
@@ -46,6 +52,41 @@ log() {
   printf '[%s] %s\n' "$(date +'%H:%M:%S')" "$*"
 }
 
+now() {
+  python3 -c 'import time; print(f"{time.time():.3f}")'
+}
+
+# Close the running step: append "name<TAB>seconds" to GATE_TIMINGS, which the
+# metrics collector records in .verification-history/metrics.jsonl.
+finish_step() {
+  if [[ -n "${STEP_NAME}" ]]; then
+    printf '%s\t%s\n' "${STEP_NAME}" "$(awk -v a="${STEP_STARTED}" -v b="$(now)" 'BEGIN { printf "%.3f", b - a }')" \
+      >> "${GATE_TIMINGS}"
+  fi
+  STEP_NAME=""
+}
+
+# Section header for a timed gate step.
+step() {
+  finish_step
+  STEP_NAME="$*"
+  STEP_STARTED="$(now)"
+  log "$*"
+}
+
+# Python gate behind the content-hash cache (scripts/runners/gate_cache.py):
+#   cached_gate NAME INPUT_GLOB... -- CMD...
+# A PASS recorded for the same inputs is replayed instead of re-running CMD.
+cached_gate() {
+  local name="$1"
+  shift
+  local cache_args=()
+  if [[ "${GATE_CACHE}" == "0" ]]; then
+    cache_args+=(--disable)
+  fi
+  python3 "${ROOT}/scripts/runners/gate_cache.py" --name "${name}" ${cache_args[@]+"${cache_args[@]}"} --inputs "$@"
+}
+
 run_cmd() {
   log "RUN: $*"
   "$@"
@@ -97,6 +138,10 @@ while [[ $# -gt 0 ]]; do
       DEV_MODE=1
       shift
       ;;
+    --no-gate-cache)
+      GATE_CACHE=0
+      shift
+      ;;
     -h|--help)
       usage
       exit 0
@@ -113,50 +158,58 @@ ensure_tool git
 ensure_tool python3
 ensure_tool forge
 
+mkdir -p "${HISTORY_DIR}"
+: > "${GATE_TIMINGS}"
+
 if [[ "${SKIP_UPSTREAM_SYNC}" -eq 0 ]]; then
-  log "Syncing upstream pinned refs..."
+  step "Syncing upstream pinned refs..."
   sync_repo_to_sha "${UPSTREAM_CORE_DIR}" "https://github.com/Uniswap/v2-core.git" "${EXPECTED_CORE_SHA}"
   sync_repo_to_sha "${UPSTREAM_PERIPHERY_DIR}" "https://github.com/Uniswap/v2-periphery.git" "${EXPECTED_PERIPHERY_SHA}"
 else
   log "Skipping upstream sync by option."
 fi
 
-log "Build"
+step "Build"
 (
   cd "${PROTOCOL_DIR}"
   FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" forge build
 )
 
 if [[ "${SKIP_SLITHER}" -eq 0 ]]; then
-  log "Slither Static Analysis Gate"
+  step "Slither Static Analysis Gate"
   python3 "${ROOT}/scripts/gates/check_slither_gate.py"
 else
   log "Skipping Slither gate by option."
 fi
 
-log "Storage Layout Gate"
+step "Storage Layout Gate"
 python3 "${ROOT}/scripts/gates/check_storage_layout.py"
 
-log "P0 Smoke Gate (swap/tax guard paths)"
+step "P0 Smoke Gate (swap/tax guard paths)"
 (
   cd "${PROTOCOL_DIR}"
   FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" forge test --match-path "test/core/PairSwapGuards.t.sol"
   FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" forge test --match-path "test/core/PairFlashQuote.t.sol"
 )
 
-log "Lightweight Invariant Gate"
+step "Lightweight Invariant Gate"
 (
   cd "${PROTOCOL_DIR}"
   FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" forge test --match-path "test/invariant/**"
 )
 
-log "Unit/Fuzz/Regression Tests (non-fork, non-stateful-invariant)"
+step "Unit/Fuzz/Regression Tests (non-fork, non-stateful-invariant)"
 (
   cd "${PROTOCOL_DIR}"
-  FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" forge test --no-match-path "test/{fork,invariant}/**"
+  FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" forge test --no-match-path "test/{fork,invariant,gas,differential}/**"
 )
 
-log "Nightly High-Depth Invariant Gate"
+step "Gas Snapshot Gate"
+# The committed baseline has no recorded gas yet (all null), so NEW scenarios
+# are allowed; drop --allow-new once --update-baseline has been committed.
+python3 "${ROOT}/scripts/gates/check_gas_snapshot.py" --allow-new
+
+step "Nightly High-Depth Invariant Gate"
 mkdir -p "${ROOT}/invariant-logs"
 NIGHTLY_LOG="${ROOT}/invariant-logs/local-nightly-invariant-$(date +%Y%m%d-%H%M%S).log"
 (
@@ -166,7 +219,7 @@ NIGHTLY_LOG="${ROOT}/invariant-logs/local-nightly-invariant-$(date +%Y%m%d-%H%M%
     -vv | tee "${NIGHTLY_LOG}"
 )
 
-log "Nightly Large-Domain K/Overflow Fuzz Gate"
+step "Nightly Large-Domain K/Overflow Fuzz Gate"
 (
   cd "${PROTOCOL_DIR}"
   FOUNDRY_OFFLINE="${FOUNDRY_OFFLINE}" FOUNDRY_PROFILE=invariant-nightly forge test \
@@ -176,42 +229,63 @@ log "Nightly Large-Domain K/Overflow Fuzz Gate"
 )
 log "Nightly invariant log saved: ${NIGHTLY_LOG}"
 
-log "Math Consistency Gate"
-python3 "${ROOT}/scripts/gates/check_math_consistency.py"
+step "Math Consistency Gate"
+# numpy decides whether the vault simulation runs; gmpy2 backs --backend auto.
+cached_gate math "scripts/gates/*.py" --modules numpy gmpy2 -- \
+  python3 "${ROOT}/scripts/gates/check_math_consistency.py"
 
-log "Traceability Gate"
-python3 "${ROOT}/scripts/gates/check_traceability.py"
+step "Traceability Gate"
+# Trace matrix code paths point into protocol/src and scripts; test names are
+# grepped from every file under protocol/test.
+cached_gate traceability "docs/**/*.yaml" "docs/**/*.md" "protocol/test/**/*" \
+  "protocol/src/**/*.sol" "scripts/**/*" -- \
+  python3 "${ROOT}/scripts/gates/check_traceability.py"
 
-log "Migration Checklist Gate"
-python3 "${ROOT}/scripts/gates/check_migration_signoff.py"
+step "Migration Checklist Gate"
+cached_gate migration "docs/**/*.md" "scripts/gates/check_migration_signoff.py" -- \
+  python3 "${ROOT}/scripts/gates/check_migration_signoff.py"
 
 if [[ "${SKIP_FORK}" -eq 0 ]]; then
-  log "Fork Test Suite"
+  step "Fork Test Suite"
   "${ROOT}/scripts/runners/run_fork_tests.sh"
 else
   log "Skipping fork suite by option."
 fi
 
 if [[ "${DEV_MODE}" -eq 0 ]]; then
+  finish_step
   log "Collect Verification Metrics"
   python3 "${ROOT}/scripts/reports/collect_verification_metrics.py" \
-    --output "${ROOT}/docs/reports/NADSWAP_V2_VERIFICATION_METRICS.json"
+    --output "${ROOT}/docs/reports/NADSWAP_V2_VERIFICATION_METRICS.json" \
+    --gate-timings "${GATE_TIMINGS}"
+
+  log "Verification Runtime History (informational)"
+  python3 "${ROOT}/scripts/reports/metrics_history.py" report || true
+
+  log "Slowest Forge Tests (informational)"
+  python3 "${ROOT}/scripts/reports/forge_timings.py" ingest \
+    "${ROOT}/docs/reports/NADSWAP_V2_VERIFICATION_METRICS.json" "${NIGHTLY_LOG}" || true
 
-  log "Render Verification Reports"
+  step "Render Verification Reports"
   python3 "${ROOT}/scripts/reports/render_verification_reports.py" \
     --metrics "${ROOT}/docs/reports/NADSWAP_V2_VERIFICATION_METRICS.json"
 else
   log "Skipping metrics/render in --dev mode."
 fi
 
-log "Docs Symbol Refs Gate"
-python3 "${ROOT}/scripts/gates/check_docs_symbol_refs.py"
+step "Docs Symbol Refs Gate"
+cached_gate docs-symbol "docs/**/*.md" "protocol/src/**/*.sol" "protocol/test/**/*.sol" \
+  "upstream/*/contracts/**/*.sol" "scripts/gates/check_docs_symbol_refs.py" -- \
+  python3 "${ROOT}/scripts/gates/check_docs_symbol_refs.py"
 
 if [[ "${DEV_MODE}" -eq 0 ]]; then
-  log "Docs Consistency Gate"
-  python3 "${ROOT}/scripts/gates/check_docs_consistency.py"
+  step "Docs Consistency Gate"
+  cached_gate docs-consistency "docs/**/*.yaml" "docs/**/*.md" "docs/**/*.json" "README.md" \
+    "protocol/test/**/*.sol" "scripts/reports/*.py" "scripts/gates/check_docs_consistency.py" -- \
+    python3 "${ROOT}/scripts/gates/check_docs_consistency.py"
 else
   log "Skipping docs consistency in --dev mode."
 fi
 
+finish_step
 log "PASS: Local gate run completed."